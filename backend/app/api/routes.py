@@ -1,13 +1,30 @@
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
-from typing import List, Optional, Dict, Any
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel, Field
+from typing import List, Optional, Dict, Any, AsyncIterator, Tuple
 import re
 import csv
 import io
-from datetime import datetime
-from app.nlp.extractor import extract_tasks
+import json
+import codecs
+import hashlib
+from datetime import datetime, date, timedelta
+from app.nlp.extractor import extract_tasks, TaskStream
 from app.nlp.ai_service import model_service
-from app.google.calendar import list_events as gcal_list, create_event as gcal_create
+from app.nlp.executor import InferenceOverloaded
+from app.google.calendar import (
+    create_event as gcal_create, insert_events as gcal_insert_many, task_to_event,
+)
+from app.google.sync import calendar_sync
+from app.finance.engine import analyze_csv
+from app.finance.ledger import finance_ledger
+from app.finance.parallel import analyze_parallel
+from app.finance.stream import analyze_stream
+from app.finance.rollups import dataset_id, rollup_store
+from app.startup import startup_profile
+from app.db.tasks import task_repository, StorageUnavailable, PartialInsert, DEFAULT_USER, utc_midnight, iter_tasks
+from app.db.export import FORMATS as EXPORT_FORMATS, export_chunks
 
 router = APIRouter()
 
@@ -17,11 +34,21 @@ class Task(BaseModel):
     category: Optional[str] = None
     deadline: Optional[str] = None
 
+class StoredTask(Task):
+    id: str
+
 class ModelStatus(BaseModel):
     state: str
+    ready: bool = False
     model: Optional[str] = None
+    backend: Optional[str] = None
     error: Optional[str] = None
     loading_started: bool
+    batching: Optional[Dict[str, Any]] = None
+    inference_pool: Optional[Dict[str, Any]] = None
+    workers: Optional[List[Dict[str, Any]]] = None
+    cache: Optional[Dict[str, Any]] = None
+    warmup: Optional[Dict[str, Any]] = None
 
 class ParseResponse(BaseModel):
     tasks: List[Task]
@@ -29,20 +56,113 @@ class ParseResponse(BaseModel):
     model_state: str
     message: Optional[str] = None
     error: Optional[str] = None
-
-@router.post("/tasks/", response_model=List[Task])
-async def create_tasks(tasks: List[Task]):
-    # Here you would typically process the tasks and store them in the database
+    cached: bool = False
+
+@router.post("/tasks/", response_model=List[StoredTask])
+async def create_tasks(tasks: List[Task], user: str = DEFAULT_USER):
+    """
+    Store a list of tasks (e.g. what /parse returned) in one bulk insert.
+    Deadlines are stored as dates; relative ones are resolved against today.
+    If only some tasks could be stored, the error lists the stored ones
+    (with ids) and the position and reason of each one that failed.
+    """
+    try:
+        return await task_repository.insert_many([t.dict() for t in tasks], user=user)
+    except StorageUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except PartialInsert as e:
+        raise HTTPException(status_code=500, detail={"message": str(e), "inserted": e.inserted, "errors": e.errors})
+
+@router.get("/tasks/", response_model=List[StoredTask])
+async def get_tasks(
+    response: Response,
+    limit: int = Query(50, ge=1, le=500),
+    after: Optional[str] = None,
+    user: str = DEFAULT_USER,
+):
+    """
+    One page of stored tasks. When more remain, the X-Next-Cursor header
+    holds the value to pass as `after` for the next page.
+    """
+    try:
+        tasks, next_cursor = await task_repository.list(limit=limit, after=after, user=user)
+    except StorageUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     return tasks
 
-@router.get("/tasks/", response_model=List[Task])
-async def get_tasks():
-    # Here you would typically retrieve tasks from the database
-    return []  # Return an empty list for now as a placeholder
+@router.get("/tasks/due", response_model=List[StoredTask])
+async def get_tasks_due(
+    start: date,
+    end: Optional[date] = None,
+    category: Optional[str] = None,
+    user: str = DEFAULT_USER,
+    limit: int = Query(500, ge=1, le=5000),
+):
+    """Tasks due from `start` up to and including `end` (default: a week), soonest first"""
+    end = end or start + timedelta(days=6)
+    if end < start:
+        raise HTTPException(status_code=400, detail="end must not be before start")
+    try:
+        return await task_repository.due(
+            utc_midnight(start), utc_midnight(end + timedelta(days=1)), category=category, user=user, limit=limit
+        )
+    except StorageUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+@router.get("/tasks/search", response_model=List[StoredTask])
+async def search_tasks(q: str, user: str = DEFAULT_USER, limit: int = Query(50, ge=1, le=500)):
+    """Tasks containing any of the words in `q`, best match first"""
+    try:
+        return await task_repository.search(q, user=user, limit=limit)
+    except StorageUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+@router.get("/tasks/export")
+async def export_tasks(
+    fmt: str = Query("csv", alias="format", regex="^(csv|ndjson)$"),
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    category: Optional[str] = None,
+    user: str = DEFAULT_USER,
+):
+    """
+    Download all of a user's tasks as CSV or NDJSON, optionally only those due
+    from `start` to `end` (inclusive) and of one category. The file is
+    streamed from the database cursor as it is read, however many tasks
+    there are.
+    """
+    if start and end and end < start:
+        raise HTTPException(status_code=400, detail="end must not be before start")
+    try:
+        # Opened here so a missing database is a 503, not a broken download
+        cursor = task_repository.export_cursor(
+            start=utc_midnight(start) if start else None,
+            end=utc_midnight(end + timedelta(days=1)) if end else None,
+            category=category,
+            user=user,
+        )
+    except StorageUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    return StreamingResponse(
+        export_chunks(iter_tasks(cursor), fmt),
+        media_type=EXPORT_FORMATS[fmt],
+        headers={"Content-Disposition": f'attachment; filename="tasks.{fmt}"'},
+    )
 
 @router.delete("/tasks/{task_id}", response_model=dict)
-async def delete_task(task_id: int):
-    # Here you would typically delete a task from the database
+async def delete_task(task_id: str, user: str = DEFAULT_USER):
+    try:
+        deleted = await task_repository.delete(task_id, user=user)
+    except StorageUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not deleted:
+        raise HTTPException(status_code=404, detail="Task not found")
     return {"message": "Task deleted successfully"}
 
 @router.get("/model/status", response_model=ModelStatus)
@@ -50,6 +170,23 @@ async def get_model_status():
     """Get the current status of the AI model"""
     return model_service.get_status()
 
+@router.get("/ready")
+async def readiness():
+    """
+    Readiness probe for load balancers: 200 once the model is loaded and
+    warmed up, 503 while it is loading or warming (or failed to load).
+    """
+    status = model_service.get_status()
+    body = {"ready": status["ready"], "state": status["state"]}
+    return JSONResponse(body, status_code=200 if status["ready"] else 503)
+
+@router.get("/debug/startup")
+async def get_startup_profile(top: int = 30):
+    """Cold start breakdown: import times, model load phases and milestones"""
+    profile = startup_profile.snapshot(top=top)
+    profile["model_state"] = model_service.get_status()["state"]
+    return profile
+
 @router.post("/model/load", response_model=ModelStatus)
 async def load_model():
     """Trigger model loading if not already started"""
@@ -65,7 +202,8 @@ class ParseRequest(BaseModel):
 async def parse_text(req: ParseRequest):
     try:
         # Process the text with our AI service (handles fallbacks automatically)
-        result = model_service.process_text(
+        # on its worker pool, keeping the event loop free during generation
+        result = await model_service.aprocess_text(
             req.text, 
             options={
                 "lang": req.lang,
@@ -96,6 +234,8 @@ async def parse_text(req: ParseRequest):
         result["tasks"] = [Task(**t) for t in clean]
         
         return ParseResponse(**result)
+    except InferenceOverloaded as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -114,20 +254,50 @@ class EventCreate(BaseModel):
     end: str
     timeZone: Optional[str] = None
 
+class BatchEventsRequest(BaseModel):
+    tasks: List[Task]
+    timeZone: Optional[str] = "UTC"
+    durationMinutes: int = Field(60, gt=0, le=24 * 60)
+
+class BatchEventResult(BaseModel):
+    index: int
+    task: str
+    ok: bool
+    event: Optional[Event] = None
+    error: Optional[str] = None
+
+class BatchEventsResponse(BaseModel):
+    created: int
+    failed: int
+    results: List[BatchEventResult]
+
+def _event_from_google(it: Dict[str, Any], summary: str = '(no title)') -> Event:
+    start = it.get('start', {}).get('dateTime') or it.get('start', {}).get('date')
+    end = it.get('end', {}).get('dateTime') or it.get('end', {}).get('date')
+    tz = it.get('start', {}).get('timeZone')
+    return Event(id=it.get('id'), summary=it.get('summary') or summary, start=start, end=end, timeZone=tz)
+
 @router.get("/calendar/events", response_model=List[Event])
-async def calendar_events():
+async def calendar_events(limit: int = Query(50, ge=1, le=2500), refresh: bool = False):
+    """
+    Upcoming events from the local calendar mirror. The mirror syncs with
+    Google when it is older than GOOGLE_CALENDAR_SYNC_INTERVAL_S, or now
+    with `refresh`.
+    """
     try:
-        items = gcal_list()
-        events: List[Event] = []
-        for it in items:
-            start = it.get('start', {}).get('dateTime') or it.get('start', {}).get('date')
-            end = it.get('end', {}).get('dateTime') or it.get('end', {}).get('date')
-            tz = it.get('start', {}).get('timeZone')
-            events.append(Event(id=it.get('id'), summary=it.get('summary') or '(no title)', start=start, end=end, timeZone=tz))
-        return events
+        items = await run_in_threadpool(calendar_sync.upcoming, limit, refresh)
+        return [_event_from_google(it) for it in items]
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Calendar error: {e}")
 
+@router.post("/calendar/sync")
+async def calendar_sync_now():
+    """Sync the calendar mirror now: incremental, or full on the first run or an expired token"""
+    try:
+        return await run_in_threadpool(calendar_sync.sync)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Calendar sync error: {e}")
+
 @router.post("/calendar/events", response_model=Event)
 async def calendar_create(ev: EventCreate):
     try:
@@ -136,59 +306,159 @@ async def calendar_create(ev: EventCreate):
             'time': ev.start,
             'end_time': ev.end,
         }
-        created = gcal_create(payload)
-        start = created.get('start', {}).get('dateTime') or created.get('start', {}).get('date')
-        end = created.get('end', {}).get('dateTime') or created.get('end', {}).get('date')
-        tz = created.get('start', {}).get('timeZone')
-        return Event(id=created.get('id'), summary=created.get('summary') or ev.summary, start=start, end=end, timeZone=tz)
+        # Blocking HTTP; the client keeps one service per worker thread
+        created = await run_in_threadpool(gcal_create, payload)
+        # The mirror's lock can be held by a full sync, so record off the loop too
+        await run_in_threadpool(calendar_sync.record, [created])
+        return _event_from_google(created, summary=ev.summary)
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Calendar create error: {e}")
 
+@router.post("/calendar/events/batch", response_model=BatchEventsResponse)
+async def calendar_create_batch(req: BatchEventsRequest):
+    """
+    Create an event for each parsed task through Calendar batch requests
+    (up to 50 inserts per round trip). Tasks with a time become events of
+    `durationMinutes`; tasks with only a deadline become all-day events.
+    Each task gets its own result, so one bad task does not fail the rest.
+    """
+    results: List[BatchEventResult] = []
+    events: List[Dict[str, Any]] = []
+    pending: List[BatchEventResult] = []
+    for index, t in enumerate(req.tasks):
+        result = BatchEventResult(index=index, task=t.task, ok=False)
+        results.append(result)
+        try:
+            events.append(task_to_event(t.dict(), req.timeZone or "UTC", timedelta(minutes=req.durationMinutes)))
+            pending.append(result)
+        except ValueError as e:
+            result.error = str(e)
+    if events:
+        try:
+            # Blocking HTTP; the client keeps one service per worker thread
+            inserted = await run_in_threadpool(gcal_insert_many, events)
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=f"Calendar batch error: {e}")
+        await run_in_threadpool(calendar_sync.record, [outcome["event"] for outcome in inserted if "event" in outcome])
+        for result, outcome in zip(pending, inserted):
+            if "event" in outcome:
+                result.ok = True
+                result.event = _event_from_google(outcome["event"], summary=result.task)
+            else:
+                result.error = outcome["error"]
+    created = sum(r.ok for r in results)
+    return BatchEventsResponse(created=created, failed=len(results) - created, results=results)
+
 
 # ----------------- Finance Analyze -----------------
 class FinanceRequest(BaseModel):
     csvText: str
+    rollups: bool = False
+    persist: bool = False
+    parallel: bool = False
+
+class Rollup(BaseModel):
+    total: float
+    transactions: int
+    byCategory: Optional[Dict[str, float]] = None
 
 class FinanceSummary(BaseModel):
     total: float
     byCategory: Dict[str, float]
     transactions: int
-
-def _cat_for_desc(desc: str) -> str:
-    d = desc.lower()
-    if any(k in d for k in ["uber", "fuel", "gas", "petrol", "omv"]):
-        return "Transport"
-    if any(k in d for k in ["kaufland", "carrefour", "mega", "lidl", "food", "restaurant"]):
-        return "Groceries/Food"
-    if any(k in d for k in ["rent", "util", "electric", "water", "internet", "netflix"]):
-        return "Utilities/Home"
-    if any(k in d for k in ["pharma", "doctor", "clinic"]):
-        return "Health"
-    return "Other"
+    monthly: Optional[Dict[str, Rollup]] = None
+    weekly: Optional[Dict[str, Rollup]] = None
+    byMerchant: Optional[Dict[str, Rollup]] = None
+    undated: Optional[int] = None
+    datasetId: Optional[str] = None
 
 @router.post("/finance/analyze", response_model=FinanceSummary)
 async def finance_analyze(req: FinanceRequest):
+    """
+    Totals of a CSV export. With `rollups`, also per month, ISO week and
+    merchant; with `persist`, the result is saved under `datasetId` for
+    GET /finance/rollups/{datasetId}, and the same file is not rescanned.
+    With `parallel`, chunks of the file are parsed in FINANCE_WORKERS
+    processes, for multi-hundred-MB archives.
+    """
+    async def analyze(rollups: bool):
+        if req.parallel:
+            return await run_in_threadpool(analyze_parallel, req.csvText, rollups)
+        return await run_in_threadpool(analyze_csv, req.csvText, rollups=rollups)
+
+    try:
+        if not req.persist:
+            return FinanceSummary(**await analyze(req.rollups))
+        dataset = dataset_id(hashlib.sha256(req.csvText.encode("utf-8")))
+        summary = await run_in_threadpool(rollup_store().get, dataset)
+        if summary is None:
+            summary = dict(await analyze(True), datasetId=dataset)
+            await run_in_threadpool(rollup_store().put, dataset, summary)
+        return FinanceSummary(**summary)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Finance analyze error: {e}")
+
+@router.post("/finance/analyze/stream", response_model=FinanceSummary)
+async def finance_analyze_stream(
+    request: Request, encoding: Optional[str] = None, rollups: bool = False, persist: bool = False
+):
+    """
+    Streaming variant of /finance/analyze for large exports.
+
+    The request body is the raw CSV file (e.g. curl --data-binary @export.csv),
+    read and aggregated chunk by chunk instead of being buffered. The
+    encoding comes from `encoding`, the Content-Type charset, a BOM, or is
+    detected as UTF-8 or Windows-1250. `rollups` and `persist` are as for
+    /finance/analyze.
+    """
+    encoding = encoding or request.headers.get("content-type", "").partition("charset=")[2].split(";")[0].strip(' "') or None
     try:
-        f = io.StringIO(req.csvText)
-        reader = csv.DictReader(f)
-        total = 0.0
-        by_cat: Dict[str, float] = {}
-        count = 0
-        for row in reader:
-            try:
-                amt = float(row.get('amount') or row.get('Amount') or 0)
-            except ValueError:
-                # Try to normalize comma decimals
-                amt = float((row.get('amount') or '0').replace(',', '.'))
-            desc = row.get('description') or row.get('Description') or ''
-            cat = _cat_for_desc(desc)
-            total += amt
-            by_cat[cat] = by_cat.get(cat, 0.0) + amt
-            count += 1
-        return FinanceSummary(total=round(total, 2), byCategory={k: round(v, 2) for k, v in by_cat.items()}, transactions=count)
+        if encoding:
+            codecs.lookup(encoding)
+        analyzer = await analyze_stream(request.stream(), encoding, rollups=rollups or persist)
+        summary = analyzer.close()
+        if persist:
+            summary["datasetId"] = dataset_id(analyzer.digest)
+            await run_in_threadpool(rollup_store().put, summary["datasetId"], summary)
+        return FinanceSummary(**summary)
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Finance analyze error: {e}")
 
+@router.get("/finance/rollups/{dataset}", response_model=FinanceSummary)
+async def finance_rollups(dataset: str):
+    """A summary saved by /finance/analyze with persist"""
+    summary = await run_in_threadpool(rollup_store().get, dataset)
+    if summary is None:
+        raise HTTPException(status_code=404, detail="Dataset not found")
+    return FinanceSummary(**summary)
+
+class LedgerImport(BaseModel):
+    csvText: str
+
+class LedgerImportResult(BaseModel):
+    added: int
+    duplicates: int
+    summary: FinanceSummary
+
+@router.post("/finance/ledger", response_model=LedgerImportResult)
+async def finance_ledger_import(req: LedgerImport, user: str = DEFAULT_USER):
+    """
+    Add an export to the user's transaction ledger. Transactions already
+    there (e.g. from an overlapping export) are skipped; only new rows are
+    stored and added to the running totals.
+    """
+    try:
+        counts = await run_in_threadpool(finance_ledger().add_csv, user, req.csvText)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Finance ledger error: {e}")
+    summary = await run_in_threadpool(finance_ledger().summary, user)
+    return LedgerImportResult(**counts, summary=FinanceSummary(**summary))
+
+@router.get("/finance/ledger", response_model=FinanceSummary)
+async def finance_ledger_summary(user: str = DEFAULT_USER):
+    """Totals, per category and per month, of everything in the user's ledger"""
+    return FinanceSummary(**await run_in_threadpool(finance_ledger().summary, user))
+
 
 # ----------------- Document Scanner -----------------
 class DocumentExtractRequest(BaseModel):
@@ -202,26 +472,123 @@ class DocumentExtractResponse(BaseModel):
     entities: List[Entity]
     tasks: List[Task]
 
+def _entity_matches(text: str) -> List[Tuple[int, int, Entity]]:
+    """(start, end, entity) of every entity in the text, grouped by type."""
+    matches: List[Tuple[int, int, Entity]] = []
+    # Amounts like 1,234.56 or 1234,56
+    for m in re.finditer(r"\b\d{1,3}(?:[.,]\d{3})*(?:[.,]\d{2})\b|\b\d+[.,]\d{2}\b", text):
+        matches.append((m.start(), m.end(), Entity(type="amount", value=m.group(0))))
+    # Dates ISO-ish or dd Month
+    for m in re.finditer(r"\b\d{4}-\d{2}-\d{2}\b|\b\d{1,2}[/-]\d{1,2}[/-]\d{2,4}\b|\b\d{1,2}\s+[A-Za-zăâîșțA-ZĂÂÎȘȚ]+\b", text):
+        matches.append((m.start(), m.end(), Entity(type="date", value=m.group(0))))
+    # IBAN RO...
+    for m in re.finditer(r"\bRO\w{2}\s?\w{4}(?:\s?\w{4}){3,}\b", text):
+        matches.append((m.start(), m.end(), Entity(type="iban", value=m.group(0))))
+    return matches
+
+def _extract_entities(text: str) -> List[Entity]:
+    return [entity for _, _, entity in _entity_matches(text)]
+
+# Text held without a line break before it is scanned anyway (cut at whitespace)
+MAX_PENDING_CHARS = 1 << 16
+# Most of the previous line that is scanned again with the next lines
+MAX_OVERLAP_CHARS = 256
+
+class _EntityScanner:
+    """
+    Entities of a document that arrives in pieces. Complete lines are
+    scanned as they arrive, together with the line before them (up to
+    MAX_OVERLAP_CHARS), so a date or IBAN broken over one line break is
+    still found; matches that end within that line were reported by the
+    previous scan.
+
+    Unlike a scan of the whole text, this misses entities spread over
+    three or more lines (an IBAN with one group per line, or a day and
+    month with a blank line between), and reports an entity continued on
+    the next line after it already matched on its own (an IBAN followed by
+    one more group) as first found.
+    """
+
+    def __init__(self):
+        self._pending = ""
+        self._overlap = ""
+        # Per entity type, where the last reported one ends, relative to _overlap
+        self._reported: Dict[str, int] = {}
+
+    def feed(self, text: str) -> List[Entity]:
+        self._pending += text
+        cut = self._pending.rfind("\n") + 1
+        if not cut and len(self._pending) > MAX_PENDING_CHARS:
+            # No line break in sight: cut after the last whitespace so words stay whole
+            cut = max(self._pending.rfind(" ", 0, MAX_PENDING_CHARS), self._pending.rfind("\t", 0, MAX_PENDING_CHARS)) + 1
+            cut = cut or MAX_PENDING_CHARS
+        if not cut:
+            return []
+        block, self._pending = self._pending[:cut], self._pending[cut:]
+        return self._scan(block)
+
+    def close(self) -> List[Entity]:
+        block, self._pending = self._pending, ""
+        return self._scan(block) if block else []
+
+    def _scan(self, block: str) -> List[Entity]:
+        window = self._overlap + block
+        found = []
+        for start, end, entity in _entity_matches(window):
+            if end <= len(self._overlap) or start < self._reported.get(entity.type, 0):
+                continue
+            found.append(entity)
+            self._reported[entity.type] = max(end, self._reported.get(entity.type, 0))
+        # Keep the last line, line break included, for the next scan
+        keep = max(window.rfind("\n", 0, len(window) - 1) + 1, len(window) - MAX_OVERLAP_CHARS)
+        self._overlap = window[keep:]
+        self._reported = {kind: end - keep for kind, end in self._reported.items() if end > keep}
+        return found
+
 @router.post("/documents/extract", response_model=DocumentExtractResponse)
 async def documents_extract(req: DocumentExtractRequest):
     try:
         text = req.text
-        entities: List[Entity] = []
-        # Amounts like 1,234.56 or 1234,56
-        for m in re.finditer(r"\b\d{1,3}(?:[.,]\d{3})*(?:[.,]\d{2})\b|\b\d+[.,]\d{2}\b", text):
-            entities.append(Entity(type="amount", value=m.group(0)))
-        # Dates ISO-ish or dd Month
-        for m in re.finditer(r"\b\d{4}-\d{2}-\d{2}\b|\b\d{1,2}[/-]\d{1,2}[/-]\d{2,4}\b|\b\d{1,2}\s+[A-Za-zăâîșțA-ZĂÂÎȘȚ]+\b", text):
-            entities.append(Entity(type="date", value=m.group(0)))
-        # IBAN RO...
-        for m in re.finditer(r"\bRO\w{2}\s?\w{4}(?:\s?\w{4}){3,}\b", text):
-            entities.append(Entity(type="iban", value=m.group(0)))
+        entities = _extract_entities(text)
         # Derive tasks using lightweight extractor
         task_dicts = extract_tasks(text)
         return DocumentExtractResponse(entities=entities, tasks=[Task(**t) for t in task_dicts])
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Document extract error: {e}")
 
+def _ndjson_records(entities: List[Entity], tasks: List[Dict[str, Any]]) -> str:
+    lines = [json.dumps({"entity": e.dict()}, ensure_ascii=False) for e in entities]
+    lines.extend(json.dumps({"task": Task(**t).dict()}, ensure_ascii=False) for t in tasks)
+    return "".join(line + "\n" for line in lines)
+
+async def _document_ndjson(body: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    task_stream = TaskStream()
+    entities = _EntityScanner()
+    async for raw in body:
+        text = decoder.decode(raw)
+        records = _ndjson_records(entities.feed(text), task_stream.feed(text))
+        if records:
+            yield records
+    text = decoder.decode(b"", final=True)
+    records = _ndjson_records(
+        entities.feed(text) + entities.close(),
+        task_stream.feed(text) + task_stream.close(),
+    )
+    if records:
+        yield records
+
+@router.post("/documents/extract/stream")
+async def documents_extract_stream(request: Request):
+    """
+    Streaming variant of /documents/extract for very large documents.
+
+    The request body is the raw document text (UTF-8). The response is
+    NDJSON: one {"entity": ...} or {"task": ...} object per line, emitted
+    as the document is read instead of after it has been fully buffered.
+    """
+    return StreamingResponse(_document_ndjson(request.stream()), media_type="application/x-ndjson")
+
 
 # ----------------- Email Organizer -----------------
 class Email(BaseModel):
@@ -0,0 +1,51 @@
+from typing import Any, AsyncIterable, AsyncIterator, Dict, Iterable, List
+import csv
+import io
+import json
+
+# Column order of CSV exports; NDJSON records carry the same keys
+EXPORT_FIELDS = ("id", "task", "time", "category", "deadline")
+
+FORMATS = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+}
+
+
+def _csv_lines(rows: Iterable[Dict[str, Any]], header: bool = False) -> str:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS, extrasaction="ignore", lineterminator="\r\n")
+    if header:
+        writer.writeheader()
+    writer.writerows(rows)
+    return buffer.getvalue()
+
+
+def _ndjson_lines(rows: Iterable[Dict[str, Any]]) -> str:
+    return "".join(
+        json.dumps({field: row.get(field) for field in EXPORT_FIELDS}, ensure_ascii=False) + "\n" for row in rows
+    )
+
+
+async def export_chunks(
+    tasks: AsyncIterable[Dict[str, Any]], fmt: str = "csv", rows_per_chunk: int = 500
+) -> AsyncIterator[bytes]:
+    """
+    Encode tasks as CSV (with a header row) or NDJSON, yielding UTF-8 chunks
+    of up to `rows_per_chunk` rows. Only one chunk is held at a time, so a
+    response streaming these never holds the whole export.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format {fmt!r}; expected one of {', '.join(FORMATS)}")
+    if fmt == "csv":
+        # The header goes out even when there are no tasks
+        yield _csv_lines([], header=True).encode("utf-8")
+    encode = _csv_lines if fmt == "csv" else _ndjson_lines
+    pending: List[Dict[str, Any]] = []
+    async for task in tasks:
+        pending.append(task)
+        if len(pending) >= rows_per_chunk:
+            yield encode(pending).encode("utf-8")
+            pending = []
+    if pending:
+        yield encode(pending).encode("utf-8")
@@ -0,0 +1,271 @@
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from datetime import date, datetime, timezone
+import logging
+import os
+
+from app.nlp.dates import parse_date
+
+logger = logging.getLogger(__name__)
+
+# Fields returned by queries; anything else stored on a task stays in the database
+TASK_FIELDS = ("task", "time", "category", "deadline")
+_PROJECTION = {field: 1 for field in TASK_FIELDS + ("deadline_text",)}
+
+# Tasks without a user (single-user installs) are stored under this one
+DEFAULT_USER = "default"
+
+# pymongo.ASCENDING and pymongo.TEXT; pymongo and bson are only imported
+# once the database is used, so the API can be imported without them
+ASCENDING = 1
+TEXT = "text"
+
+# Every query filters on user first, so it leads each compound index.
+# (keys, options) of each pymongo.IndexModel
+TASK_INDEXES = [
+    # Paging through a user's tasks
+    ([("user", ASCENDING), ("_id", ASCENDING)], {"name": "user_id"}),
+    # Tasks due in a date range
+    ([("user", ASCENDING), ("deadline", ASCENDING)], {"name": "user_deadline"}),
+    # Tasks of one category due in a date range
+    ([("user", ASCENDING), ("category", ASCENDING), ("deadline", ASCENDING)], {"name": "user_category_deadline"}),
+    # Word search; no stemming or stop words since tasks mix Romanian and English
+    ([("task", TEXT)], {"name": "task_text", "default_language": "none"}),
+]
+
+
+class StorageUnavailable(RuntimeError):
+    """Raised when the task store is not configured or not connected."""
+
+
+class PartialInsert(RuntimeError):
+    """
+    Raised when a bulk insert stored only some of the tasks: `inserted`
+    are the stored ones (with ids), `errors` the failed ones as
+    {"index", "message"} with their position in the request.
+    """
+
+    def __init__(self, inserted: List[Dict[str, Any]], errors: List[Dict[str, Any]]):
+        super().__init__(f"Stored {len(inserted)} of {len(inserted) + len(errors)} tasks")
+        self.inserted = inserted
+        self.errors = errors
+
+
+def _object_id(value: str):
+    from bson import ObjectId
+    from bson.errors import InvalidId
+
+    try:
+        return ObjectId(value)
+    except (InvalidId, TypeError):
+        raise ValueError(f"Invalid task id: {value!r}")
+
+
+def utc_midnight(day: date) -> datetime:
+    return datetime(day.year, day.month, day.day, tzinfo=timezone.utc)
+
+
+def parse_deadline(value: Optional[str], today: Optional[date] = None) -> Optional[datetime]:
+    """BSON-ready date (UTC midnight) for a deadline string, or None (see parse_date)."""
+    parsed = parse_date(value, today)
+    return utc_midnight(parsed) if parsed else None
+
+
+def _to_document(task: Dict[str, Any], user: str) -> Dict[str, Any]:
+    doc = {field: task.get(field) for field in TASK_FIELDS}
+    doc["user"] = user
+    deadline = task.get("deadline")
+    doc["deadline"] = parse_deadline(deadline) if isinstance(deadline, str) else deadline
+    # Keep what the user wrote when it is not a date we understand
+    doc["deadline_text"] = deadline if deadline and doc["deadline"] is None else None
+    return doc
+
+
+def _to_task(doc: Dict[str, Any]) -> Dict[str, Any]:
+    task = {field: doc.get(field) for field in TASK_FIELDS}
+    deadline = doc.get("deadline")
+    task["deadline"] = deadline.strftime("%Y-%m-%d") if isinstance(deadline, datetime) else doc.get("deadline_text")
+    task["id"] = str(doc["_id"])
+    return task
+
+
+async def iter_tasks(cursor) -> AsyncIterator[Dict[str, Any]]:
+    """Tasks from a repository cursor, one at a time as its batches arrive."""
+    async for doc in cursor:
+        yield _to_task(doc)
+
+
+class TaskRepository:
+    """
+    Async task store on MongoDB (Motor).
+
+    One client is shared by the whole process; Motor multiplexes concurrent
+    requests over its connection pool, sized with MONGO_MAX_POOL_SIZE /
+    MONGO_MIN_POOL_SIZE. Lists are paged by _id (a cursor, not an offset)
+    so each page is an index range scan however deep the client pages.
+    """
+
+    def __init__(self, uri: Optional[str] = None, collection: str = "tasks"):
+        self._uri = uri
+        self._collection_name = collection
+        self._client = None
+        self._collection = None
+
+    def connect(self) -> None:
+        """Create the client; a no-op without MONGO_URI, leaving storage unavailable."""
+        uri = self._uri or os.getenv("MONGO_URI")
+        if not uri or self._client is not None:
+            return
+        # Imported here so processes that never touch the database skip it
+        from motor.motor_asyncio import AsyncIOMotorClient
+
+        self._client = AsyncIOMotorClient(
+            uri,
+            maxPoolSize=int(os.getenv("MONGO_MAX_POOL_SIZE", "50")),
+            minPoolSize=int(os.getenv("MONGO_MIN_POOL_SIZE", "5")),
+            maxIdleTimeMS=int(os.getenv("MONGO_MAX_IDLE_MS", "60000")),
+            # Fail fast instead of queueing requests behind an exhausted pool
+            waitQueueTimeoutMS=int(os.getenv("MONGO_WAIT_QUEUE_TIMEOUT_MS", "2000")),
+            serverSelectionTimeoutMS=int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", "5000")),
+            tz_aware=True,
+        )
+        self._collection = self._client.get_default_database()[self._collection_name]
+        logger.info(f"Task repository connected ({self._collection.full_name})")
+
+    @property
+    def configured(self) -> bool:
+        return self._collection is not None
+
+    async def ensure_indexes(self) -> List[str]:
+        """Create the TASK_INDEXES that are missing; existing ones are left alone."""
+        from pymongo import IndexModel
+
+        names = await self.collection.create_indexes([IndexModel(keys, **options) for keys, options in TASK_INDEXES])
+        logger.info(f"Task indexes ensured: {', '.join(names)}")
+        return names
+
+    def close(self) -> None:
+        if self._client is not None:
+            self._client.close()
+        self._client = None
+        self._collection = None
+
+    @property
+    def collection(self):
+        if self._collection is None:
+            raise StorageUnavailable("Task storage is not configured (set MONGO_URI)")
+        return self._collection
+
+    async def insert_many(self, tasks: List[Dict[str, Any]], user: str = DEFAULT_USER) -> List[Dict[str, Any]]:
+        """
+        Store tasks in one round trip; returns them with their new ids.
+        Raises PartialInsert when only some of them could be stored.
+        """
+        from pymongo.errors import BulkWriteError
+
+        if not tasks:
+            return []
+        docs = [_to_document(task, user) for task in tasks]
+        try:
+            # Unordered: the server may apply the inserts in parallel, and one
+            # failed document does not stop the others
+            await self.collection.insert_many(docs, ordered=False)
+        except BulkWriteError as e:
+            errors = [
+                {"index": error["index"], "message": error.get("errmsg", "")}
+                for error in e.details.get("writeErrors", [])
+            ]
+            failed = {error["index"] for error in errors}
+            inserted = [_to_task(doc) for i, doc in enumerate(docs) if i not in failed]
+            raise PartialInsert(inserted, errors) from e
+        # insert_many fills in each document's _id
+        return [_to_task(doc) for doc in docs]
+
+    async def list(
+        self, limit: int = 50, after: Optional[str] = None, user: str = DEFAULT_USER
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        One page of tasks in _id (roughly insertion) order, starting after the task id
+        `after`. Returns the page and the cursor for the next one (None on
+        the last page).
+        """
+        query: Dict[str, Any] = {"user": user}
+        if after:
+            query["_id"] = {"$gt": _object_id(after)}
+        # One extra document tells whether another page exists
+        cursor = self.collection.find(query, _PROJECTION).sort("_id", ASCENDING).limit(limit + 1)
+        docs = await cursor.to_list(length=limit + 1)
+        has_more = len(docs) > limit
+        tasks = [_to_task(doc) for doc in docs[:limit]]
+        return tasks, (tasks[-1]["id"] if has_more else None)
+
+    def due_cursor(
+        self,
+        start: datetime,
+        end: datetime,
+        category: Optional[str] = None,
+        user: str = DEFAULT_USER,
+        limit: int = 500,
+    ):
+        """
+        Cursor over tasks due in [start, end), soonest first, optionally of
+        one category. Served by user_deadline, or user_category_deadline
+        with a category; the sort comes from the index, not memory.
+        """
+        query: Dict[str, Any] = {"user": user, "deadline": {"$gte": start, "$lt": end}}
+        if category:
+            query["category"] = category
+        return self.collection.find(query, _PROJECTION).sort("deadline", ASCENDING).limit(limit)
+
+    async def due(self, start: datetime, end: datetime, category: Optional[str] = None,
+                  user: str = DEFAULT_USER, limit: int = 500) -> List[Dict[str, Any]]:
+        docs = await self.due_cursor(start, end, category, user, limit).to_list(length=limit)
+        return [_to_task(doc) for doc in docs]
+
+    def search_cursor(self, text: str, user: str = DEFAULT_USER, limit: int = 50):
+        """Cursor over tasks matching words of `text` (task_text index), best match first."""
+        projection = dict(_PROJECTION, score={"$meta": "textScore"})
+        return (
+            self.collection.find({"$text": {"$search": text}, "user": user}, projection)
+            .sort([("score", {"$meta": "textScore"})])
+            .limit(limit)
+        )
+
+    async def search(self, text: str, user: str = DEFAULT_USER, limit: int = 50) -> List[Dict[str, Any]]:
+        docs = await self.search_cursor(text, user, limit).to_list(length=limit)
+        return [_to_task(doc) for doc in docs]
+
+    def export_cursor(
+        self,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        category: Optional[str] = None,
+        user: str = DEFAULT_USER,
+        batch_size: Optional[int] = None,
+    ):
+        """
+        Cursor over every task of `user`, optionally due in [start, end) and
+        of one category. With a date range the tasks come soonest first
+        (user_deadline / user_category_deadline), otherwise in _id order
+        (user_id). Documents arrive from the server `batch_size` at a time
+        (TASK_EXPORT_BATCH_SIZE), so memory does not grow with the result.
+        """
+        query: Dict[str, Any] = {"user": user}
+        if start or end:
+            query["deadline"] = {}
+            if start:
+                query["deadline"]["$gte"] = start
+            if end:
+                query["deadline"]["$lt"] = end
+        if category:
+            query["category"] = category
+        sort_key = "deadline" if "deadline" in query else "_id"
+        batch_size = batch_size or int(os.getenv("TASK_EXPORT_BATCH_SIZE", "1000"))
+        return self.collection.find(query, _PROJECTION).sort(sort_key, ASCENDING).batch_size(batch_size)
+
+    async def delete(self, task_id: str, user: str = DEFAULT_USER) -> bool:
+        result = await self.collection.delete_one({"_id": _object_id(task_id), "user": user})
+        return result.deleted_count > 0
+
+
+# Shared repository; connected and closed by the app's lifespan
+task_repository = TaskRepository()
@@ -0,0 +1,349 @@
+from array import array
+from datetime import date
+from operator import itemgetter, methodcaller
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+import csv
+import io
+import re
+
+# Header names accepted for each column, as bank exports spell them
+AMOUNT_COLUMNS = ("amount", "Amount")
+DESCRIPTION_COLUMNS = ("description", "Description")
+DATE_COLUMNS = ("date", "Date", "data", "Data")
+
+CATEGORIES = ("Transport", "Groceries/Food", "Utilities/Home", "Health", "Other")
+
+# ISO dates, or day-first dates as Romanian banks write them (31.01.2024, 31/01/2024),
+# optionally followed by a time
+_DATE_RE = re.compile(r"\s*(?:(\d{4})-(\d{1,2})-(\d{1,2})|(\d{1,2})[./-](\d{1,2})[./-](\d{4}))(?:[ T].*)?")
+# Card references and terminal numbers that make one merchant look like many
+_MERCHANT_NOISE_RE = re.compile(r"\S*\d\S*")
+
+_COMMA_TO_DOT = methodcaller("replace", ",", ".")
+
+# A quote that opens a quoted field: one at the start of a field. Anywhere
+# else csv.reader keeps it as a literal character (TV 5" screen).
+_OPENING_QUOTE_RE = re.compile(r'(?<![^,\r\n])"')
+
+
+def categorize_description(desc: str) -> str:
+    d = desc.lower()
+    if any(k in d for k in ["uber", "fuel", "gas", "petrol", "omv"]):
+        return "Transport"
+    if any(k in d for k in ["kaufland", "carrefour", "mega", "lidl", "food", "restaurant"]):
+        return "Groceries/Food"
+    if any(k in d for k in ["rent", "util", "electric", "water", "internet", "netflix"]):
+        return "Utilities/Home"
+    if any(k in d for k in ["pharma", "doctor", "clinic"]):
+        return "Health"
+    return "Other"
+
+
+def parse_transaction_date(value: str) -> Optional[date]:
+    match = _DATE_RE.fullmatch(value)
+    if not match:
+        return None
+    if match.group(1):
+        year, month, day = int(match.group(1)), int(match.group(2)), int(match.group(3))
+    else:
+        day, month, year = int(match.group(4)), int(match.group(5)), int(match.group(6))
+    try:
+        return date(year, month, day)
+    except ValueError:
+        return None
+
+
+def merchant_name(desc: str) -> str:
+    """
+    Merchant for a description, without what changes between payments:
+    "UBER *TRIP 123" -> "UBER", "LIDL 0456 CLUJ" -> "LIDL CLUJ".
+    """
+    name = _MERCHANT_NOISE_RE.sub(" ", desc.split("*", 1)[0])
+    return " ".join(name.split()) or desc.strip() or "(unknown)"
+
+
+def parse_amount(value: str) -> float:
+    """
+    A single amount as written in bank exports: 12.50, 12,50, 1,234.56,
+    1.234,56 or -7 (the last separator is the decimal one). Empty is 0.
+    """
+    text = value.strip().replace(" ", "")
+    if not text:
+        return 0.0
+    comma, dot = text.rfind(","), text.rfind(".")
+    if comma > dot:
+        text = text.replace(".", "").replace(",", ".")
+    elif comma != -1:
+        text = text.replace(",", "")
+    try:
+        return float(text)
+    except ValueError:
+        raise ValueError(f"Invalid amount {value!r}") from None
+
+
+def parse_amounts(values: Sequence[str]) -> array:
+    """
+    Amount column as a typed array of doubles. Plain and comma decimals
+    convert in one pass over the column; otherwise each distinct string is
+    normalized once and the result broadcast to every row that has it.
+    """
+    try:
+        return array("d", map(float, values))
+    except ValueError:
+        pass
+    try:
+        return array("d", map(float, map(_COMMA_TO_DOT, values)))
+    except ValueError:
+        pass
+    parsed = {value: parse_amount(value) for value in set(values)}
+    return array("d", map(parsed.__getitem__, values))
+
+
+def _column(rows: List[List[str]], index: Optional[int]) -> List[str]:
+    if index is None:
+        return [""] * len(rows)
+    try:
+        return list(map(itemgetter(index), rows))
+    except IndexError:
+        # Short rows: a missing field reads as empty
+        return [row[index] if index < len(row) else "" for row in rows]
+
+
+class FinanceColumns:
+    """One batch of transactions as columns: amounts (array of doubles) and descriptions."""
+
+    def __init__(self, amounts: array, descriptions: List[str], dates: Optional[List[str]] = None):
+        self.amounts = amounts
+        self.descriptions = descriptions
+        self.dates = dates if dates is not None else [""] * len(amounts)
+
+    @classmethod
+    def from_rows(cls, header: Sequence[str], rows: List[List[str]]) -> "FinanceColumns":
+        """Columns from csv.reader rows under `header`; blank lines must already be dropped."""
+        def index(names):
+            return next((header.index(c) for c in names if c in header), None)
+        return cls(
+            parse_amounts(_column(rows, index(AMOUNT_COLUMNS))),
+            _column(rows, index(DESCRIPTION_COLUMNS)),
+            _column(rows, index(DATE_COLUMNS)),
+        )
+
+    def __len__(self) -> int:
+        return len(self.amounts)
+
+
+class _Buckets:
+    """Rollup buckets (months, weeks, merchants) numbered in order of first appearance."""
+
+    def __init__(self):
+        self.ids: Dict[str, int] = {}
+        self.totals: List[float] = []
+        self.counts: List[int] = []
+        # Per bucket, a total per entry of CATEGORIES
+        self.by_category: List[List[float]] = []
+        # Display name per key, when keys are normalized
+        self.labels: Dict[str, str] = {}
+
+    def id(self, key: str) -> int:
+        bucket = self.ids.get(key)
+        if bucket is None:
+            bucket = self.ids[key] = len(self.totals)
+            self.totals.append(0.0)
+            self.counts.append(0)
+            self.by_category.append([0.0] * len(CATEGORIES))
+        return bucket
+
+    def merge(self, other: "_Buckets") -> None:
+        for key, label in other.labels.items():
+            self.labels.setdefault(key, label)
+        for key, theirs in other.ids.items():
+            ours = self.id(key)
+            self.totals[ours] += other.totals[theirs]
+            self.counts[ours] += other.counts[theirs]
+            self.by_category[ours] = [a + b for a, b in zip(self.by_category[ours], other.by_category[theirs])]
+
+    def rollup(self, with_categories: bool = True) -> Dict[str, Dict[str, Any]]:
+        out = {}
+        for key, bucket in sorted(self.ids.items()):
+            entry: Dict[str, Any] = {"total": round(self.totals[bucket], 2), "transactions": self.counts[bucket]}
+            if with_categories:
+                entry["byCategory"] = {
+                    category: round(amount, 2)
+                    for category, amount in zip(CATEGORIES, self.by_category[bucket]) if amount
+                }
+            out[self.labels.get(key, key)] = entry
+        return out
+
+
+class FinanceAggregate:
+    """
+    Running totals per category. Batches can be added as they are parsed
+    and aggregates merged, so a file can be analyzed in pieces.
+
+    With `rollups`, the same pass also totals transactions per month, ISO
+    week and merchant. Every distinct date and description is resolved to
+    bucket numbers once; rows then only index into per-bucket lists.
+    """
+
+    def __init__(self, rollups: bool = False):
+        self.rollups = rollups
+        self.total = 0.0
+        self.by_category: Dict[str, float] = {}
+        self.transactions = 0
+        # Category of every description seen so far
+        self._categories: Dict[str, str] = {}
+        if rollups:
+            self.months, self.weeks, self.merchants = _Buckets(), _Buckets(), _Buckets()
+            self.undated = 0
+            # Distinct date -> (month, week) buckets (None if not a date);
+            # distinct description -> (category number, merchant bucket)
+            self._date_buckets: Dict[str, Optional[Tuple[int, int]]] = {}
+            self._description_buckets: Dict[str, Tuple[int, int]] = {}
+
+    def add(self, columns: FinanceColumns) -> "FinanceAggregate":
+        categories = self._categories
+        for desc in set(columns.descriptions).difference(categories):
+            categories[desc] = categorize_description(desc)
+        if self.rollups:
+            self._add_with_rollups(columns)
+        else:
+            # Rows are summed in file order, so totals match a row-by-row loop exactly
+            by_category = self.by_category
+            get = by_category.get
+            for category, amount in zip(map(categories.__getitem__, columns.descriptions), columns.amounts):
+                by_category[category] = get(category, 0.0) + amount
+        self.total += sum(columns.amounts)
+        self.transactions += len(columns)
+        return self
+
+    def _add_with_rollups(self, columns: FinanceColumns) -> None:
+        date_buckets, description_buckets = self._date_buckets, self._description_buckets
+        for value in set(columns.dates).difference(date_buckets):
+            day = parse_transaction_date(value)
+            if day is None:
+                date_buckets[value] = None
+            else:
+                iso = day.isocalendar()
+                date_buckets[value] = (self.months.id(f"{day.year:04d}-{day.month:02d}"),
+                                       self.weeks.id(f"{iso[0]:04d}-W{iso[1]:02d}"))
+        # In file order, so a merchant's first spelling is the same however the file is split
+        for desc in dict.fromkeys(columns.descriptions):
+            if desc in description_buckets:
+                continue
+            name = merchant_name(desc)
+            # Merchants are grouped case-insensitively and shown as first spelled
+            key = name.casefold()
+            self.merchants.labels.setdefault(key, name)
+            description_buckets[desc] = (CATEGORIES.index(self._categories[desc]), self.merchants.id(key))
+
+        # Continue the running totals row by row, as the plain path does
+        category_totals = [self.by_category.get(category, 0.0) for category in CATEGORIES]
+        months, weeks, merchants = self.months, self.weeks, self.merchants
+        undated = 0
+        for when, what, amount in zip(
+            map(date_buckets.__getitem__, columns.dates),
+            map(description_buckets.__getitem__, columns.descriptions),
+            columns.amounts,
+        ):
+            category, merchant = what
+            category_totals[category] += amount
+            merchants.totals[merchant] += amount
+            merchants.counts[merchant] += 1
+            merchants.by_category[merchant][category] += amount
+            if when is None:
+                undated += 1
+                continue
+            month, week = when
+            months.totals[month] += amount
+            months.counts[month] += 1
+            months.by_category[month][category] += amount
+            weeks.totals[week] += amount
+            weeks.counts[week] += 1
+        self.undated += undated
+        # Categories keep the order they first appear in, as on the plain path
+        for category in dict.fromkeys(map(self._categories.__getitem__, columns.descriptions)):
+            self.by_category[category] = category_totals[CATEGORIES.index(category)]
+
+    def merge(self, other: "FinanceAggregate") -> "FinanceAggregate":
+        self.total += other.total
+        for category, amount in other.by_category.items():
+            self.by_category[category] = self.by_category.get(category, 0.0) + amount
+        self.transactions += other.transactions
+        self._categories.update(other._categories)
+        if self.rollups and other.rollups:
+            self.months.merge(other.months)
+            self.weeks.merge(other.weeks)
+            self.merchants.merge(other.merchants)
+            self.undated += other.undated
+        return self
+
+    def summary(self) -> Dict[str, object]:
+        """Fields of FinanceSummary, rounded to cents."""
+        summary: Dict[str, object] = {
+            "total": round(self.total, 2),
+            "byCategory": {k: round(v, 2) for k, v in self.by_category.items()},
+            "transactions": self.transactions,
+        }
+        if self.rollups:
+            summary["monthly"] = self.months.rollup()
+            summary["weekly"] = self.weeks.rollup(with_categories=False)
+            merchants = self.merchants.rollup()
+            # Biggest money flows first
+            summary["byMerchant"] = dict(sorted(merchants.items(), key=lambda item: -abs(item[1]["total"])))
+            summary["undated"] = self.undated
+        return summary
+
+
+def read_rows(lines: Iterable[str]) -> Iterable[List[str]]:
+    """csv.reader rows without blank lines (which csv.DictReader skipped too)."""
+    return filter(None, csv.reader(lines))
+
+
+def scan_records(
+    text: str, pos: int = 0, quoted: bool = False, end: Optional[int] = None, first: bool = False
+) -> Tuple[int, int, bool]:
+    """
+    Follow quoting over text[pos:end] the way csv.reader does, `quoted`
+    saying whether `pos` is inside a quoted field. Returns (cut, stop,
+    quoted): cut is the index just past the last newline outside quoted
+    fields (with `first`, the first one), or -1; stop and quoted are where
+    scanning ended, to resume from when more text arrives.
+
+    A quote ending `text` inside a quoted field may be the first half of a
+    "" escape, so scanning stops before it.
+    """
+    end = len(text) if end is None else end
+    cut = -1
+    while pos < end:
+        if quoted:
+            close = text.find('"', pos, end)
+            if close == -1:
+                return cut, end, True
+            if close + 1 == len(text):
+                return cut, close, True
+            if text[close + 1] == '"':
+                pos = close + 2
+            else:
+                pos, quoted = close + 1, False
+            continue
+        match = _OPENING_QUOTE_RE.search(text, pos, end)
+        stop = match.start() if match else end
+        newline = text.find("\n", pos, stop) if first else text.rfind("\n", pos, stop)
+        if newline != -1:
+            cut = newline + 1
+            if first:
+                return cut, cut, False
+        if match is None:
+            return cut, end, False
+        pos, quoted = stop + 1, True
+    return cut, pos, quoted
+
+
+def analyze_csv(text: str, rollups: bool = False) -> Dict[str, object]:
+    """Summary (total, byCategory, transactions, and optionally rollups) of a CSV export with a header row."""
+    rows = read_rows(io.StringIO(text))
+    header = next(rows, None)
+    aggregate = FinanceAggregate(rollups)
+    if header is not None:
+        aggregate.add(FinanceColumns.from_rows(header, list(rows)))
+    return aggregate.summary()
@@ -0,0 +1,177 @@
+from typing import Any, Dict, List, Optional, Set, Tuple
+from hashlib import blake2b
+import io
+import os
+import sqlite3
+import threading
+
+from app.finance.engine import CATEGORIES, FinanceColumns, categorize_description, parse_transaction_date, read_rows
+
+# Month key of transactions whose date could not be read
+UNDATED = ""
+
+# Dates looked up per query, under SQLite's limit on bound parameters
+_LOOKUP_BATCH = 500
+
+
+def transaction_hashes(columns: FinanceColumns) -> List[bytes]:
+    """
+    Content hash per transaction: date, description and amount in cents,
+    plus how many identical transactions came before it in the same file.
+    The same row in two overlapping exports gets the same hash, while two
+    identical payments on one statement (two coffees on a day) stay two.
+    """
+    normalized = {desc: " ".join(desc.split()) for desc in set(columns.descriptions)}
+    seen: Dict[Tuple[str, str, int], int] = {}
+    hashes = []
+    for when, desc, amount in zip(columns.dates, columns.descriptions, columns.amounts):
+        key = (when.strip(), normalized[desc], round(amount * 100))
+        occurrence = seen.get(key, 0)
+        seen[key] = occurrence + 1
+        hashes.append(blake2b(f"{key[0]}\x1f{key[1]}\x1f{key[2]}\x1f{occurrence}".encode("utf-8"), digest_size=16).digest())
+    return hashes
+
+
+class Ledger:
+    """
+    Append-only ledger of imported transactions in SQLite, with totals per
+    month and category kept up to date as rows are added.
+
+    Transactions are deduplicated by content hash on insert, so importing
+    overlapping monthly exports only adds (and only sums) the rows not seen
+    before. Amounts are kept in integer cents, so totals are exact whatever
+    order exports arrive in. A summary reads only the totals table. Kept at
+    FINANCE_LEDGER_PATH, or in memory when unset.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.getenv("FINANCE_LEDGER_PATH") or ":memory:"
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        if self.path != ":memory:":
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS finance_ledger ("
+            " user TEXT NOT NULL,"
+            " hash BLOB NOT NULL,"
+            " date TEXT NOT NULL,"
+            " description TEXT NOT NULL,"
+            " category TEXT NOT NULL,"
+            " amount_cents INTEGER NOT NULL,"
+            " PRIMARY KEY (user, hash))"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS finance_ledger_dates ON finance_ledger (user, date, hash)")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS finance_ledger_totals ("
+            " user TEXT NOT NULL,"
+            " month TEXT NOT NULL,"
+            " category TEXT NOT NULL,"
+            " amount_cents INTEGER NOT NULL,"
+            " transactions INTEGER NOT NULL,"
+            " PRIMARY KEY (user, month, category))"
+        )
+
+    def add(self, user: str, columns: FinanceColumns) -> Dict[str, int]:
+        """Append the transactions not already in the ledger; returns how many were added and skipped."""
+        hashes = transaction_hashes(columns)
+        categories = {desc: categorize_description(desc) for desc in set(columns.descriptions)}
+        # Raw date -> (date as stored and hashed, month)
+        dates: Dict[str, Tuple[str, str]] = {}
+        for value in set(columns.dates):
+            day = parse_transaction_date(value)
+            dates[value] = (value.strip(), f"{day.year:04d}-{day.month:02d}" if day else UNDATED)
+        # (month, category) -> [cents, transactions] of the rows actually added
+        added: Dict[Tuple[str, str], List[int]] = {}
+        new_rows = []
+        with self._lock:
+            # IMMEDIATE takes the write lock first, so another process cannot add the same rows in between
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                known = self._known(user, sorted({stored for stored, _ in dates.values()}))
+                for digest, when, desc, amount in zip(hashes, columns.dates, columns.descriptions, columns.amounts):
+                    if digest in known:
+                        continue
+                    (stored, month), cents, category = dates[when], round(amount * 100), categories[desc]
+                    new_rows.append((user, digest, stored, desc, category, cents))
+                    bucket = added.setdefault((month, category), [0, 0])
+                    bucket[0] += cents
+                    bucket[1] += 1
+                self._db.executemany("INSERT INTO finance_ledger VALUES (?, ?, ?, ?, ?, ?)", new_rows)
+                self._db.executemany(
+                    "INSERT INTO finance_ledger_totals VALUES (?, ?, ?, ?, ?)"
+                    " ON CONFLICT (user, month, category) DO UPDATE SET"
+                    " amount_cents = amount_cents + excluded.amount_cents,"
+                    " transactions = transactions + excluded.transactions",
+                    [(user, month, category, cents, count) for (month, category), (cents, count) in added.items()],
+                )
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+        return {"added": len(new_rows), "duplicates": len(hashes) - len(new_rows)}
+
+    def add_csv(self, user: str, text: str) -> Dict[str, int]:
+        rows = read_rows(io.StringIO(text))
+        header = next(rows, None)
+        if header is None:
+            return {"added": 0, "duplicates": 0}
+        return self.add(user, FinanceColumns.from_rows(header, list(rows)))
+
+    def summary(self, user: str) -> Dict[str, Any]:
+        """Fields of FinanceSummary for everything in the user's ledger: totals, byCategory, monthly, undated."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT month, category, amount_cents, transactions FROM finance_ledger_totals"
+                " WHERE user = ? ORDER BY month", (user,)
+            ).fetchall()
+        by_category: Dict[str, int] = {}
+        monthly: Dict[str, Dict[str, Any]] = {}
+        undated = 0
+        for month, category, cents, count in rows:
+            by_category[category] = by_category.get(category, 0) + cents
+            if month == UNDATED:
+                undated += count
+                continue
+            entry = monthly.setdefault(month, {"total": 0, "transactions": 0, "byCategory": {}})
+            entry["total"] += cents
+            entry["transactions"] += count
+            entry["byCategory"][category] = cents / 100
+        for entry in monthly.values():
+            entry["total"] /= 100
+            entry["byCategory"] = {c: entry["byCategory"][c] for c in CATEGORIES if c in entry["byCategory"]}
+        return {
+            "total": sum(by_category.values()) / 100,
+            "byCategory": {c: by_category[c] / 100 for c in CATEGORIES if c in by_category},
+            "transactions": sum(row[3] for row in rows),
+            "monthly": monthly,
+            "undated": undated,
+        }
+
+    def _known(self, user: str, dates: List[str]) -> Set[bytes]:
+        """
+        Hashes of the user's transactions on any of `dates`: the only ones
+        an upload covering those dates can repeat. One scan of the
+        (user, date, hash) index, so the cost follows the overlap.
+        """
+        known: Set[bytes] = set()
+        for offset in range(0, len(dates), _LOOKUP_BATCH):
+            batch = dates[offset:offset + _LOOKUP_BATCH]
+            known.update(row[0] for row in self._db.execute(
+                f"SELECT hash FROM finance_ledger WHERE user = ? AND date IN ({','.join('?' * len(batch))})",
+                (user, *batch),
+            ))
+        return known
+
+
+_ledger: Optional[Ledger] = None
+_ledger_lock = threading.Lock()
+
+
+def finance_ledger() -> Ledger:
+    """The process-wide ledger, opened on first use."""
+    global _ledger
+    with _ledger_lock:
+        if _ledger is None:
+            _ledger = Ledger()
+        return _ledger
@@ -0,0 +1,111 @@
+from concurrent.futures import Executor, ProcessPoolExecutor
+from itertools import repeat
+from typing import Dict, List, Optional, Sequence, Tuple
+import io
+import multiprocessing
+import os
+import threading
+
+from app.finance.engine import FinanceAggregate, FinanceColumns, read_rows, scan_records
+
+# Size of the pieces a file is cut into, in characters. It does not depend on
+# the worker count, so a file always gives the same partial sums, merged in
+# the same order, and the same result on any number of workers.
+DEFAULT_CHUNK_CHARS = 4 << 20
+
+
+def _record_end(text: str, start: int, target: int) -> int:
+    """
+    End of the first record ending at or after `target`, for a `start`
+    that is itself a record boundary: just past the first newline from
+    `target` on that is outside quoted fields.
+    """
+    _, pos, quoted = scan_records(text, start, end=target)
+    cut, _, _ = scan_records(text, pos, quoted, first=True)
+    return len(text) if cut == -1 else cut
+
+
+def split_records(text: str, chunk_chars: int, start: int = 0) -> List[Tuple[int, int]]:
+    """(start, end) spans of about `chunk_chars` covering text[start:], cut only between records."""
+    spans = []
+    while start < len(text):
+        end = _record_end(text, start, start + max(chunk_chars, 1))
+        spans.append((start, end))
+        start = end
+    return spans
+
+
+def _read_header(text: str) -> Tuple[Optional[List[str]], int]:
+    """The header row and where the data after it starts."""
+    start = 0
+    while start < len(text):
+        end = _record_end(text, start, start)
+        header = next(read_rows(io.StringIO(text[start:end])), None)
+        if header is not None:
+            return header, end
+        start = end
+    return None, start
+
+
+def _analyze_chunk(header: Sequence[str], text: str, rollups: bool) -> FinanceAggregate:
+    return FinanceAggregate(rollups).add(FinanceColumns.from_rows(header, list(read_rows(io.StringIO(text)))))
+
+
+def analyze_parallel(
+    text: str,
+    rollups: bool = False,
+    executor: Optional[Executor] = None,
+    chunk_chars: Optional[int] = None,
+) -> Dict[str, object]:
+    """
+    analyze_csv for very large exports: the text is cut into chunks of
+    whole records (newlines inside quoted fields are never cut), each chunk
+    is parsed and aggregated in `executor` (the shared finance_pool() by
+    default), and the partial aggregates are merged in file order.
+
+    Without a pool (FINANCE_WORKERS=1) the chunks are analyzed in this
+    process, which gives the same result.
+    """
+    chunk_chars = chunk_chars or int(os.getenv("FINANCE_CHUNK_CHARS", str(DEFAULT_CHUNK_CHARS)))
+    header, start = _read_header(text)
+    aggregate = FinanceAggregate(rollups)
+    if header is None:
+        return aggregate.summary()
+    chunks = [text[a:b] for a, b in split_records(text, chunk_chars, start)]
+    if executor is None:
+        executor = finance_pool()
+    if executor is None or len(chunks) < 2:
+        partials = map(_analyze_chunk, repeat(header), chunks, repeat(rollups))
+    else:
+        partials = executor.map(_analyze_chunk, repeat(header), chunks, repeat(rollups))
+    for partial in partials:
+        aggregate.merge(partial)
+    return aggregate.summary()
+
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def finance_pool() -> Optional[ProcessPoolExecutor]:
+    """
+    The process pool for parallel analysis, started on first use with
+    FINANCE_WORKERS processes (default: one per CPU). None when that is 1.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            workers = int(os.getenv("FINANCE_WORKERS", "0")) or os.cpu_count() or 1
+            if workers < 2:
+                return None
+            # Spawned, not forked: the server process has threads (and a model) by now
+            _pool = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn"))
+        return _pool
+
+
+def shutdown_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(cancel_futures=True)
+            _pool = None
@@ -0,0 +1,62 @@
+from typing import Any, Dict, Optional
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+
+def dataset_id(digest: "hashlib._Hash") -> str:
+    """Id of an uploaded export from the sha256 of its bytes: the same file always gets the same id."""
+    return digest.hexdigest()[:32]
+
+
+class RollupStore:
+    """
+    Finance summaries (with rollups) saved per dataset id, so a dashboard
+    can show an upload again without it being re-sent or rescanned. Kept in
+    SQLite at FINANCE_ROLLUP_PATH, or in memory when unset.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.getenv("FINANCE_ROLLUP_PATH") or ":memory:"
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        if self.path != ":memory:":
+            self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS finance_rollups ("
+            " dataset_id TEXT PRIMARY KEY,"
+            " created_at REAL NOT NULL,"
+            " summary TEXT NOT NULL)"
+        )
+
+    def get(self, dataset: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._db.execute("SELECT summary FROM finance_rollups WHERE dataset_id = ?", (dataset,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, dataset: str, summary: Dict[str, Any]) -> None:
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO finance_rollups VALUES (?, ?, ?)",
+                (dataset, time.time(), json.dumps(summary, ensure_ascii=False)),
+            )
+
+    def delete(self, dataset: str) -> bool:
+        with self._lock:
+            return self._db.execute("DELETE FROM finance_rollups WHERE dataset_id = ?", (dataset,)).rowcount > 0
+
+
+_store: Optional[RollupStore] = None
+_store_lock = threading.Lock()
+
+
+def rollup_store() -> RollupStore:
+    """The process-wide store, opened on first use."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = RollupStore()
+        return _store
@@ -0,0 +1,133 @@
+from typing import AsyncIterable, Dict, Optional
+import codecs
+import hashlib
+import io
+
+from app.finance.engine import FinanceAggregate, FinanceColumns, read_rows, scan_records
+
+# Romanian bank exports that are not UTF-8 are almost always Windows-1250
+FALLBACK_ENCODING = "cp1250"
+
+_BOMS = (
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
+
+
+class SniffingDecoder:
+    """
+    Incremental decoder that picks the encoding from the stream itself.
+
+    A BOM selects UTF-8 or UTF-16 (and is dropped). Otherwise the bytes are
+    ASCII, which decodes the same either way, until the first non-ASCII
+    byte; the chunk holding it decides between UTF-8 and Windows-1250,
+    whose accented letters are not valid UTF-8 sequences.
+    """
+
+    def __init__(self, encoding: Optional[str] = None):
+        self.encoding = encoding
+        self._decoder = codecs.getincrementaldecoder(encoding)() if encoding else None
+        # Bytes held back until they can be told apart (a partial BOM or character)
+        self._head = b""
+        self._started = False
+
+    def _use(self, encoding: str) -> None:
+        self.encoding = encoding
+        self._decoder = codecs.getincrementaldecoder(encoding)()
+
+    def decode(self, data: bytes, final: bool = False) -> str:
+        if self._decoder is not None:
+            return self._decoder.decode(data, final)
+        data, self._head = self._head + data, b""
+        if not self._started:
+            for bom, encoding in _BOMS:
+                if data.startswith(bom):
+                    self._use(encoding)
+                    return self._decoder.decode(data, final)
+                if bom.startswith(data) and not final:
+                    self._head = data
+                    return ""
+            self._started = True
+        if data.isascii() and not final:
+            return data.decode("ascii")
+        try:
+            text = data.decode("utf-8")
+        except UnicodeDecodeError as e:
+            if e.reason != "unexpected end of data" or final:
+                self._use(FALLBACK_ENCODING)
+                return self._decoder.decode(data, final)
+            if data[:e.start].isascii():
+                # Only a cut-off character so far; decide when the rest arrives
+                self._head = data[e.start:]
+                return data[:e.start].decode("ascii")
+            self._use("utf-8")
+            return self._decoder.decode(data, final)
+        self._use("utf-8")
+        return text
+
+
+class StreamingAnalyzer:
+    """
+    /finance/analyze over a byte stream: decodes and aggregates each chunk
+    as it arrives, holding only the current chunk and an unfinished record.
+    """
+
+    def __init__(self, encoding: Optional[str] = None, rollups: bool = False):
+        self._decoder = SniffingDecoder(encoding)
+        self._aggregate = FinanceAggregate(rollups)
+        # Hash of the raw bytes, which identifies the upload for the rollup store
+        self.digest = hashlib.sha256()
+        self._header = None
+        # Text after the last complete record, scanned for quotes up to _scanned
+        self._pending = ""
+        self._scanned = 0
+        self._quoted = False
+
+    @property
+    def encoding(self) -> Optional[str]:
+        return self._decoder.encoding
+
+    def feed(self, data: bytes) -> None:
+        self.digest.update(data)
+        self._take(self._decoder.decode(data))
+
+    def close(self) -> Dict[str, object]:
+        self._take(self._decoder.decode(b"", final=True))
+        if self._pending:
+            self._process(self._pending)
+            self._pending = ""
+        return self._aggregate.summary()
+
+    def _take(self, text: str) -> None:
+        if not text:
+            return
+        self._pending += text
+        # Cut after the last newline outside quoted fields (newlines inside them are data),
+        # scanning only the new text
+        cut, self._scanned, self._quoted = scan_records(self._pending, self._scanned, self._quoted)
+        if cut == -1:
+            return
+        block, self._pending = self._pending[:cut], self._pending[cut:]
+        self._scanned -= cut
+        self._process(block)
+
+    def _process(self, block: str) -> None:
+        rows = read_rows(io.StringIO(block))
+        if self._header is None:
+            self._header = next(rows, None)
+            if self._header is None:
+                return
+        batch = list(rows)
+        if batch:
+            self._aggregate.add(FinanceColumns.from_rows(self._header, batch))
+
+
+async def analyze_stream(
+    body: AsyncIterable[bytes], encoding: Optional[str] = None, rollups: bool = False
+) -> StreamingAnalyzer:
+    """Read a CSV export from an async byte stream (e.g. a request body); close() gives its summary."""
+    analyzer = StreamingAnalyzer(encoding, rollups)
+    async for chunk in body:
+        analyzer.feed(chunk)
+    return analyzer
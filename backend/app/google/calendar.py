@@ -1,48 +1,230 @@
 from google.oauth2 import service_account
-from googleapiclient.discovery import build
-from datetime import datetime, timedelta
+from googleapiclient.discovery import build_from_document
+from googleapiclient.discovery_cache import get_static_doc
+from googleapiclient.errors import HttpError
+from googleapiclient.http import BatchHttpRequest
+import google_auth_httplib2
+import httplib2
+from datetime import date, datetime, time, timedelta
+from typing import Any, Dict, List, Optional
+import json
+import logging
 import os
+import re
+import threading
+
+from app.nlp.dates import parse_date
+
+logger = logging.getLogger(__name__)
+
+SCOPES = ["https://www.googleapis.com/auth/calendar"]
+
+# Google accepts at most 50 calls in one Calendar batch request
+MAX_BATCH_SIZE = 50
+
+REMINDERS = {
+    'useDefault': False,
+    'overrides': [
+        {'method': 'email', 'minutes': 10},
+        {'method': 'popup', 'minutes': 10},
+    ],
+}
+
+# Clock times as the extractor reports them: 17:00, 5pm, 10.30 am
+_TIME_RE = re.compile(r"(\d{1,2})(?:[:.](\d{2}))?\s*(am|pm)?")
+
+
+def _parse_time(value: Optional[str]) -> Optional[time]:
+    match = _TIME_RE.fullmatch((value or "").strip().lower())
+    if not match or not (match.group(2) or match.group(3)):
+        return None
+    hour, minute, meridiem = int(match.group(1)), int(match.group(2) or 0), match.group(3)
+    if meridiem:
+        if not 1 <= hour <= 12:
+            return None
+        hour = hour % 12 + (12 if meridiem == "pm" else 0)
+    if hour > 23 or minute > 59:
+        return None
+    return time(hour, minute)
+
+
+def task_to_event(
+    task: Dict[str, Any],
+    time_zone: str = "UTC",
+    duration: timedelta = timedelta(hours=1),
+    today: Optional[date] = None,
+) -> Dict[str, Any]:
+    """
+    Calendar event body for a parsed task. A task with a time becomes a
+    `duration`-long event at that time in `time_zone`; one with only a
+    deadline becomes an all-day event; one with only a time is for today.
+    Raises ValueError without a date, or with a deadline that is not one.
+    """
+    day = parse_date(task.get("deadline"), today)
+    at = _parse_time(task.get("time"))
+    if day is None and task.get("deadline"):
+        raise ValueError(f"Cannot read deadline {task['deadline']!r} of task {task.get('task')!r}")
+    if day is None and at is not None:
+        day = today or date.today()
+    if day is None:
+        raise ValueError(f"No date for task {task.get('task')!r}")
+    event: Dict[str, Any] = {"summary": task["task"], "reminders": REMINDERS}
+    if task.get("category"):
+        event["description"] = f"Category: {task['category']}"
+    if at is None:
+        event["start"] = {"date": day.isoformat()}
+        event["end"] = {"date": (day + timedelta(days=1)).isoformat()}
+    else:
+        start = datetime.combine(day, at)
+        event["start"] = {"dateTime": start.isoformat(), "timeZone": time_zone}
+        event["end"] = {"dateTime": (start + duration).isoformat(), "timeZone": time_zone}
+    return event
+
+
+def _error_message(error: Exception) -> str:
+    if isinstance(error, HttpError):
+        return f"{error.resp.status} {error.reason}"
+    return str(error) or repr(error)
+
+
+class CalendarClient:
+    """
+    Google Calendar client that is built once and reused.
+
+    The service-account file is read once and its credentials shared by
+    all threads; tokens are refreshed under a lock shortly before they
+    expire. The discovery document ships with google-api-python-client and
+    is parsed once. googleapiclient services and httplib2 connections are
+    not thread-safe, so each thread gets its own service, whose HTTP
+    connection to Google stays open between calls.
+    """
+
+    def __init__(
+        self,
+        credentials_file: Optional[str] = None,
+        credentials=None,
+        api_endpoint: Optional[str] = None,
+        timeout: Optional[float] = None,
+    ):
+        self._credentials_file = credentials_file
+        self._credentials = credentials
+        self._api_endpoint = api_endpoint or os.getenv("GOOGLE_CALENDAR_API_ENDPOINT")
+        self._timeout = timeout or float(os.getenv("GOOGLE_CALENDAR_TIMEOUT_S", "30"))
+        self._lock = threading.Lock()
+        self._discovery_doc: Optional[Dict[str, Any]] = None
+        self._local = threading.local()
+
+    @property
+    def credentials(self):
+        with self._lock:
+            if self._credentials is None:
+                path = self._credentials_file or os.getenv('GOOGLE_APPLICATION_CREDENTIALS')
+                self._credentials = service_account.Credentials.from_service_account_file(path, scopes=SCOPES)
+            return self._credentials
+
+    def _refresh_credentials(self, http) -> None:
+        # Refresh here, once, instead of in every thread's AuthorizedHttp at the same time
+        credentials = self.credentials
+        with self._lock:
+            if not credentials.valid:
+                credentials.refresh(google_auth_httplib2.Request(http))
+
+    def _discovery(self) -> Dict[str, Any]:
+        with self._lock:
+            if self._discovery_doc is None:
+                self._discovery_doc = json.loads(get_static_doc('calendar', 'v3'))
+            return self._discovery_doc
+
+    def service(self):
+        """This thread's calendar service, built on first use."""
+        service = getattr(self._local, "service", None)
+        if service is None:
+            http = google_auth_httplib2.AuthorizedHttp(self.credentials, http=httplib2.Http(timeout=self._timeout))
+            client_options = {"api_endpoint": self._api_endpoint} if self._api_endpoint else None
+            service = build_from_document(self._discovery(), http=http, client_options=client_options)
+            self._local.http = http.http
+            self._local.service = service
+        self._refresh_credentials(self._local.http)
+        return service
+
+    def create_event(self, event_details: Dict[str, Any]) -> Dict[str, Any]:
+        event = {
+            'summary': event_details['task'],
+            'start': {
+                'dateTime': event_details.get('time', datetime.utcnow().isoformat() + 'Z'),
+                'timeZone': 'UTC',
+            },
+            'end': {
+                'dateTime': event_details.get('end_time', (datetime.utcnow() + timedelta(hours=1)).isoformat() + 'Z'),
+                'timeZone': 'UTC',
+            },
+            'reminders': REMINDERS,
+        }
+        return self.service().events().insert(calendarId='primary', body=event).execute()
+
+    def _batch_uri(self) -> str:
+        doc = self._discovery()
+        root = doc["rootUrl"]
+        if self._api_endpoint:
+            # The endpoint replaces rootUrl + servicePath; batches live beside the service
+            root = self._api_endpoint
+            if root.endswith(doc["servicePath"]):
+                root = root[:-len(doc["servicePath"])]
+        return root + doc["batchPath"]
+
+    def insert_events(self, events: List[Dict[str, Any]], batch_size: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Insert events in batch requests of up to `batch_size` calls each
+        (GOOGLE_CALENDAR_BATCH_SIZE, at most 50), one round trip per batch.
+
+        Returns one result per event, in order: {"event": created} or
+        {"error": message}. A failed event or batch does not stop the rest.
+        """
+        batch_size = min(batch_size or int(os.getenv("GOOGLE_CALENDAR_BATCH_SIZE", str(MAX_BATCH_SIZE))), MAX_BATCH_SIZE)
+        service = self.service()
+        results: List[Dict[str, Any]] = [{} for _ in events]
+
+        def store(request_id, response, exception):
+            index = int(request_id)
+            results[index] = {"error": _error_message(exception)} if exception else {"event": response}
+
+        for offset in range(0, len(events), batch_size):
+            chunk = range(offset, min(offset + batch_size, len(events)))
+            batch = BatchHttpRequest(callback=store, batch_uri=self._batch_uri())
+            for index in chunk:
+                batch.add(service.events().insert(calendarId='primary', body=events[index]), request_id=str(index))
+            try:
+                batch.execute()
+            except Exception as e:
+                logger.warning(f"Calendar batch of {len(chunk)} events failed: {e}")
+                for index in chunk:
+                    if not results[index]:
+                        results[index] = {"error": _error_message(e)}
+        return results
+
+    def list_events(self, max_results: int = 10) -> List[Dict[str, Any]]:
+        now = datetime.utcnow().isoformat() + 'Z'  # 'Z' indicates UTC time
+        events_result = self.service().events().list(calendarId='primary', timeMin=now,
+                                                      maxResults=max_results, singleEvents=True,
+                                                      orderBy='startTime').execute()
+        return events_result.get('items', [])
+
+
+# Shared client; credentials are loaded on the first calendar call
+calendar_client = CalendarClient()
+
 
-# Load Google Calendar credentials from environment variables or a config file
 def get_calendar_service():
-    creds = service_account.Credentials.from_service_account_file(
-        os.getenv('GOOGLE_APPLICATION_CREDENTIALS')
-    )
-    service = build('calendar', 'v3', credentials=creds)
-    return service
+    return calendar_client.service()
 
 # Function to create an event in Google Calendar
 def create_event(event_details):
-    service = get_calendar_service()
-    
-    event = {
-        'summary': event_details['task'],
-        'start': {
-            'dateTime': event_details.get('time', datetime.utcnow().isoformat() + 'Z'),
-            'timeZone': 'UTC',
-        },
-        'end': {
-            'dateTime': event_details.get('end_time', (datetime.utcnow() + timedelta(hours=1)).isoformat() + 'Z'),
-            'timeZone': 'UTC',
-        },
-        'reminders': {
-            'useDefault': False,
-            'overrides': [
-                {'method': 'email', 'minutes': 10},
-                {'method': 'popup', 'minutes': 10},
-            ],
-        },
-    }
-
-    event = service.events().insert(calendarId='primary', body=event).execute()
-    return event
+    return calendar_client.create_event(event_details)
+
+# Function to create many events in as few round trips as possible
+def insert_events(events):
+    return calendar_client.insert_events(events)
 
 # Function to list events from Google Calendar
 def list_events():
-    service = get_calendar_service()
-    now = datetime.utcnow().isoformat() + 'Z'  # 'Z' indicates UTC time
-    events_result = service.events().list(calendarId='primary', timeMin=now,
-                                          maxResults=10, singleEvents=True,
-                                          orderBy='startTime').execute()
-    events = events_result.get('items', [])
-    return events
\ No newline at end of file
+    return calendar_client.list_events()
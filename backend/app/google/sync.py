@@ -0,0 +1,246 @@
+from googleapiclient.errors import HttpError
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+from app.google.calendar import CalendarClient, calendar_client
+
+logger = logging.getLogger(__name__)
+
+
+def _utc_key(when: Dict[str, Any]) -> str:
+    """Sortable UTC timestamp for an event start/end ({"dateTime": ...} or {"date": ...})."""
+    if when.get("dateTime"):
+        moment = datetime.fromisoformat(when["dateTime"].replace("Z", "+00:00"))
+        if moment.tzinfo is None:
+            moment = moment.replace(tzinfo=timezone.utc)
+        return moment.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+    # All-day events are placed at UTC midnight
+    return f"{when.get('date', '')}T00:00:00Z"
+
+
+class EventMirror:
+    """
+    Local copy of calendar events in SQLite, with the sync token each
+    calendar was last synced to. Changes from one sync are applied in a
+    single transaction, so readers never see half a sync.
+    """
+
+    def __init__(self, path: str = ":memory:"):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        if path != ":memory:":
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS calendar_events ("
+            " calendar_id TEXT NOT NULL,"
+            " id TEXT NOT NULL,"
+            " start_utc TEXT NOT NULL,"
+            " end_utc TEXT NOT NULL,"
+            " body TEXT NOT NULL,"
+            " PRIMARY KEY (calendar_id, id))"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS calendar_events_end ON calendar_events (calendar_id, end_utc)")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS calendar_sync ("
+            " calendar_id TEXT PRIMARY KEY,"
+            " sync_token TEXT,"
+            " synced_at REAL NOT NULL)"
+        )
+
+    def _write(self, calendar_id: str, events: Iterable[Dict[str, Any]]) -> int:
+        changes = 0
+        for event in events:
+            changes += 1
+            if event.get("status") == "cancelled":
+                self._db.execute("DELETE FROM calendar_events WHERE calendar_id = ? AND id = ?", (calendar_id, event["id"]))
+                continue
+            self._db.execute(
+                "INSERT OR REPLACE INTO calendar_events VALUES (?, ?, ?, ?, ?)",
+                (
+                    calendar_id, event["id"],
+                    _utc_key(event.get("start", {})), _utc_key(event.get("end") or event.get("start", {})),
+                    json.dumps(event, ensure_ascii=False),
+                ),
+            )
+        return changes
+
+    def apply(self, calendar_id: str, events: List[Dict[str, Any]], sync_token: Optional[str], replace: bool = False) -> int:
+        """
+        Apply a sync's events (cancelled ones are removed) and remember its
+        token. With `replace`, the calendar's previous events are dropped
+        first (a full sync). Returns the number of changes applied.
+        """
+        with self._lock:
+            self._db.execute("BEGIN")
+            try:
+                if replace:
+                    self._db.execute("DELETE FROM calendar_events WHERE calendar_id = ?", (calendar_id,))
+                changes = self._write(calendar_id, events)
+                self._db.execute(
+                    "INSERT OR REPLACE INTO calendar_sync VALUES (?, ?, ?)", (calendar_id, sync_token, time.time())
+                )
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+        return changes
+
+    def upsert(self, calendar_id: str, events: List[Dict[str, Any]]) -> None:
+        """Store events this process created; the next sync confirms them."""
+        with self._lock:
+            self._write(calendar_id, events)
+
+    def sync_state(self, calendar_id: str) -> Tuple[Optional[str], Optional[float]]:
+        """(sync token, time of the last sync) for the calendar; (None, None) if never synced."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT sync_token, synced_at FROM calendar_sync WHERE calendar_id = ?", (calendar_id,)
+            ).fetchone()
+        return (row[0], row[1]) if row else (None, None)
+
+    def upcoming(self, calendar_id: str, now: Optional[datetime] = None, limit: int = 50) -> List[Dict[str, Any]]:
+        """Events that have not ended by `now`, soonest first."""
+        now_key = _utc_key({"dateTime": (now or datetime.now(timezone.utc)).isoformat()})
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT body FROM calendar_events WHERE calendar_id = ? AND end_utc > ?"
+                " ORDER BY start_utc LIMIT ?",
+                (calendar_id, now_key, limit),
+            ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def count(self, calendar_id: str) -> int:
+        with self._lock:
+            return self._db.execute(
+                "SELECT COUNT(*) FROM calendar_events WHERE calendar_id = ?", (calendar_id,)
+            ).fetchone()[0]
+
+
+class CalendarSync:
+    """
+    Keeps an EventMirror in step with a Google calendar.
+
+    The first sync pages through every event; later ones send the stored
+    syncToken and fetch only what changed (deleted events arrive as
+    "cancelled"). When Google expires the token (410 Gone) the mirror is
+    rebuilt with a full sync. Reads are served from the mirror, which is
+    refreshed when it is older than `refresh_interval` seconds
+    (GOOGLE_CALENDAR_SYNC_INTERVAL_S).
+    """
+
+    def __init__(
+        self,
+        client: CalendarClient,
+        mirror: Optional[EventMirror] = None,
+        calendar_id: str = "primary",
+        refresh_interval: Optional[float] = None,
+        page_size: int = 250,
+    ):
+        self._client = client
+        self._mirror = mirror
+        self.calendar_id = calendar_id
+        self.refresh_interval = (
+            float(os.getenv("GOOGLE_CALENDAR_SYNC_INTERVAL_S", "60")) if refresh_interval is None else refresh_interval
+        )
+        self.page_size = page_size
+        self._mirror_lock = threading.Lock()
+        # Held for a whole sync so concurrent readers do not sync twice
+        self._sync_lock = threading.Lock()
+        self.last_sync: Optional[Dict[str, Any]] = None
+
+    @property
+    def mirror(self) -> EventMirror:
+        with self._mirror_lock:
+            if self._mirror is None:
+                # GOOGLE_CALENDAR_MIRROR_PATH keeps the mirror (and its sync token) across restarts
+                self._mirror = EventMirror(os.getenv("GOOGLE_CALENDAR_MIRROR_PATH") or ":memory:")
+            return self._mirror
+
+    def _fetch(self, sync_token: Optional[str]) -> Tuple[List[Dict[str, Any]], Optional[str], int]:
+        """Every page of a full (no token) or incremental list: (items, next sync token, pages)."""
+        events = self._client.service().events()
+        params: Dict[str, Any] = {"calendarId": self.calendar_id, "maxResults": self.page_size, "singleEvents": True}
+        if sync_token:
+            params["syncToken"] = sync_token
+        items: List[Dict[str, Any]] = []
+        pages = 0
+        page_token = None
+        while True:
+            page_params = dict(params, pageToken=page_token) if page_token else params
+            response = events.list(**page_params).execute()
+            pages += 1
+            items.extend(response.get("items", []))
+            page_token = response.get("nextPageToken")
+            if not page_token:
+                return items, response.get("nextSyncToken"), pages
+
+    def sync(self) -> Dict[str, Any]:
+        """Bring the mirror up to date now; returns what was done."""
+        with self._sync_lock:
+            return self._sync()
+
+    def _sync(self) -> Dict[str, Any]:
+        started = time.perf_counter()
+        sync_token, _ = self.mirror.sync_state(self.calendar_id)
+        mode = "incremental" if sync_token else "full"
+        try:
+            items, next_token, pages = self._fetch(sync_token)
+        except HttpError as e:
+            if not sync_token or e.resp.status != 410:
+                raise
+            logger.info(f"Calendar sync token for {self.calendar_id} expired; running a full sync")
+            mode = "full"
+            items, next_token, pages = self._fetch(None)
+        changes = self.mirror.apply(self.calendar_id, items, next_token, replace=mode == "full")
+        self.last_sync = {
+            "mode": mode,
+            "changes": changes,
+            "pages": pages,
+            "events": self.mirror.count(self.calendar_id),
+            "duration": round(time.perf_counter() - started, 4),
+        }
+        logger.info(f"Calendar {mode} sync of {self.calendar_id}: {changes} changes in {pages} pages")
+        return self.last_sync
+
+    def is_stale(self) -> bool:
+        _, synced_at = self.mirror.sync_state(self.calendar_id)
+        return synced_at is None or time.time() - synced_at >= self.refresh_interval
+
+    def refresh_if_stale(self) -> None:
+        """Sync when the mirror is older than refresh_interval; keep serving a stale one if Google fails."""
+        if not self.is_stale():
+            return
+        with self._sync_lock:
+            # Another thread may have synced while this one waited
+            if not self.is_stale():
+                return
+            try:
+                self._sync()
+            except Exception as e:
+                if self.mirror.sync_state(self.calendar_id)[1] is None:
+                    raise
+                logger.warning(f"Calendar sync failed, serving the mirror from the last sync: {e}")
+
+    def upcoming(self, limit: int = 50, refresh: bool = False) -> List[Dict[str, Any]]:
+        """Events that have not ended yet, soonest first, from the mirror."""
+        if refresh:
+            self.sync()
+        else:
+            self.refresh_if_stale()
+        return self.mirror.upcoming(self.calendar_id, limit=limit)
+
+    def record(self, events: List[Dict[str, Any]]) -> None:
+        """Add events created through this process to the mirror right away."""
+        self.mirror.upsert(self.calendar_id, events)
+
+
+# Shared sync engine for the app's calendar client
+calendar_sync = CalendarSync(calendar_client)
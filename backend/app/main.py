@@ -1,8 +1,42 @@
-from fastapi import FastAPI
-from fastapi.middleware.cors import CORSMiddleware
-from app.api import routes
+from contextlib import asynccontextmanager
+import logging
+import os
 
-app = FastAPI()
+from app.startup import startup_profile
+
+if os.getenv("STARTUP_PROFILE_IMPORTS") == "1":
+    startup_profile.enable_import_timing()
+
+with startup_profile.phase("import:fastapi"):
+    from fastapi import FastAPI, Request
+    from fastapi.middleware.cors import CORSMiddleware
+with startup_profile.phase("import:app.api.routes"):
+    from app.api import routes
+from app.nlp.ai_service import model_service
+from app.db.tasks import task_repository
+from app.finance.parallel import shutdown_pool as shutdown_finance_pool
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Load the model according to AI_MODEL_STARTUP (eager, lazy or background)
+    with startup_profile.phase("lifespan.startup"):
+        task_repository.connect()
+        if task_repository.configured:
+            try:
+                await task_repository.ensure_indexes()
+            except Exception as e:
+                # The database may come up later; everything but /tasks/ still works
+                logging.getLogger(__name__).error(f"Could not ensure task indexes: {e}")
+        await model_service.startup()
+    startup_profile.mark("app_ready")
+    yield
+    model_service.shutdown()
+    task_repository.close()
+    shutdown_finance_pool()
+
+
+app = FastAPI(lifespan=lifespan)
 
 # CORS middleware to allow requests from the frontend
 app.add_middleware(
@@ -13,9 +47,18 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.middleware("http")
+async def record_first_request(request: Request, call_next):
+    # Time to first request/response, for /debug/startup
+    startup_profile.mark("first_request")
+    response = await call_next(request)
+    startup_profile.mark("first_response")
+    return response
+
 # Include API routes
 app.include_router(routes.router)
+startup_profile.mark("app_created")
 
 @app.get("/")
 def read_root():
-    return {"message": "Welcome to the Task Sync API!"}
\ No newline at end of file
+    return {"message": "Welcome to the Task Sync API!"}
@@ -1,15 +1,25 @@
 from typing import Dict, Any, List, Optional, Union
+import asyncio
 import threading
 import time
 import logging
+import os
 import re
 import json
+import functools
 from enum import Enum
 from datetime import datetime, timedelta
 
-# Keep transformers imports
-from transformers import pipeline
 from app.nlp.extractor import extract_tasks, normalize_date, is_greeting
+from app.nlp.batching import MicroBatcher
+from app.nlp.executor import BoundedExecutor
+from app.nlp.workers import InferenceWorkerPool, pipeline_generator
+from app.nlp.backends import load_pipeline
+from app.nlp.cache import ResultCache, cache_key, normalize_text
+from app.nlp.decoding import GENERATION_KWARGS, parse_json_array, build_generator
+from app.nlp.prompts import PROMPT_PREFIX, build_prompt, load_warmup_inputs
+from app.nlp.scanner import scan, RELATIVE_DATE, WEEKDAY
+from app.startup import startup_profile
 
 # Setup logger
 logger = logging.getLogger(__name__)
@@ -17,9 +27,15 @@ logger = logging.getLogger(__name__)
 class ModelState(str, Enum):
     NOT_LOADED = "not_loaded"
     LOADING = "loading"
+    WARMING = "warming"
     READY = "ready"
     ERROR = "error"
 
+class StartupPolicy(str, Enum):
+    EAGER = "eager"            # load during app startup; serve once the model is ready
+    LAZY = "lazy"              # load on the first parse request
+    BACKGROUND = "background"  # start loading once the app is up; regex fallback meanwhile
+
 class AIModelService:
     """
     A service to manage AI model loading and inference with status tracking
@@ -28,6 +44,8 @@ class AIModelService:
     
     def __init__(self):
         self._model = None
+        self._generate = None
+        self._generated = False
         self._state = ModelState.NOT_LOADED
         self._error = None
         self._lock = threading.Lock()
@@ -35,6 +53,48 @@ class AIModelService:
         self._model_path = "google/flan-t5-small"  # Default model
         self._last_status_check = None
         self._last_input = None
+        # When the model loads (AI_MODEL_STARTUP); see startup()
+        self._startup_policy = StartupPolicy(os.getenv("AI_MODEL_STARTUP", StartupPolicy.BACKGROUND.value))
+        
+        # Optional multi-process inference: 0 keeps the model in this process
+        self._processes = int(os.getenv("AI_INFERENCE_PROCESSES", "0"))
+        self._start_method = os.getenv("AI_WORKER_START_METHOD", "spawn")
+        self._worker_threads = int(os.getenv("AI_WORKER_THREADS", "0")) or None
+        self._worker_pool: Optional[InferenceWorkerPool] = None
+        self._stop_on_json_close = os.getenv("AI_STOP_ON_JSON_CLOSE", "1") == "1"
+        # Tokenize PROMPT_PREFIX once at load instead of on every request
+        self._prompt_prefix = PROMPT_PREFIX if os.getenv("AI_PROMPT_PREFIX_CACHE", "1") == "1" else None
+        # torch (default), int8 or onnx; see app/nlp/backends.py
+        self._backend = os.getenv("AI_INFERENCE_BACKEND", "torch")
+        # Warmup before READY; AI_WARMUP_ROUNDS=0 skips it
+        self._warmup_rounds = int(os.getenv("AI_WARMUP_ROUNDS", "1"))
+        self._warmup_file = os.getenv("AI_WARMUP_FILE") or None
+        self._warmup: Optional[Dict[str, Any]] = None
+        
+        # Concurrent prompts arriving within the window share one generate call;
+        # with worker processes, one batch can be in flight per process
+        self._batcher = MicroBatcher(
+            self._generate_batch,
+            max_batch_size=int(os.getenv("AI_BATCH_MAX_SIZE", "8")),
+            max_wait_ms=float(os.getenv("AI_BATCH_WINDOW_MS", "15")),
+            name="ai-batcher",
+            concurrency=max(1, self._processes),
+        )
+        
+        # Model results for repeated inputs; AI_CACHE_PATH persists them to SQLite
+        cache_size = int(os.getenv("AI_CACHE_SIZE", "1024"))
+        self._cache = ResultCache(
+            max_entries=cache_size,
+            ttl_seconds=float(os.getenv("AI_CACHE_TTL_S", "3600")),
+            path=os.getenv("AI_CACHE_PATH") or None,
+        ) if cache_size > 0 else None
+        
+        # Worker pool for the async API; rejects work beyond the queue limit
+        self._executor = BoundedExecutor(
+            max_workers=int(os.getenv("AI_INFERENCE_WORKERS", "8")),
+            max_pending=int(os.getenv("AI_INFERENCE_QUEUE_LIMIT", "32")),
+            name="ai-inference",
+        )
     
     def get_status(self) -> Dict[str, Any]:
         """Get the current status of the AI model"""
@@ -44,9 +104,16 @@ class AIModelService:
         # Store status result
         status = {
             "state": self._state,
-            "model": self._model_path if self._model else None,
+            "ready": self._state == ModelState.READY,
+            "model": self._model_path if (self._model or self._worker_pool) else None,
+            "backend": self._backend,
             "error": str(self._error) if self._error else None,
-            "loading_started": self._load_thread is not None and self._load_thread.is_alive()
+            "loading_started": self._load_thread is not None and self._load_thread.is_alive(),
+            "batching": self._batcher.stats(),
+            "inference_pool": self._executor.stats(),
+            "workers": self._worker_pool.stats() if self._worker_pool else None,
+            "cache": self._cache.stats() if self._cache else None,
+            "warmup": self._warmup
         }
         
         # Only log status checks if it's been more than 30 seconds since last log
@@ -70,7 +137,7 @@ class AIModelService:
         Begin loading the model in a background thread if not already loading
         """
         with self._lock:
-            if self._state == ModelState.LOADING:
+            if self._state in (ModelState.LOADING, ModelState.WARMING):
                 # Already loading
                 return
                 
@@ -85,23 +152,51 @@ class AIModelService:
             self._load_thread.daemon = True
             self._load_thread.start()
     
+    async def startup(self) -> None:
+        """
+        Apply the startup policy; called from the app's lifespan.
+        
+        Nothing is loaded at import time, so processes that never run
+        inference do not pay for transformers or the weights.
+        """
+        logger.info(f"Model startup policy: {self._startup_policy.value}")
+        if self._startup_policy == StartupPolicy.EAGER:
+            self.start_loading()
+            # Wait off the event loop; the app starts serving once this returns
+            await asyncio.get_running_loop().run_in_executor(None, self.wait_until_loaded)
+        elif self._startup_policy == StartupPolicy.BACKGROUND:
+            self.start_loading()
+    
+    def wait_until_loaded(self, timeout: Optional[float] = None) -> bool:
+        """Block until a pending load finishes; True if the model is ready"""
+        thread = self._load_thread
+        if thread is not None:
+            thread.join(timeout)
+        return self._state == ModelState.READY
+    
+    def shutdown(self) -> None:
+        """Release worker threads and processes; called from the app's lifespan"""
+        self._batcher.close()
+        self._executor.shutdown(wait=False)
+        if self._worker_pool is not None:
+            self._worker_pool.close()
+    
     def _load_model(self) -> None:
         """Internal method to load the model"""
         try:
             logger.info(f"Loading model {self._model_path}...")
             start_time = time.time()
+            self._load_backend()
             
-            # Load the model
-            self._model = pipeline(
-                "text2text-generation",
-                model=self._model_path,
-                tokenizer=self._model_path,
-                device=-1  # Use CPU
-            )
+            # Requests keep using the fallback until warmup is done
+            with self._lock:
+                self._state = ModelState.WARMING
+            self._run_warmup()
             
             # Update state
             with self._lock:
                 self._state = ModelState.READY
+            startup_profile.mark("model_ready")
                 
             elapsed = time.time() - start_time
             logger.info(f"Model loaded successfully in {elapsed:.2f} seconds")
@@ -113,6 +208,84 @@ class AIModelService:
                 self._state = ModelState.ERROR
                 self._error = e
     
+    def _run_warmup(self) -> None:
+        """
+        Generate for representative inputs so lazy kernel initialization and
+        allocator growth happen before the first real request. Each input
+        runs alone and then all together as one batch, covering both the
+        single and the batched shapes. Failures are recorded, not raised:
+        a request that fails later still falls back to the regex extractor.
+        """
+        if self._warmup_rounds <= 0:
+            return
+        started = time.perf_counter()
+        warmup: Dict[str, Any] = {"rounds": self._warmup_rounds, "prompts": [], "batch_ms": [], "error": None}
+        try:
+            with startup_profile.phase("model.warmup"):
+                prompts = [build_prompt(text) for text in load_warmup_inputs(self._warmup_file)]
+                # One copy per worker process so every worker gets warmed
+                copies = max(1, self._processes)
+                for _ in range(self._warmup_rounds):
+                    for prompt in prompts:
+                        t0 = time.perf_counter()
+                        self._generate_concurrently([[prompt]] * copies)
+                        warmup["prompts"].append({"chars": len(prompt), "ms": round((time.perf_counter() - t0) * 1000, 1)})
+                    t0 = time.perf_counter()
+                    self._generate_concurrently([prompts] * copies)
+                    warmup["batch_ms"].append(round((time.perf_counter() - t0) * 1000, 1))
+        except Exception as e:
+            logger.warning(f"Model warmup failed: {e}")
+            warmup["error"] = str(e)
+        warmup["total_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        self._warmup = warmup
+        logger.info(f"Model warmup finished in {warmup['total_ms']:.0f} ms")
+    
+    def _generate_concurrently(self, batches: List[List[str]]) -> None:
+        """Run batches directly (not through the batcher), in parallel on worker processes"""
+        if self._worker_pool is None or len(batches) == 1:
+            for batch in batches:
+                self._generate_batch(batch)
+            return
+        futures = [self._worker_pool.submit(batch) for batch in batches]
+        for future in futures:
+            future.result()
+    
+    def _load_backend(self) -> None:
+        """Load the model or start the worker processes, recorded in the startup profile"""
+        with startup_profile.phase("model.load"):
+            if self._processes > 0:
+                # Each worker process loads (or, when forked, inherits) its own copy
+                pool = InferenceWorkerPool(
+                    functools.partial(
+                        pipeline_generator,
+                        self._model_path,
+                        GENERATION_KWARGS,
+                        self._stop_on_json_close,
+                        self._prompt_prefix,
+                        self._backend,
+                    ),
+                    self._processes,
+                    start_method=self._start_method,
+                    threads_per_worker=self._worker_threads,
+                )
+                pool.start()
+                self._worker_pool = pool
+            else:
+                # Load the model
+                self._model = load_pipeline(self._model_path, self._backend)
+                self._generate = build_generator(
+                    self._model, GENERATION_KWARGS, self._stop_on_json_close, self._prompt_prefix
+                )
+    
+    async def aprocess_text(self, text: str, options: Dict[str, Any] = None) -> Dict[str, Any]:
+        """
+        Async version of process_text for use from the event loop.
+        
+        The work runs on a bounded worker pool so generation never blocks
+        the loop. Raises InferenceOverloaded when the pool's queue is full.
+        """
+        return await self._executor.run(self.process_text, text, options)
+    
     def process_text(self, text: str, options: Dict[str, Any] = None) -> Dict[str, Any]:
         """
         Process text input with fallback mechanisms
@@ -142,6 +315,10 @@ class AIModelService:
         
         # If model not ready, use fallback extractor
         if self._state != ModelState.READY:
+            if self._state == ModelState.NOT_LOADED and self._startup_policy == StartupPolicy.LAZY:
+                # First parse under the lazy policy; this request still uses the fallback
+                self.start_loading()
+
             # Use regex-based extractor as fallback
             logger.info("Model not ready, using fallback extractor")
             tasks = extract_tasks(text)
@@ -156,14 +333,31 @@ class AIModelService:
                 "message": "Using regex fallback because AI model is not ready"
             }
         
-        # Try AI model processing
+        # Same input, options and model as a recent request
+        key = None
+        if self._cache is not None:
+            # Quantized backends can answer differently, and persisted entries outlive a backend switch
+            key = cache_key(text, options.get("lang"), force_json, f"{self._model_path}:{self._backend}")
+            cached = self._cache.get(key)
+            if cached is not None:
+                cached["cached"] = True
+                return cached
+        
+        result = self._process_with_model(text, force_json)
+        
+        # Only model results are kept: an empty answer (and its regex fallback) or an error is retried
+        if key is not None and result["method"] == "ai_model":
+            self._cache.put(key, result, date_sensitive=self._is_date_sensitive(text, result["tasks"]))
+        return result
+    
+    def _process_with_model(self, text: str, force_json: bool) -> Dict[str, Any]:
+        """Generate with the model, falling back to the regex extractor"""
         try:
-            # Build the prompt for task extraction
-            prompt = self._build_prompt(text)
+            # Build the prompt from the text as the cache key sees it, so a hit is what the model would answer
+            prompt = self._build_prompt(normalize_text(text))
             
-            # Generate with model - only use max_new_tokens (not max_length)
-            output = self._model(prompt, max_new_tokens=256, temperature=0.1, do_sample=False)
-            content = output[0]["generated_text"] if isinstance(output, list) else str(output)
+            # Generate with model, batched with any concurrent requests
+            content = self._batcher(prompt)
             logger.debug(f"Model generated text: {content}")
             
             # Parse and normalize the results
@@ -207,37 +401,40 @@ class AIModelService:
                 "message": "Used regex fallback after AI model error"
             }
     
+    def _is_date_sensitive(self, text: str, tasks: List[Dict[str, Any]]) -> bool:
+        """Whether the result depends on today's date (relative deadlines)"""
+        if any(task.get("deadline") for task in tasks):
+            return True
+        spans = scan(text)
+        return bool(spans.get(RELATIVE_DATE) or spans.get(WEEKDAY))
+    
+    def _generate_batch(self, prompts: List[str]) -> List[str]:
+        """Run a batch of prompts through the pipeline in one padded generate call"""
+        if not self._generated:
+            # The first generate pays for lazy initialization; record it
+            self._generated = True
+            with startup_profile.phase("model.first_generate"):
+                return self._run_generate(prompts)
+        return self._run_generate(prompts)
+    
+    def _run_generate(self, prompts: List[str]) -> List[str]:
+        if self._worker_pool is not None:
+            # Least-loaded worker process
+            return self._worker_pool.generate(prompts)
+        
+        return self._generate(prompts)
+    
     def _build_prompt(self, text: str) -> str:
         """Build an improved prompt for task extraction with better date understanding"""
-        return (
-            "You are an expert task extraction engine. Read the INPUT and produce a JSON array of tasks.\n"
-            "Rules:\n"
-            "- The language may be Romanian or English. You must understand both.\n"
-            "- Output ONLY valid JSON (no markdown, no explanation).\n"
-            "- Each item has keys exactly: task, time, category, deadline.\n"
-            "- Use null for unknown fields.\n"
-            "- Ignore greetings, filler, random characters, or single letters.\n"
-            "- Do not split words into letters.\n"
-            "- If there are no tasks, return [].\n"
-            "- Normalize relative dates: 'tomorrow' should be the actual date (e.g., '2023-05-21').\n"
-            "\nCategories should be one of: Work, Personal, Family, Health, Shopping, Study, Finance, Travel, Home, Other\n"
-            "\nExamples:\n"
-            "English example: \"I need to buy milk at 5pm\"\n"
-            "JSON: [{\"task\":\"buy milk\",\"time\":\"5pm\",\"category\":\"Shopping\",\"deadline\":null}]\n"
-            "\nRomanian example: \"trebuie sa merg maine la piata\"\n"
-            "JSON: [{\"task\":\"merg la piata\",\"time\":null,\"category\":\"Shopping\",\"deadline\":\"maine\"}]\n"
-            "\nRomanian example: \"du copilul la scoala dimineata\"\n"
-            "JSON: [{\"task\":\"du copilul la scoala\",\"time\":\"dimineata\",\"category\":\"Family\",\"deadline\":null}]\n"
-            "\nRomanian example: \"plata facturi pana vineri\"\n"
-            "JSON: [{\"task\":\"plata facturi\",\"time\":null,\"category\":\"Finance\",\"deadline\":\"vineri\"}]\n"
-            "\nEnglish example: \"Hello! I need to buy milk tomorrow and call John on Friday\"\n"
-            "JSON: [{\"task\":\"buy milk\",\"time\":null,\"category\":\"Shopping\",\"deadline\":\"tomorrow\"}, {\"task\":\"call John\",\"time\":null,\"category\":\"Personal\",\"deadline\":\"Friday\"}]\n"
-            f"\nINPUT: {text}\n\n"
-            "JSON:"
-        )
+        return build_prompt(text)
     
     def _parse_model_output(self, output: str, force_json: bool = True) -> List[Dict[str, Any]]:
         """Parse and normalize model output"""
+        # Fast path: the first top-level array, found in one pass, is valid JSON
+        data = parse_json_array(output)
+        if isinstance(data, list):
+            return self._normalize_tasks(data)
+        
         # Try to extract JSON from the output
         # Look for array pattern first
         json_pattern = r"(\[.*?\])"
@@ -401,8 +598,5 @@ class AIModelService:
             
         return normalized_tasks
 
-# Create a global instance of the service
-model_service = AIModelService()
-
-# Start loading the model when the module is imported
-model_service.start_loading()
\ No newline at end of file
+# Create a global instance of the service; the app's lifespan starts loading
+model_service = AIModelService()
\ No newline at end of file
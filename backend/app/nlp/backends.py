@@ -0,0 +1,86 @@
+from typing import Callable, Dict
+import logging
+import os
+
+from app.startup import startup_profile
+
+logger = logging.getLogger(__name__)
+
+# Supported values for AI_INFERENCE_BACKEND
+TORCH = "torch"  # full-precision PyTorch
+INT8 = "int8"    # PyTorch with dynamically int8-quantized Linear layers
+ONNX = "onnx"    # ONNX Runtime through optimum (optional dependency)
+
+
+def _torch_pipeline(model_path: str):
+    with startup_profile.phase("model.import_transformers"):
+        from transformers import AutoModelForSeq2SeqLM, AutoTokenizer, pipeline
+
+    # Separate steps so the startup profile shows where load time goes
+    with startup_profile.phase("model.tokenizer"):  # download or local cache
+        tokenizer = AutoTokenizer.from_pretrained(model_path)
+    with startup_profile.phase("model.weights"):
+        model = AutoModelForSeq2SeqLM.from_pretrained(model_path)
+    with startup_profile.phase("model.pipeline"):
+        return pipeline(
+            "text2text-generation",
+            model=model,
+            tokenizer=tokenizer,
+            device=-1  # Use CPU
+        )
+
+
+def _int8_pipeline(model_path: str):
+    import torch
+
+    pipe = _torch_pipeline(model_path)
+    with startup_profile.phase("model.quantize"):
+        # Weights of every Linear layer become int8; activations are quantized on
+        # the fly. Embeddings and layer norms stay in float32.
+        pipe.model = torch.quantization.quantize_dynamic(pipe.model, {torch.nn.Linear}, dtype=torch.qint8)
+    return pipe
+
+
+def _onnx_pipeline(model_path: str):
+    try:
+        from optimum.onnxruntime import ORTModelForSeq2SeqLM
+    except ImportError as e:
+        raise RuntimeError(
+            "AI_INFERENCE_BACKEND=onnx requires optimum[onnxruntime] (pip install 'optimum[onnxruntime]')"
+        ) from e
+    from transformers import AutoTokenizer, pipeline
+
+    # Exporting takes a while; AI_ONNX_DIR keeps the exported graphs between runs
+    export_dir = os.getenv("AI_ONNX_DIR")
+    with startup_profile.phase("model.weights"):
+        if export_dir and os.path.isdir(export_dir) and os.listdir(export_dir):
+            model = ORTModelForSeq2SeqLM.from_pretrained(export_dir)
+        else:
+            model = ORTModelForSeq2SeqLM.from_pretrained(model_path, export=True)
+            if export_dir:
+                model.save_pretrained(export_dir)
+                logger.info(f"Exported {model_path} to ONNX in {export_dir}")
+    with startup_profile.phase("model.tokenizer"):  # download or local cache
+        tokenizer = AutoTokenizer.from_pretrained(model_path)
+    with startup_profile.phase("model.pipeline"):
+        return pipeline("text2text-generation", model=model, tokenizer=tokenizer, device=-1)
+
+
+_LOADERS: Dict[str, Callable] = {
+    TORCH: _torch_pipeline,
+    INT8: _int8_pipeline,
+    ONNX: _onnx_pipeline,
+}
+
+
+def load_pipeline(model_path: str, backend: str = TORCH):
+    """
+    Build a CPU text2text-generation pipeline for `model_path` on the given
+    backend. Every backend returns a regular transformers pipeline (whose
+    `model` has `generate`), so callers do not need to know which one runs.
+    """
+    loader = _LOADERS.get(backend)
+    if loader is None:
+        raise ValueError(f"Unknown inference backend {backend!r}; expected one of {', '.join(_LOADERS)}")
+    logger.info(f"Loading {model_path} with the {backend} backend")
+    return loader(model_path)
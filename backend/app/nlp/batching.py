@@ -0,0 +1,164 @@
+from typing import Any, Callable, Dict, List, Optional
+from concurrent.futures import Future, ThreadPoolExecutor
+import logging
+import queue
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class _Request:
+    __slots__ = ("item", "future", "enqueued_at")
+
+    def __init__(self, item: Any):
+        self.item = item
+        self.future: Future = Future()
+        self.enqueued_at = time.perf_counter()
+
+
+class MicroBatcher:
+    """
+    Groups items submitted from many threads into batches for a single
+    batched call.
+
+    The first item of a batch waits at most `max_wait_ms` for company; the
+    batch is dispatched as soon as it holds `max_batch_size` items or the
+    window closes. Each caller gets a Future resolved with its own result.
+    Up to `concurrency` batches run at once (e.g. one per worker process);
+    while all are busy, new items keep queueing and form the next batch.
+    """
+
+    def __init__(
+        self,
+        run_batch: Callable[[List[Any]], List[Any]],
+        max_batch_size: int = 8,
+        max_wait_ms: float = 15.0,
+        name: str = "micro-batcher",
+        concurrency: int = 1,
+    ):
+        self._run_batch = run_batch
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self._name = name
+        self._queue: "queue.Queue[Optional[_Request]]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self.concurrency = max(1, concurrency)
+        self._running = threading.BoundedSemaphore(self.concurrency)
+        self._pool = (
+            ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix=name)
+            if self.concurrency > 1 else None
+        )
+
+        # Metrics
+        self._batches = 0
+        self._items = 0
+        self._max_seen = 0
+        self._size_counts: Dict[int, int] = {}
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._run_total = 0.0
+
+    def submit(self, item: Any) -> Future:
+        """Queue an item and return a Future for its result."""
+        request = _Request(item)
+        self._ensure_worker()
+        self._queue.put(request)
+        return request.future
+
+    def __call__(self, item: Any, timeout: Optional[float] = None) -> Any:
+        """Submit an item and block until its result is ready."""
+        return self.submit(item).result(timeout)
+
+    def close(self) -> None:
+        """Stop the worker once the queued items have been processed."""
+        with self._lock:
+            if self._thread is not None:
+                self._queue.put(None)
+                self._thread = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Batch size and queue wait metrics since start."""
+        with self._lock:
+            batches = self._batches
+            return {
+                "batches": batches,
+                "items": self._items,
+                "queued": self._queue.qsize(),
+                "avg_batch_size": round(self._items / batches, 2) if batches else 0.0,
+                "max_batch_size_seen": self._max_seen,
+                "batch_sizes": dict(sorted(self._size_counts.items())),
+                "avg_queue_wait_ms": round(self._wait_total / self._items * 1000, 2) if self._items else 0.0,
+                "max_queue_wait_ms": round(self._wait_max * 1000, 2),
+                "avg_batch_run_ms": round(self._run_total / batches * 1000, 2) if batches else 0.0,
+                "max_batch_size": self.max_batch_size,
+                "max_wait_ms": self.max_wait * 1000,
+                "concurrency": self.concurrency,
+            }
+
+    def _ensure_worker(self) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._worker, name=self._name)
+                self._thread.daemon = True
+                self._thread.start()
+
+    def _collect(self, first: _Request) -> List[_Request]:
+        batch = [first]
+        deadline = first.enqueued_at + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                request = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if request is None:
+                # Closing: finish this batch, then stop
+                self._queue.put(None)
+                break
+            batch.append(request)
+        return batch
+
+    def _worker(self) -> None:
+        while True:
+            # Wait for a free slot first so items pile up into the next batch
+            self._running.acquire()
+            first = self._queue.get()
+            if first is None:
+                self._running.release()
+                return
+            batch = self._collect(first)
+            if self._pool is None:
+                self._dispatch(batch)
+            else:
+                self._pool.submit(self._dispatch, batch)
+
+    def _dispatch(self, batch: List[_Request]) -> None:
+        started = time.perf_counter()
+        try:
+            results = self._run_batch([r.item for r in batch])
+            if len(results) != len(batch):
+                raise RuntimeError(f"Batch returned {len(results)} results for {len(batch)} items")
+        except Exception as e:
+            logger.error(f"{self._name}: batch of {len(batch)} failed: {e}")
+            for request in batch:
+                request.future.set_exception(e)
+        else:
+            for request, result in zip(batch, results):
+                request.future.set_result(result)
+        finally:
+            self._running.release()
+        finished = time.perf_counter()
+
+        with self._lock:
+            size = len(batch)
+            self._batches += 1
+            self._items += size
+            self._max_seen = max(self._max_seen, size)
+            self._size_counts[size] = self._size_counts.get(size, 0) + 1
+            self._run_total += finished - started
+            for request in batch:
+                wait = started - request.enqueued_at
+                self._wait_total += wait
+                self._wait_max = max(self._wait_max, wait)
@@ -0,0 +1,202 @@
+from typing import Any, Dict, Optional, Tuple
+from collections import OrderedDict
+from datetime import date
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+import unicodedata
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_text(text: str) -> str:
+    """Canonical form of the input for cache keys: NFC, collapsed whitespace."""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+def cache_key(text: str, lang: Optional[str], force_json: bool, model: str) -> str:
+    """Stable key for a parse request; the same across processes and restarts."""
+    raw = json.dumps([normalize_text(text), lang, bool(force_json), model], ensure_ascii=False)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+# Stored entry: (value, created_at, day, date_sensitive)
+_Entry = Tuple[Dict[str, Any], float, str, bool]
+
+
+class _MemoryStore:
+    """LRU ordered dict; most recently used entries at the end."""
+
+    backend = "memory"
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[_Entry]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def put(self, key: str, entry: _Entry) -> int:
+        """Store an entry and return how many were evicted to make room."""
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        evicted = 0
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            evicted += 1
+        return evicted
+
+    def delete(self, key: str) -> None:
+        self._entries.pop(key, None)
+
+    def drop_date_sensitive(self, today: str) -> int:
+        stale = [k for k, (_, _, day, sensitive) in self._entries.items() if sensitive and day != today]
+        for key in stale:
+            del self._entries[key]
+        return len(stale)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class _SQLiteStore:
+    """Same interface as _MemoryStore, persisted to a SQLite file."""
+
+    backend = "sqlite"
+
+    def __init__(self, path: str, max_entries: int):
+        self.max_entries = max_entries
+        self.path = path
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS parse_cache ("
+            " key TEXT PRIMARY KEY,"
+            " value TEXT NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " day TEXT NOT NULL,"
+            " date_sensitive INTEGER NOT NULL,"
+            " last_used REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS parse_cache_last_used ON parse_cache (last_used)")
+
+    def get(self, key: str) -> Optional[_Entry]:
+        row = self._db.execute(
+            "SELECT value, created_at, day, date_sensitive FROM parse_cache WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        self._db.execute("UPDATE parse_cache SET last_used = ? WHERE key = ?", (time.time(), key))
+        return json.loads(row[0]), row[1], row[2], bool(row[3])
+
+    def put(self, key: str, entry: _Entry) -> int:
+        value, created_at, day, sensitive = entry
+        self._db.execute(
+            "INSERT OR REPLACE INTO parse_cache VALUES (?, ?, ?, ?, ?, ?)",
+            (key, json.dumps(value, ensure_ascii=False), created_at, day, int(sensitive), time.time()),
+        )
+        excess = len(self) - self.max_entries
+        if excess <= 0:
+            return 0
+        self._db.execute(
+            "DELETE FROM parse_cache WHERE key IN"
+            " (SELECT key FROM parse_cache ORDER BY last_used LIMIT ?)",
+            (excess,),
+        )
+        return excess
+
+    def delete(self, key: str) -> None:
+        self._db.execute("DELETE FROM parse_cache WHERE key = ?", (key,))
+
+    def drop_date_sensitive(self, today: str) -> int:
+        return self._db.execute(
+            "DELETE FROM parse_cache WHERE date_sensitive = 1 AND day != ?", (today,)
+        ).rowcount
+
+    def clear(self) -> None:
+        self._db.execute("DELETE FROM parse_cache")
+
+    def __len__(self) -> int:
+        return self._db.execute("SELECT COUNT(*) FROM parse_cache").fetchone()[0]
+
+
+class ResultCache:
+    """
+    Bounded LRU cache with a TTL for parse results.
+
+    Entries flagged as date-sensitive (relative deadlines such as "tomorrow"
+    were resolved against the current day) are dropped at day rollover.
+    With a `path` the entries live in a SQLite file and survive restarts;
+    otherwise they are kept in memory. Values must be JSON-serializable and
+    are copied on the way in and out, so callers may modify them freely.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 3600.0, path: Optional[str] = None):
+        self.ttl = ttl_seconds
+        self._lock = threading.Lock()
+        self._store = _SQLiteStore(path, max_entries) if path else _MemoryStore(max_entries)
+        self._day = date.today().isoformat()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expired = 0
+        # A persisted cache may hold relative deadlines from an earlier day
+        self._invalidated = self._store.drop_date_sensitive(self._day)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            self._check_day()
+            entry = self._store.get(key)
+            if entry is not None and self.ttl > 0 and time.time() - entry[1] > self.ttl:
+                self._store.delete(key)
+                self._expired += 1
+                entry = None
+            if entry is None:
+                self._misses += 1
+                return None
+            self._hits += 1
+        return json.loads(json.dumps(entry[0]))
+
+    def put(self, key: str, value: Dict[str, Any], date_sensitive: bool = False) -> None:
+        # Round-trip through JSON so the cached copy is detached and serializable
+        value = json.loads(json.dumps(value))
+        with self._lock:
+            self._check_day()
+            self._evictions += self._store.put(key, (value, time.time(), self._day, date_sensitive))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._store.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "backend": self._store.backend,
+                "size": len(self._store),
+                "max_entries": self._store.max_entries,
+                "ttl_seconds": self.ttl,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 3) if lookups else 0.0,
+                "evictions": self._evictions,
+                "expired": self._expired,
+                "invalidated": self._invalidated,
+            }
+
+    def _check_day(self) -> None:
+        # Relative deadlines resolved yesterday no longer hold today
+        today = date.today().isoformat()
+        if today != self._day:
+            self._day = today
+            self._invalidated += self._store.drop_date_sensitive(today)
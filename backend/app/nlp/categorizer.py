@@ -0,0 +1,170 @@
+from typing import Dict, Iterable, List, Optional, Tuple
+import re
+
+from app.nlp.regex_utils import trie_pattern
+
+# Category keywords in priority order: when a text matches keywords from
+# several categories, the category listed first wins.
+CATEGORY_KEYWORDS: List[Tuple[str, List[str]]] = [
+    ("Work", [
+        # English
+        "work", "meeting", "call", "project", "deadline", "presentation", "client",
+        "email", "report", "document", "office", "boss", "colleague",
+        # Romanian
+        "muncă", "întâlnire", "apel", "proiect", "prezentare", "client",
+        "email", "raport", "document", "birou", "șef", "coleg"
+    ]),
+    ("Family", [
+        # English
+        "family", "kid", "child", "parent", "mom", "dad", "school", "homework",
+        "house", "home", "clean", "cook", "dinner", "lunch", "breakfast",
+        # Romanian
+        "familie", "copil", "părinte", "mama", "tata", "școală", "temă",
+        "casă", "acasă", "curăț", "gătit", "cină", "prânz", "mic dejun"
+    ]),
+    ("Shopping", [
+        # English
+        "buy", "purchase", "shop", "store", "groceries", "market", "mall",
+        "order", "deliver", "amazon", "online",
+        # Romanian
+        "cumpără", "achiziție", "magazin", "cumpărături", "piață", "mall",
+        "comandă", "livrare", "online", "fructe", "legume"
+    ]),
+    ("Health", [
+        # English
+        "doctor", "appointment", "medicine", "prescription", "health", "medical",
+        "workout", "exercise", "gym", "fitness", "dentist", "hospital",
+        # Romanian
+        "doctor", "medic", "programare", "medicament", "rețetă", "sănătate",
+        "antrenament", "exercițiu", "sală", "fitness", "dentist", "spital"
+    ]),
+    ("Finance", [
+        # English
+        "pay", "bill", "invoice", "money", "bank", "account", "tax", "payment",
+        "finance", "budget", "salary", "debt", "loan",
+        # Romanian
+        "plată", "factură", "bani", "bancă", "cont", "taxă", "impozit",
+        "finanțe", "buget", "salariu", "datorie", "împrumut"
+    ]),
+    ("Travel", [
+        # English
+        "trip", "travel", "flight", "airport", "hotel", "vacation", "booking",
+        "car", "drive", "bus", "train", "ticket", "reservation",
+        # Romanian
+        "călătorie", "zbor", "aeroport", "hotel", "vacanță", "rezervare",
+        "mașină", "conducere", "autobuz", "tren", "bilet"
+    ]),
+    ("Social", [
+        # English
+        "party", "event", "birthday", "celebration", "friend", "dinner", "lunch",
+        "drink", "bar", "restaurant", "concert", "movie", "theater",
+        # Romanian
+        "petrecere", "eveniment", "ziua de naștere", "sărbătoare", "prieten",
+        "cină", "prânz", "băutură", "bar", "restaurant", "concert", "film", "teatru"
+    ]),
+    ("Study", [
+        # English
+        "study", "learn", "course", "class", "lecture", "exam", "test",
+        "homework", "assignment", "book", "read", "research", "paper",
+        # Romanian
+        "studiu", "învăța", "curs", "clasă", "lecție", "examen", "test",
+        "temă", "carte", "citit", "cercetare", "lucrare"
+    ]),
+]
+
+# Explicit "#tag" / "(tag)" markers. These are only consulted when no keyword
+# matched, so they rank below every keyword category.
+CATEGORY_TAGS: List[Tuple[str, List[str]]] = [
+    ("Work", ["#work", "(work)"]),
+    ("Family", ["#home", "(home)"]),
+    ("Shopping", ["#shop", "(shop)"]),
+    ("Health", ["#health", "(health)"]),
+    ("Finance", ["#finance", "(finance)"]),
+    ("Travel", ["#travel", "(travel)"]),
+    ("Social", ["#social", "(social)"]),
+    ("Study", ["#study", "(study)"]),
+]
+
+DEFAULT_CATEGORY = "General"
+
+
+class KeywordCategorizer:
+    """
+    Substring keyword categorizer compiled once into a single regex.
+
+    Every position of the text is probed with a zero-width lookahead, so
+    overlapping keywords are all seen. At a given position the greedy trie
+    returns the longest keyword; every shorter keyword matching there is a
+    prefix of it, so each keyword is mapped to the best rank among its own
+    keyword prefixes. The result is identical to scanning every keyword list
+    in priority order with ``in``.
+    """
+
+    def __init__(
+        self,
+        keywords: List[Tuple[str, List[str]]],
+        tags: Optional[List[Tuple[str, List[str]]]] = None,
+        default: str = DEFAULT_CATEGORY,
+    ):
+        self.default = default
+        self._categories: List[str] = []
+        rank_of: Dict[str, int] = {}
+        for category, words in list(keywords) + list(tags or []):
+            rank = len(self._categories)
+            self._categories.append(category)
+            for word in words:
+                word = word.lower()
+                if word not in rank_of:
+                    rank_of[word] = rank
+
+        # Best rank reachable from a match of `word`, including its prefixes
+        self._rank: Dict[str, int] = {
+            word: min(r for other, r in rank_of.items() if word.startswith(other))
+            for word in rank_of
+        }
+        self._pattern = re.compile("(?=(" + trie_pattern(rank_of) + "))")
+
+    def _best_rank(self, text_lower: str) -> Optional[int]:
+        best = None
+        rank_of = self._rank
+        for match in self._pattern.finditer(text_lower):
+            rank = rank_of[match.group(1)]
+            if best is None or rank < best:
+                best = rank
+                if rank == 0:
+                    break
+        return best
+
+    def categorize(self, text: str) -> str:
+        """Return the category for a single task text."""
+        rank = self._best_rank(text.lower())
+        return self.default if rank is None else self._categories[rank]
+
+    def categorize_many(self, texts: Iterable[str]) -> List[str]:
+        """Return the categories for several task texts, in input order."""
+        categories = self._categories
+        default = self.default
+        best_rank = self._best_rank
+        results = []
+        for text in texts:
+            rank = best_rank(text.lower())
+            results.append(default if rank is None else categories[rank])
+        return results
+
+
+# Built once at import and shared by every caller
+_categorizer = KeywordCategorizer(CATEGORY_KEYWORDS, CATEGORY_TAGS)
+
+
+def categorize_task(task: str) -> str:
+    """
+    Enhanced categorization logic based on keyword matching for both English and Romanian.
+    """
+    return _categorizer.categorize(task)
+
+
+def categorize_many(texts: Iterable[str]) -> List[str]:
+    """
+    Categorize a batch of task texts with the shared categorizer.
+    """
+    return _categorizer.categorize_many(texts)
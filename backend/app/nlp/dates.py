@@ -0,0 +1,184 @@
+from typing import Dict, Optional, Tuple, Union
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+import re
+import threading
+import time
+
+ISO_DATE_RE = re.compile(r"\d{4}-\d{2}-\d{2}")
+
+# Day-first numeric dates as written in Romanian: 12/05, 12.05.2024, 3-6-24
+NUMERIC_DATE_RE = re.compile(r"(\d{1,2})[/.\-](\d{1,2})(?:[/.\-](\d{2}|\d{4}))?")
+
+# Month names in both languages, with the usual abbreviations
+MONTHS: Dict[str, int] = {
+    # English
+    "january": 1, "february": 2, "march": 3, "april": 4, "may": 5, "june": 6,
+    "july": 7, "august": 8, "september": 9, "october": 10, "november": 11, "december": 12,
+    "jan": 1, "feb": 2, "mar": 3, "apr": 4, "jun": 6, "jul": 7,
+    "aug": 8, "sep": 9, "sept": 9, "oct": 10, "nov": 11, "dec": 12,
+    # Romanian
+    "ianuarie": 1, "februarie": 2, "martie": 3, "aprilie": 4, "mai": 5, "iunie": 6,
+    "iulie": 7, "septembrie": 9, "octombrie": 10, "noiembrie": 11, "decembrie": 12,
+    "ian": 1, "iun": 6, "iul": 7, "noi": 11,
+}
+
+# "21 may", "21st of May 2024", "3 mai", and month first: "may 21", "May 21st, 2024"
+_ORDINAL = r"(\d{1,2})(?:st|nd|rd|th)?"
+DAY_MONTH_RE = re.compile(_ORDINAL + r"\s+(?:of\s+)?([^\W\d_]+)\.?(?:,?\s+(\d{4}))?")
+MONTH_DAY_RE = re.compile(r"([^\W\d_]+)\.?\s+" + _ORDINAL + r"(?:,?\s+(\d{4}))?")
+
+# Day names in both languages, including the unaccented Romanian spellings
+WEEKDAYS: Dict[str, int] = {
+    # English
+    "monday": 0, "tuesday": 1, "wednesday": 2, "thursday": 3,
+    "friday": 4, "saturday": 5, "sunday": 6,
+    # Romanian
+    "luni": 0, "marți": 1, "marti": 1, "miercuri": 2, "joi": 3,
+    "vineri": 4, "sâmbătă": 5, "sambata": 5, "duminică": 6, "duminica": 6
+}
+
+TOMORROW_WORDS = ("tomorrow", "maine", "mâine")
+TODAY_WORDS = ("today", "azi", "astăzi")
+NEXT_WEEK_WORDS = ("week", "săptămână", "saptamana")
+
+
+def _next_month(day: date) -> date:
+    """Same day next month, clamped to the last day of that month."""
+    year, month = (day.year + 1, 1) if day.month == 12 else (day.year, day.month + 1)
+    try:
+        return day.replace(year=year, month=month)
+    except ValueError:
+        # Jan 31 -> Feb 28/29
+        following = date(year + 1, 1, 1) if month == 12 else date(year, month + 1, 1)
+        return following - timedelta(days=1)
+
+
+@lru_cache(maxsize=64)
+def resolution_table(day: date) -> Dict[str, str]:
+    """
+    Every relative expression we understand, resolved against `day`.
+
+    Built once per day and shared; callers must not modify it.
+    """
+    def fmt(d: date) -> str:
+        return d.strftime("%Y-%m-%d")
+
+    table: Dict[str, str] = {}
+    for word in TOMORROW_WORDS:
+        table[word] = fmt(day + timedelta(days=1))
+    for word in TODAY_WORDS:
+        table[word] = fmt(day)
+    for word in NEXT_WEEK_WORDS:
+        table["next " + word] = fmt(day + timedelta(days=7))
+    table["next month"] = fmt(_next_month(day))
+    for name, weekday in WEEKDAYS.items():
+        # The next occurrence of the day; a week ahead if it is today
+        days_ahead = (weekday - day.weekday()) % 7 or 7
+        resolved = fmt(day + timedelta(days=days_ahead))
+        table[name] = resolved
+        table["next " + name] = resolved
+    return table
+
+
+class DateResolver:
+    """
+    Resolves relative date expressions ("tomorrow", "next friday", "vineri")
+    to YYYY-MM-DD strings with a precomputed table for the reference day.
+
+    With a fixed `reference` (e.g. for batch jobs over historical text) the
+    clock is never read. Otherwise the table tracks the local calendar day
+    and is rebuilt after midnight.
+    """
+
+    def __init__(self, reference: Optional[Union[datetime, date]] = None):
+        self._reference = reference.date() if isinstance(reference, datetime) else reference
+        self._lock = threading.Lock()
+        # (expires_at, table) for the live clock
+        self._current: Tuple[float, Dict[str, str]] = (0.0, {})
+
+    def _table(self) -> Dict[str, str]:
+        if self._reference is not None:
+            return resolution_table(self._reference)
+        expires_at, table = self._current
+        if time.time() < expires_at:
+            return table
+        with self._lock:
+            today = date.today()
+            midnight = datetime.combine(today + timedelta(days=1), datetime.min.time())
+            table = resolution_table(today)
+            self._current = (midnight.timestamp(), table)
+        return table
+
+    def resolve(self, date_str: str) -> str:
+        """
+        Convert relative date references to actual dates in YYYY-MM-DD format.
+        Unknown expressions are returned lowercased and stripped; ISO dates are
+        returned unchanged.
+        """
+        if not date_str:
+            return date_str
+
+        date_str = date_str.lower().strip()
+        if ISO_DATE_RE.fullmatch(date_str):
+            return date_str
+
+        table = self._table()
+        resolved = table.get(date_str)
+        if resolved is not None:
+            return resolved
+
+        # "next" + time unit anywhere in the expression, e.g. "due next friday"
+        if "next " in date_str:
+            time_unit = date_str.split("next ", 1)[1].strip()
+            resolved = table.get("next " + time_unit)
+            if resolved is not None:
+                return resolved
+
+        # If we can't normalize, return the original string
+        return date_str
+
+
+# Shared resolver following the local clock
+default_resolver = DateResolver()
+
+
+def parse_date(value: Optional[str], today: Optional[date] = None) -> Optional[date]:
+    """
+    The date a deadline string refers to: ISO dates, relative expressions
+    ("tomorrow", "next friday", "vineri"), day-first numeric dates and
+    dates with a month name in English or Romanian ("21 may", "3 martie").
+    A date without a year is its next occurrence from `today`.
+    Returns None when the text is not a date.
+    """
+    if not value:
+        return None
+    text = (default_resolver if today is None else DateResolver(today)).resolve(value)
+    if ISO_DATE_RE.fullmatch(text):
+        try:
+            return date.fromisoformat(text)
+        except ValueError:
+            return None
+    match = NUMERIC_DATE_RE.fullmatch(text)
+    if match:
+        day, month, year = match.group(1), int(match.group(2)), match.group(3)
+        if year and len(year) == 2:
+            year = "20" + year
+    elif (match := DAY_MONTH_RE.fullmatch(text)) and match.group(2) in MONTHS:
+        day, month, year = match.group(1), MONTHS[match.group(2)], match.group(3)
+    elif (match := MONTH_DAY_RE.fullmatch(text)) and match.group(1) in MONTHS:
+        day, month, year = match.group(2), MONTHS[match.group(1)], match.group(3)
+    else:
+        return None
+    return _next_date(today or date.today(), int(day), month, int(year) if year else None)
+
+
+def _next_date(today: date, day: int, month: int, year: Optional[int]) -> Optional[date]:
+    """The given date, or without a year its next occurrence from `today`; None if it does not exist."""
+    try:
+        if year:
+            return date(year, month, day)
+        parsed = date(today.year, month, day)
+        return parsed if parsed >= today else date(today.year + 1, month, day)
+    except ValueError:
+        return None
@@ -0,0 +1,239 @@
+from typing import Any, Callable, Dict, List, Optional
+from functools import lru_cache, partial
+import json
+import logging
+import re
+
+logger = logging.getLogger(__name__)
+
+# Greedy decoding; only max_new_tokens (not max_length). Generation usually
+# ends earlier, once the JSON array closes (see AI_STOP_ON_JSON_CLOSE).
+GENERATION_KWARGS = {"max_new_tokens": 256, "do_sample": False, "num_beams": 1}
+
+# Characters that can change the bracket/string state of a JSON-ish text
+_STRUCTURAL_RE = re.compile(r"[\[\]{}\"'\\]")
+
+
+class JsonArrayScanner:
+    """
+    Incremental scanner for the first top-level JSON array in a text.
+
+    Fed chunk by chunk (e.g. one decoded token at a time), it tracks bracket
+    depth and string state and reports as soon as the array closes. Text
+    before the opening "[" is skipped. Single-quoted strings are tracked like
+    double-quoted ones since the model sometimes emits them.
+    """
+
+    def __init__(self):
+        self._parts: List[str] = []
+        self._offset = 0
+        self._depth = 0
+        self._quote: Optional[str] = None
+        self._escaped_pos = -1
+        self.start = -1
+        self.end = -1
+
+    @property
+    def complete(self) -> bool:
+        return self.end >= 0
+
+    def feed(self, chunk: str) -> bool:
+        """Consume more text; returns True once the array has closed."""
+        if self.complete:
+            return True
+        base = self._offset
+        self._parts.append(chunk)
+        self._offset += len(chunk)
+
+        for match in _STRUCTURAL_RE.finditer(chunk):
+            pos = base + match.start()
+            char = match.group()
+            if pos == self._escaped_pos:
+                continue
+            if self._quote is not None:
+                if char == "\\":
+                    self._escaped_pos = pos + 1
+                elif char == self._quote:
+                    self._quote = None
+                continue
+            if self._depth == 0:
+                if char == "[":
+                    self.start = pos
+                    self._depth = 1
+                continue
+            if char == '"' or char == "'":
+                self._quote = char
+            elif char == "[" or char == "{":
+                self._depth += 1
+            elif char == "]" or char == "}":
+                self._depth -= 1
+                if self._depth == 0:
+                    self.end = pos + 1
+                    return True
+        return False
+
+    def text(self) -> Optional[str]:
+        """The complete array text, or None if it has not closed."""
+        if not self.complete:
+            return None
+        return "".join(self._parts)[self.start:self.end]
+
+    def parse(self) -> Optional[List[Any]]:
+        """The array decoded as JSON, or None if incomplete or not valid JSON."""
+        text = self.text()
+        if text is None:
+            return None
+        try:
+            return json.loads(text)
+        except json.JSONDecodeError:
+            return None
+
+
+def parse_json_array(output: str) -> Optional[List[Any]]:
+    """Single-pass parse of the first top-level JSON array in `output`."""
+    scanner = JsonArrayScanner()
+    scanner.feed(output)
+    return scanner.parse()
+
+
+@lru_cache(maxsize=1)
+def _stop_on_json_close_class():
+    # Imported lazily so this module stays usable without transformers
+    from transformers import StoppingCriteria
+
+    class StopOnJsonArrayClose(StoppingCriteria):
+        """
+        Ends generation once every sequence in the batch has either closed
+        its top-level JSON array or emitted EOS. Each step only the newest
+        token of each row is decoded and fed to that row's scanner.
+        """
+
+        def __init__(self, tokenizer):
+            self._tokenizer = tokenizer
+            self._scanners: List[JsonArrayScanner] = []
+            self._finished: List[bool] = []
+            self._length = 0
+
+        def __call__(self, input_ids, scores, **kwargs) -> bool:
+            rows, length = input_ids.shape
+            if rows != len(self._scanners) or length <= self._length:
+                # A new generate call (the pipeline may reuse the criteria)
+                self._scanners = [JsonArrayScanner() for _ in range(rows)]
+                self._finished = [False] * rows
+            self._length = length
+
+            eos = self._tokenizer.eos_token_id
+            for row, token in enumerate(input_ids[:, -1].tolist()):
+                if self._finished[row]:
+                    continue
+                if token == eos:
+                    self._finished[row] = True
+                    continue
+                piece = self._tokenizer.decode([token], skip_special_tokens=True)
+                if piece and self._scanners[row].feed(piece):
+                    self._finished[row] = True
+            return all(self._finished)
+
+    return StopOnJsonArrayClose
+
+
+def json_array_stopping_criteria(tokenizer):
+    """StoppingCriteriaList that halts once the generated JSON array closes."""
+    from transformers import StoppingCriteriaList
+
+    return StoppingCriteriaList([_stop_on_json_close_class()(tokenizer)])
+
+
+def run_pipeline(
+    model,
+    prompts: List[str],
+    generation_kwargs: Dict[str, Any],
+    stop_on_json_close: bool = True,
+) -> List[str]:
+    """Run a batch of prompts through a text2text pipeline in one padded generate call."""
+    kwargs = dict(generation_kwargs)
+    if stop_on_json_close:
+        # Fresh criteria per call: it holds per-row decoding state
+        kwargs["stopping_criteria"] = json_array_stopping_criteria(model.tokenizer)
+    outputs = model(prompts, batch_size=len(prompts), **kwargs)
+    results = []
+    for output in outputs:
+        # Depending on the transformers version each item is a dict or a one-element list
+        if isinstance(output, list):
+            output = output[0]
+        results.append(output["generated_text"] if isinstance(output, dict) else str(output))
+    return results
+
+
+class PrefixCachedGenerator:
+    """
+    Generates for prompts that share a long static prefix, tokenizing the
+    prefix once instead of on every request.
+
+    Only the per-request suffix is tokenized; its ids are appended to the
+    cached prefix ids and the batch goes straight to `model.generate`,
+    skipping the pipeline's preprocessing. Output matches the pipeline as
+    long as tokenizing the parts separately yields the same ids as
+    tokenizing the whole prompt, which is checked up front with `sample`;
+    `enabled` is False when it does not hold. Prompts that do not start
+    with the prefix are tokenized in full.
+
+    The encoder output for the prefix cannot be reused with T5: its encoder
+    attends in both directions, so prefix states depend on the suffix.
+    """
+
+    def __init__(self, pipe, prefix: str, sample: str = "\nINPUT: buy milk tomorrow at 5pm\n\nJSON:"):
+        self._pipe = pipe
+        self._tokenizer = pipe.tokenizer
+        self.prefix = prefix
+        self.prefix_ids: List[int] = self._tokenizer(prefix, add_special_tokens=False)["input_ids"]
+        self.enabled = self._input_ids([prefix + sample])[0] == self._tokenizer(prefix + sample)["input_ids"]
+        if not self.enabled:
+            logger.warning("Prompt prefix does not tokenize independently; prefix cache disabled")
+
+    def _input_ids(self, prompts: List[str]) -> List[List[int]]:
+        tokenizer = self._tokenizer
+        cut = len(self.prefix)
+        suffixes = [p[cut:] for p in prompts if p.startswith(self.prefix)]
+        encoded = iter(tokenizer(suffixes, add_special_tokens=False)["input_ids"] if suffixes else [])
+        ids = []
+        for prompt in prompts:
+            if prompt.startswith(self.prefix):
+                ids.append(tokenizer.build_inputs_with_special_tokens(self.prefix_ids + next(encoded)))
+            else:
+                ids.append(tokenizer(prompt)["input_ids"])
+        return ids
+
+    def __call__(
+        self,
+        prompts: List[str],
+        generation_kwargs: Dict[str, Any],
+        stop_on_json_close: bool = True,
+    ) -> List[str]:
+        import torch
+
+        tokenizer = self._tokenizer
+        batch = tokenizer.pad({"input_ids": self._input_ids(prompts)}, return_tensors="pt")
+        kwargs = dict(generation_kwargs)
+        if stop_on_json_close:
+            kwargs["stopping_criteria"] = json_array_stopping_criteria(tokenizer)
+        with torch.no_grad():
+            output_ids = self._pipe.model.generate(
+                input_ids=batch["input_ids"], attention_mask=batch["attention_mask"], **kwargs
+            )
+        # Same decoding as the text2text pipeline's postprocessing
+        return tokenizer.batch_decode(output_ids, skip_special_tokens=True, clean_up_tokenization_spaces=False)
+
+
+def build_generator(
+    pipe,
+    generation_kwargs: Dict[str, Any],
+    stop_on_json_close: bool = True,
+    prompt_prefix: Optional[str] = None,
+) -> Callable[[List[str]], List[str]]:
+    """Batch generator over a loaded pipeline, using the prefix cache when it applies."""
+    if prompt_prefix:
+        cached = PrefixCachedGenerator(pipe, prompt_prefix)
+        if cached.enabled:
+            return partial(cached, generation_kwargs=generation_kwargs, stop_on_json_close=stop_on_json_close)
+    return partial(run_pipeline, pipe, generation_kwargs=generation_kwargs, stop_on_json_close=stop_on_json_close)
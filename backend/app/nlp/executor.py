@@ -0,0 +1,70 @@
+from typing import Any, Callable, Dict
+from concurrent.futures import Future, ThreadPoolExecutor
+import asyncio
+import threading
+
+
+class InferenceOverloaded(RuntimeError):
+    """Raised when the inference queue is full and a request is rejected."""
+
+
+class BoundedExecutor:
+    """
+    Thread pool with a hard limit on accepted work.
+
+    At most `max_workers` calls run at once and at most `max_pending` more
+    wait for a worker; anything beyond that is rejected immediately with
+    InferenceOverloaded instead of queueing without bound.
+    """
+
+    def __init__(self, max_workers: int = 4, max_pending: int = 16, name: str = "inference"):
+        self.max_workers = max(1, max_workers)
+        self.max_pending = max(0, max_pending)
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=name)
+        self._slots = threading.BoundedSemaphore(self.max_workers + self.max_pending)
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._completed = 0
+        self._rejected = 0
+
+    def submit(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Future:
+        """Schedule fn(*args, **kwargs) or raise InferenceOverloaded."""
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._rejected += 1
+            raise InferenceOverloaded(
+                f"Inference queue is full ({self.max_workers} running, {self.max_pending} waiting)"
+            )
+        with self._lock:
+            self._in_flight += 1
+        try:
+            future = self._executor.submit(fn, *args, **kwargs)
+        except BaseException:
+            self._release(None)
+            raise
+        future.add_done_callback(self._release)
+        return future
+
+    async def run(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Await fn(*args, **kwargs) on the pool without blocking the event loop."""
+        return await asyncio.wrap_future(self.submit(fn, *args, **kwargs))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "workers": self.max_workers,
+                "max_pending": self.max_pending,
+                "in_flight": self._in_flight,
+                "completed": self._completed,
+                "rejected": self._rejected,
+            }
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait)
+
+    def _release(self, _future: Any) -> None:
+        with self._lock:
+            self._in_flight -= 1
+            if _future is not None:
+                self._completed += 1
+        self._slots.release()
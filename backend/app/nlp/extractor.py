@@ -1,26 +1,20 @@
-from typing import List, Dict
+from typing import IO, Dict, Iterable, Iterator, List, Optional, Union
+import codecs
 import re
-from datetime import datetime, timedelta
+from datetime import date, datetime
+
+from app.nlp.categorizer import categorize_task, categorize_many
+from app.nlp.dates import DateResolver, default_resolver
+from app.nlp.scanner import (
+    TIME_RE, TIME_PREFIX_RE, DATE_RE, DEADLINE_PREFIX_RE, RELATIVE_DATE_RE,
+    ROMANIAN_DAYS_RE, ENGLISH_DAYS_RE,
+    TIME_PREFIX, TIME, DEADLINE, DATE, RELATIVE_DATE,
+    scan, first_span, remove_spans,
+)
 
 # Improved regular expressions for task extraction
 SPLIT_RE = re.compile(r"[\.\n;•]+")
 
-# Time patterns (more comprehensive)
-TIME_RE = re.compile(r"\b(\d{1,2}[:\.]\d{2}\s*(?:am|pm|AM|PM)?|\d{1,2}\s*(?:am|pm|AM|PM))\b")
-# Time with "at" or "la" prefix
-TIME_PREFIX_RE = re.compile(r"(?:at|la|@)\s*(\d{1,2}[:\.]\d{2}\s*(?:am|pm|AM|PM)?|\d{1,2}\s*(?:am|pm|AM|PM))")
-
-# Date patterns (more comprehensive)
-DATE_RE = re.compile(r"\b(\d{1,2}[\/\-\.]\d{1,2}(?:[\/\-\.]\d{2,4})?|\d{1,2}(?:st|nd|rd|th)?\s+(?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec|ian|feb|mar|apr|mai|iun|iul|aug|sep|oct|nov|dec)(?:uary|ruary|ch|il|e|y|ust|tember|ober|ember)?(?:\s+\d{2,4})?)\b", re.IGNORECASE)
-# Date with deadline prefixes
-DEADLINE_PREFIX_RE = re.compile(r"(?:by|până la|before|until|due|deadline)\s+(\d{1,2}[\/\-\.]\d{1,2}(?:[\/\-\.]\d{2,4})?|\d{1,2}(?:st|nd|rd|th)?\s+(?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec|ian|feb|mar|apr|mai|iun|iul|aug|sep|oct|nov|dec)(?:uary|ruary|ch|il|e|y|ust|tember|ober|ember)?(?:\s+\d{2,4})?|tomorrow|mâine|today|astăzi|next\s+(?:week|month|monday|tuesday|wednesday|thursday|friday|saturday|sunday|săptămână|luni|marți|miercuri|joi|vineri|sâmbătă|duminică))", re.IGNORECASE)
-# Relative dates
-RELATIVE_DATE_RE = re.compile(r"\b(tomorrow|mâine|maine|today|astăzi|azi|next\s+(?:week|month|monday|tuesday|wednesday|thursday|friday|saturday|sunday|săptămână|luni|marți|miercuri|joi|vineri|sâmbătă|duminică))\b", re.IGNORECASE)
-# Romanian days of the week
-ROMANIAN_DAYS_RE = re.compile(r"\b(luni|marți|miercuri|joi|vineri|sâmbătă|duminică)\b", re.IGNORECASE)
-# English days of the week
-ENGLISH_DAYS_RE = re.compile(r"\b(monday|tuesday|wednesday|thursday|friday|saturday|sunday)\b", re.IGNORECASE)
-
 # Task intention markers in Romanian
 ROMANIAN_TASK_MARKERS = [
     "trebuie", "să", "ar trebui", "vreau să", "voi", "o să", "va trebui", 
@@ -89,108 +83,89 @@ def is_greeting(text: str) -> bool:
     
     return False
 
-def normalize_date(date_str: str) -> str:
+def normalize_date(date_str: str, reference: Optional[Union[datetime, date]] = None) -> str:
     """
     Convert relative date references to actual dates in YYYY-MM-DD format.
+
+    Relative expressions are resolved against `reference` when given, and
+    against the current local day otherwise.
+    """
+    resolver = default_resolver if reference is None else DateResolver(reference)
+    return resolver.resolve(date_str)
+
+
+def _extract_segment(raw: str, resolver: DateResolver = default_resolver) -> Optional[Dict[str, str]]:
     """
-    if not date_str:
-        return date_str
+    Extract a task from a single segment of the input, or return None when
+    the segment holds no task. The category is filled in by the caller so
+    segments can be categorized in batches.
+    """
+    s = raw.strip(" -•\t*")
+    if not s:
+        return None
         
-    date_str = date_str.lower().strip()
-    today = datetime.now()
+    # Filter trivial tokens and common greetings/phrases
+    if len(s) < 3 or re.fullmatch(r"[A-Za-z]", s) or s.lower() in {
+        "hi", "hello", "salut", "hey", "thanks", "thank you", "mulțumesc", 
+        "ok", "okay", "sure", "yes", "no", "da", "nu"
+    }:
+        return None
+
+    time = None
+    deadline = None
     
-    # Handle simple cases
-    if date_str in ["tomorrow", "maine", "mâine"]:
-        tomorrow = today + timedelta(days=1)
-        return tomorrow.strftime("%Y-%m-%d")
-    elif date_str in ["today", "azi", "astăzi"]:
-        return today.strftime("%Y-%m-%d")
-        
-    # Handle "next" + time unit
-    if "next " in date_str:
-        parts = date_str.split("next ", 1)
-        time_unit = parts[1].strip() if len(parts) > 1 else ""
-        
-        if time_unit == "week":
-            # Next week = 7 days from now
-            next_date = today + timedelta(days=7)
-            return next_date.strftime("%Y-%m-%d")
-        elif time_unit == "month":
-            # Next month = same day next month
-            month = today.month + 1
-            year = today.year
-            if month > 12:
-                month = 1
-                year += 1
-            try:
-                next_date = today.replace(year=year, month=month)
-            except ValueError:
-                # Handle edge cases like Jan 31 -> Feb 28
-                next_date = today.replace(year=year, month=month, day=1) - timedelta(days=1)
-            return next_date.strftime("%Y-%m-%d")
-        elif time_unit in ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]:
-            # Calculate days until next occurrence of the day
-            day_mapping = {
-                "monday": 0, "tuesday": 1, "wednesday": 2, "thursday": 3,
-                "friday": 4, "saturday": 5, "sunday": 6
-            }
-            target_weekday = day_mapping.get(time_unit)
-            if target_weekday is not None:
-                days_ahead = (target_weekday - today.weekday()) % 7
-                if days_ahead == 0:
-                    days_ahead = 7  # If today is the target day, get next week
-                next_date = today + timedelta(days=days_ahead)
-                return next_date.strftime("%Y-%m-%d")
-        elif time_unit in ["săptămână", "saptamana"]:
-            # Next week in Romanian
-            next_date = today + timedelta(days=7)
-            return next_date.strftime("%Y-%m-%d")
-        elif time_unit in ["luni", "marți", "marti", "miercuri", "joi", "vineri", "sâmbătă", "sambata", "duminică", "duminica"]:
-            # Romanian day names
-            day_mapping = {
-                "luni": 0, "marți": 1, "marti": 1, "miercuri": 2, "joi": 3,
-                "vineri": 4, "sâmbătă": 5, "sambata": 5, "duminică": 6, "duminica": 6
-            }
-            target_weekday = day_mapping.get(time_unit)
-            if target_weekday is not None:
-                days_ahead = (target_weekday - today.weekday()) % 7
-                if days_ahead == 0:
-                    days_ahead = 7  # If today is the target day, get next week
-                next_date = today + timedelta(days=days_ahead)
-                return next_date.strftime("%Y-%m-%d")
+    # Scan the segment once for every time/date span
+    spans = scan(s)
     
-    # Handle standalone day names (this week or next if today is past that day)
-    day_mapping = {
-        # English
-        "monday": 0, "tuesday": 1, "wednesday": 2, "thursday": 3,
-        "friday": 4, "saturday": 5, "sunday": 6,
-        # Romanian
-        "luni": 0, "marți": 1, "marti": 1, "miercuri": 2, "joi": 3,
-        "vineri": 4, "sâmbătă": 5, "sambata": 5, "duminică": 6, "duminica": 6
-    }
+    # Extract time with priority to time with prefixes
+    time_prefix_span = first_span(spans, TIME_PREFIX)
+    if time_prefix_span:
+        time = time_prefix_span.value
+        # The matched part is removed from the task text below
+    else:
+        time_span = first_span(spans, TIME)
+        if time_span:
+            time = time_span.value
+            # Keep time in task text as it might be part of the task description
+    
+    # Extract deadline with priority to deadlines with prefixes,
+    # skipping anything inside the prefixed time that gets removed
+    deadline_prefix_span = first_span(spans, DEADLINE, skip=time_prefix_span)
+    if deadline_prefix_span:
+        # Normalize the deadline to an actual date
+        deadline = resolver.resolve(deadline_prefix_span.value)
+        # The matched part is removed from the task text below
+    else:
+        # Try matching a date without prefix, then relative dates
+        date_span = (first_span(spans, DATE, skip=time_prefix_span)
+                     or first_span(spans, RELATIVE_DATE, skip=time_prefix_span))
+        if date_span:
+            # Normalize the deadline to an actual date
+            deadline = resolver.resolve(date_span.value)
+            # Keep date in task text as it might be part of the task description
     
-    if date_str in day_mapping:
-        target_weekday = day_mapping[date_str]
-        days_ahead = (target_weekday - today.weekday()) % 7
-        if days_ahead == 0:
-            # If today is the target day and it's mentioned without context,
-            # assume it means today rather than next week
-            days_ahead = 0  
-        # If today is after the mentioned day, get next week
-        if days_ahead == 0 and "next" not in date_str:
-            days_ahead = 7
-        next_date = today + timedelta(days=days_ahead)
-        return next_date.strftime("%Y-%m-%d")
+    # Process the task text: drop prefixed time/deadline, normalize whitespace
+    if time_prefix_span or deadline_prefix_span:
+        s = remove_spans(s, [time_prefix_span, deadline_prefix_span])
+    else:
+        s = " ".join(s.split())
     
-    # If we can't normalize, return the original string
-    return date_str
+    return {
+        "task": s,
+        "time": time,
+        "deadline": deadline,
+        "category": None,
+    }
 
 
-def extract_tasks(input_text: str) -> List[Dict[str, str]]:
+def extract_tasks(input_text: str, reference: Optional[Union[datetime, date]] = None) -> List[Dict[str, str]]:
     """
     Enhanced task extraction with improved time, date, and deadline detection
     for both English and Romanian text.
+
+    Relative deadlines are resolved against `reference` (default: today).
     """
+    resolver = default_resolver if reference is None else DateResolver(reference)
     # Quick check for greetings
     if is_greeting(input_text):
         return []  # Return empty list for pure greetings
@@ -212,38 +187,37 @@ def extract_tasks(input_text: str) -> List[Dict[str, str]]:
         time = None
         deadline = None
         
+        spans = scan(s)
+        
         # Extract time
-        time_prefix_match = TIME_PREFIX_RE.search(s)
-        if time_prefix_match:
-            time = time_prefix_match.group(1)
-        else:
-            time_match = TIME_RE.search(s)
-            if time_match:
-                time = time_match.group(1)
+        time_span = first_span(spans, TIME_PREFIX) or first_span(spans, TIME)
+        if time_span:
+            time = time_span.value
         
         # Extract deadline
         if "maine" in s.lower() or "mâine" in s.lower():
             deadline = "maine" if "maine" in s.lower() else "mâine"
             # Normalize the deadline to an actual date
-            deadline = normalize_date(deadline)
+            deadline = resolver.resolve(deadline)
         elif "azi" in s.lower() or "astăzi" in s.lower():
             deadline = "azi" if "azi" in s.lower() else "astăzi"
             # Normalize the deadline to an actual date
-            deadline = normalize_date(deadline)
+            deadline = resolver.resolve(deadline)
         else:
             # Check for Romanian days of the week
             day_match = ROMANIAN_DAYS_RE.search(s)
             if day_match:
                 deadline = day_match.group(1)
                 # Normalize the deadline to an actual date
-                deadline = normalize_date(deadline)
+                deadline = resolver.resolve(deadline)
             else:
                 # Try other date patterns
-                deadline_match = DEADLINE_PREFIX_RE.search(s) or DATE_RE.search(s) or RELATIVE_DATE_RE.search(s)
-                if deadline_match:
-                    deadline = deadline_match.group(1)
+                deadline_span = (first_span(spans, DEADLINE) or first_span(spans, DATE)
+                                 or first_span(spans, RELATIVE_DATE))
+                if deadline_span:
+                    deadline = deadline_span.value
                     # Normalize the deadline to an actual date
-                    deadline = normalize_date(deadline)
+                    deadline = resolver.resolve(deadline)
         
         # For Romanian, extract a reasonable task description
         if has_romanian_markers:
@@ -258,207 +232,105 @@ def extract_tasks(input_text: str) -> List[Dict[str, str]]:
     
     # Standard processing for other inputs
     for raw in raw_parts:
-        s = raw.strip(" -•\t*")
-        if not s:
-            continue
-            
-        # Filter trivial tokens and common greetings/phrases
-        if len(s) < 3 or re.fullmatch(r"[A-Za-z]", s) or s.lower() in {
-            "hi", "hello", "salut", "hey", "thanks", "thank you", "mulțumesc", 
-            "ok", "okay", "sure", "yes", "no", "da", "nu"
-        }:
-            continue
+        task = _extract_segment(raw, resolver)
+        if task is not None:
+            tasks.append(task)
 
-        time = None
-        deadline = None
-        
-        # Extract time with priority to time with prefixes
-        time_prefix_match = TIME_PREFIX_RE.search(s)
-        if time_prefix_match:
-            time = time_prefix_match.group(1)
-            # Remove the matched part from task text
-            s = s.replace(time_prefix_match.group(0), " ")
-        else:
-            time_match = TIME_RE.search(s)
-            if time_match:
-                time = time_match.group(1)
-                # Keep time in task text as it might be part of the task description
-        
-        # Extract deadline with priority to deadlines with prefixes
-        deadline_prefix_match = DEADLINE_PREFIX_RE.search(s)
-        if deadline_prefix_match:
-            deadline = deadline_prefix_match.group(1)
-            # Normalize the deadline to an actual date
-            deadline = normalize_date(deadline)
-            # Remove the matched part from task text
-            s = s.replace(deadline_prefix_match.group(0), " ")
-        else:
-            # Try matching a date without prefix
-            date_match = DATE_RE.search(s)
-            if date_match:
-                deadline = date_match.group(1)
-                # Normalize the deadline to an actual date
-                deadline = normalize_date(deadline)
-                # Keep date in task text as it might be part of the task description
-            else:
-                # Try relative dates
-                relative_date_match = RELATIVE_DATE_RE.search(s)
-                if relative_date_match:
-                    deadline = relative_date_match.group(1)
-                    # Normalize the deadline to an actual date
-                    deadline = normalize_date(deadline)
-                    # Keep date in task text as it might be part of the task description
-        
-        # Process the task text: normalize whitespace
-        s = re.sub(r'\s+', ' ', s).strip()
-        
-        task = {
-            "task": s,
-            "time": time,
-            "deadline": deadline,
-            "category": categorize_task(s),
-        }
-        tasks.append(task)
+    # Categorize all segments in one batch
+    for task, category in zip(tasks, categorize_many(t["task"] for t in tasks)):
+        task["category"] = category
 
     return tasks
 
-def categorize_task(task: str) -> str:
+
+class TaskStream:
     """
-    Enhanced categorization logic based on keyword matching for both English and Romanian.
+    Incremental version of extract_tasks for very large inputs.
+
+    Text is fed in chunks (str or UTF-8 bytes) and tasks are returned as soon
+    as the segments holding them are complete, so only the current partial
+    segment is kept in memory. Until the input is known to be more than a
+    short single-segment text it is buffered and handed to extract_tasks,
+    which keeps greeting detection and the Romanian single-sentence handling
+    identical to the non-streaming path.
     """
-    # Convert to lowercase for case-insensitive matching
-    task_lower = task.lower()
-    
-    # Work/Office related keywords
-    work_keywords = [
-        # English
-        "work", "meeting", "call", "project", "deadline", "presentation", "client", 
-        "email", "report", "document", "office", "boss", "colleague", 
-        # Romanian
-        "muncă", "întâlnire", "apel", "proiect", "prezentare", "client", 
-        "email", "raport", "document", "birou", "șef", "coleg"
-    ]
-    
-    # Family/Home related keywords
-    family_keywords = [
-        # English
-        "family", "kid", "child", "parent", "mom", "dad", "school", "homework",
-        "house", "home", "clean", "cook", "dinner", "lunch", "breakfast",
-        # Romanian
-        "familie", "copil", "părinte", "mama", "tata", "școală", "temă", 
-        "casă", "acasă", "curăț", "gătit", "cină", "prânz", "mic dejun"
-    ]
-    
-    # Shopping/Errands keywords
-    shopping_keywords = [
-        # English
-        "buy", "purchase", "shop", "store", "groceries", "market", "mall",
-        "order", "deliver", "amazon", "online",
-        # Romanian
-        "cumpără", "achiziție", "magazin", "cumpărături", "piață", "mall",
-        "comandă", "livrare", "online", "fructe", "legume"
-    ]
-    
-    # Health/Medical keywords
-    health_keywords = [
-        # English
-        "doctor", "appointment", "medicine", "prescription", "health", "medical",
-        "workout", "exercise", "gym", "fitness", "dentist", "hospital",
-        # Romanian
-        "doctor", "medic", "programare", "medicament", "rețetă", "sănătate", 
-        "antrenament", "exercițiu", "sală", "fitness", "dentist", "spital"
-    ]
-    
-    # Finance/Bills keywords
-    finance_keywords = [
-        # English
-        "pay", "bill", "invoice", "money", "bank", "account", "tax", "payment",
-        "finance", "budget", "salary", "debt", "loan",
-        # Romanian
-        "plată", "factură", "bani", "bancă", "cont", "taxă", "impozit",
-        "finanțe", "buget", "salariu", "datorie", "împrumut"
-    ]
-    
-    # Travel/Transportation keywords
-    travel_keywords = [
-        # English
-        "trip", "travel", "flight", "airport", "hotel", "vacation", "booking",
-        "car", "drive", "bus", "train", "ticket", "reservation",
-        # Romanian
-        "călătorie", "zbor", "aeroport", "hotel", "vacanță", "rezervare",
-        "mașină", "conducere", "autobuz", "tren", "bilet"
-    ]
-    
-    # Social/Events keywords
-    social_keywords = [
-        # English
-        "party", "event", "birthday", "celebration", "friend", "dinner", "lunch",
-        "drink", "bar", "restaurant", "concert", "movie", "theater",
-        # Romanian
-        "petrecere", "eveniment", "ziua de naștere", "sărbătoare", "prieten",
-        "cină", "prânz", "băutură", "bar", "restaurant", "concert", "film", "teatru"
-    ]
-    
-    # Study/Education keywords
-    study_keywords = [
-        # English
-        "study", "learn", "course", "class", "lecture", "exam", "test",
-        "homework", "assignment", "book", "read", "research", "paper",
-        # Romanian
-        "studiu", "învăța", "curs", "clasă", "lecție", "examen", "test",
-        "temă", "carte", "citit", "cercetare", "lucrare"
-    ]
-    
-    # Check for each category
-    for keyword in work_keywords:
-        if keyword in task_lower:
-            return "Work"
-            
-    for keyword in family_keywords:
-        if keyword in task_lower:
-            return "Family"
-            
-    for keyword in shopping_keywords:
-        if keyword in task_lower:
-            return "Shopping"
-            
-    for keyword in health_keywords:
-        if keyword in task_lower:
-            return "Health"
-            
-    for keyword in finance_keywords:
-        if keyword in task_lower:
-            return "Finance"
-            
-    for keyword in travel_keywords:
-        if keyword in task_lower:
-            return "Travel"
-            
-    for keyword in social_keywords:
-        if keyword in task_lower:
-            return "Social"
-            
-    for keyword in study_keywords:
-        if keyword in task_lower:
-            return "Study"
-    
-    # Check for specific categories based on task markers
-    if "#work" in task_lower or "(work)" in task_lower:
-        return "Work"
-    elif "#home" in task_lower or "(home)" in task_lower:
-        return "Family"
-    elif "#shop" in task_lower or "(shop)" in task_lower:
-        return "Shopping"
-    elif "#health" in task_lower or "(health)" in task_lower:
-        return "Health"
-    elif "#finance" in task_lower or "(finance)" in task_lower:
-        return "Finance"
-    elif "#travel" in task_lower or "(travel)" in task_lower:
-        return "Travel"
-    elif "#social" in task_lower or "(social)" in task_lower:
-        return "Social"
-    elif "#study" in task_lower or "(study)" in task_lower:
-        return "Study"
-    
-    # Default
-    return "General"
\ No newline at end of file
+
+    # Greetings are at most a few words; longer input is never one
+    _HEAD_WORDS = 10
+
+    def __init__(self, reference: Optional[Union[datetime, date]] = None):
+        self._reference = reference
+        self._resolver = default_resolver if reference is None else DateResolver(reference)
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self._pending = ""
+        self._has_delimiter = False
+        self._streaming = False
+        self._closed = False
+
+    def feed(self, chunk: Union[str, bytes]) -> List[Dict[str, str]]:
+        """Add a chunk of input and return the tasks completed by it."""
+        if self._closed:
+            raise ValueError("TaskStream is already closed")
+        if isinstance(chunk, bytes):
+            chunk = self._decoder.decode(chunk)
+        if not chunk:
+            return []
+        self._pending += chunk
+
+        if not self._streaming:
+            self._has_delimiter = self._has_delimiter or bool(SPLIT_RE.search(chunk))
+            if not self._has_delimiter or len(self._pending.split()) <= self._HEAD_WORDS:
+                return []
+            self._streaming = True
+
+        parts = SPLIT_RE.split(self._pending)
+        # The last part may continue in the next chunk
+        self._pending = parts.pop()
+        return self._complete(parts)
+
+    def close(self) -> List[Dict[str, str]]:
+        """Flush the remaining input and return its tasks."""
+        if self._closed:
+            return []
+        self._closed = True
+        self._pending += self._decoder.decode(b"", final=True)
+        text, self._pending = self._pending, ""
+        if not self._streaming:
+            return extract_tasks(text, self._reference)
+        return self._complete([text])
+
+    def _complete(self, segments: List[str]) -> List[Dict[str, str]]:
+        tasks = []
+        for raw in segments:
+            task = _extract_segment(raw, self._resolver)
+            if task is not None:
+                tasks.append(task)
+        for task, category in zip(tasks, categorize_many(t["task"] for t in tasks)):
+            task["category"] = category
+        return tasks
+
+
+def iter_tasks(
+    stream: Union[str, bytes, IO, Iterable[Union[str, bytes]]],
+    chunk_size: int = 64 * 1024,
+    reference: Optional[Union[datetime, date]] = None,
+) -> Iterator[Dict[str, str]]:
+    """
+    Yield tasks from a text stream as its segments complete.
+
+    `stream` may be a string, a file-like object (text or binary) read in
+    `chunk_size` pieces, or any iterable of str/bytes chunks. Produces the
+    same tasks as extract_tasks on the concatenated input, with relative
+    deadlines resolved against `reference` (default: today).
+    """
+    if isinstance(stream, (str, bytes)):
+        chunks: Iterable[Union[str, bytes]] = [stream]
+    elif hasattr(stream, "read"):
+        chunks = iter(lambda: stream.read(chunk_size), stream.read(0))
+    else:
+        chunks = stream
+
+    parser = TaskStream(reference)
+    for chunk in chunks:
+        yield from parser.feed(chunk)
+    yield from parser.close()
@@ -1,10 +1,11 @@
 from __future__ import annotations
 
 import json
+import os
 import re
 from typing import Any, Dict, List
 
-from transformers import pipeline
+from app.nlp.backends import load_pipeline
 
 _gen = None
 
@@ -14,12 +15,7 @@ def _get_generator():
 	if _gen is None:
 		# Small, CPU-friendly model; adjust if you have GPU
 		# flan-t5-small handles instruction-style prompts reasonably
-		_gen = pipeline(
-			"text2text-generation",
-			model="google/flan-t5-small",
-			tokenizer="google/flan-t5-small",
-			device=-1,
-		)
+		_gen = load_pipeline("google/flan-t5-small", os.getenv("AI_INFERENCE_BACKEND", "torch"))
 	return _gen
 
 
@@ -0,0 +1,55 @@
+from typing import List, Optional
+
+# Instructions and few-shot examples shared by every prompt; only the INPUT
+# part that follows changes per request
+PROMPT_PREFIX = (
+    "You are an expert task extraction engine. Read the INPUT and produce a JSON array of tasks.\n"
+    "Rules:\n"
+    "- The language may be Romanian or English. You must understand both.\n"
+    "- Output ONLY valid JSON (no markdown, no explanation).\n"
+    "- Each item has keys exactly: task, time, category, deadline.\n"
+    "- Use null for unknown fields.\n"
+    "- Ignore greetings, filler, random characters, or single letters.\n"
+    "- Do not split words into letters.\n"
+    "- If there are no tasks, return [].\n"
+    "- Normalize relative dates: 'tomorrow' should be the actual date (e.g., '2023-05-21').\n"
+    "\nCategories should be one of: Work, Personal, Family, Health, Shopping, Study, Finance, Travel, Home, Other\n"
+    "\nExamples:\n"
+    "English example: \"I need to buy milk at 5pm\"\n"
+    "JSON: [{\"task\":\"buy milk\",\"time\":\"5pm\",\"category\":\"Shopping\",\"deadline\":null}]\n"
+    "\nRomanian example: \"trebuie sa merg maine la piata\"\n"
+    "JSON: [{\"task\":\"merg la piata\",\"time\":null,\"category\":\"Shopping\",\"deadline\":\"maine\"}]\n"
+    "\nRomanian example: \"du copilul la scoala dimineata\"\n"
+    "JSON: [{\"task\":\"du copilul la scoala\",\"time\":\"dimineata\",\"category\":\"Family\",\"deadline\":null}]\n"
+    "\nRomanian example: \"plata facturi pana vineri\"\n"
+    "JSON: [{\"task\":\"plata facturi\",\"time\":null,\"category\":\"Finance\",\"deadline\":\"vineri\"}]\n"
+    "\nEnglish example: \"Hello! I need to buy milk tomorrow and call John on Friday\"\n"
+    "JSON: [{\"task\":\"buy milk\",\"time\":null,\"category\":\"Shopping\",\"deadline\":\"tomorrow\"}, {\"task\":\"call John\",\"time\":null,\"category\":\"Personal\",\"deadline\":\"Friday\"}]\n"
+)
+
+
+def build_prompt(text: str) -> str:
+    """Full task extraction prompt for one input."""
+    # The static prefix is tokenized once at load time (see PrefixCachedGenerator)
+    return f"{PROMPT_PREFIX}\nINPUT: {text}\n\nJSON:"
+
+
+# Representative bilingual inputs at several lengths, run before the model is
+# declared ready (AI_WARMUP_FILE replaces them, one input per line)
+WARMUP_INPUTS = (
+    "buy milk",
+    "trebuie sa merg maine la piata",
+    "Meeting with John on Friday at 3pm and submit the report by 12/05",
+    "plata facturi pana vineri, du copilul la scoala dimineata si suna la doctor pentru programare",
+    "Hello! Tomorrow I need to pick up the kids from school at 4pm, buy groceries for the week, "
+    "pay the electricity bill before the 15th, call mom about the weekend trip and finish the "
+    "project presentation for Monday's meeting with the client",
+)
+
+
+def load_warmup_inputs(path: Optional[str] = None) -> List[str]:
+    """Warmup inputs from `path` (one per line, blanks ignored) or the defaults."""
+    if not path:
+        return list(WARMUP_INPUTS)
+    with open(path, encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip()]
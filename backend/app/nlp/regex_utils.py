@@ -0,0 +1,25 @@
+from typing import Dict, Iterable
+import re
+
+
+def trie_pattern(words: Iterable[str]) -> str:
+    """
+    Build a regex alternation factored by common prefixes, so the engine
+    only tries the branches whose first characters actually match.
+    """
+    trie: Dict[str, dict] = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def build(node: Dict[str, dict]) -> str:
+        alts = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not alts:
+            return ""
+        body = "(?:" + "|".join(alts) + ")"
+        # A word ends here: the longer continuations are optional (and greedy)
+        return body + "?" if "" in node else body
+
+    return build(trie)
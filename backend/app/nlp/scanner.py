@@ -0,0 +1,156 @@
+from typing import Dict, List, NamedTuple, Optional, Tuple
+import re
+
+from app.nlp.regex_utils import trie_pattern
+
+# Clock times: 10:30, 7.30pm, 5 pm
+_TIME_BODY = r"\d{1,2}[:\.]\d{2}\s*(?:am|pm|AM|PM)?|\d{1,2}\s*(?:am|pm|AM|PM)"
+# Time patterns (more comprehensive)
+TIME_RE = re.compile(rf"\b({_TIME_BODY})\b")
+# Time with "at" or "la" prefix
+TIME_PREFIX_RE = re.compile(rf"(?:at|la|@)\s*({_TIME_BODY})")
+# A time written straight after its prefix word: the "5pm" of "at5pm"
+_GLUED_TIME_RE = re.compile(rf"({_TIME_BODY})\b")
+
+# Date patterns (more comprehensive)
+DATE_RE = re.compile(r"\b(\d{1,2}[\/\-\.]\d{1,2}(?:[\/\-\.]\d{2,4})?|\d{1,2}(?:st|nd|rd|th)?\s+(?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec|ian|feb|mar|apr|mai|iun|iul|aug|sep|oct|nov|dec)(?:uary|ruary|ch|il|e|y|ust|tember|ober|ember)?(?:\s+\d{2,4})?)\b", re.IGNORECASE)
+# Date with deadline prefixes
+DEADLINE_PREFIX_RE = re.compile(r"(?:by|până la|before|until|due|deadline)\s+(\d{1,2}[\/\-\.]\d{1,2}(?:[\/\-\.]\d{2,4})?|\d{1,2}(?:st|nd|rd|th)?\s+(?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec|ian|feb|mar|apr|mai|iun|iul|aug|sep|oct|nov|dec)(?:uary|ruary|ch|il|e|y|ust|tember|ober|ember)?(?:\s+\d{2,4})?|tomorrow|mâine|today|astăzi|next\s+(?:week|month|monday|tuesday|wednesday|thursday|friday|saturday|sunday|săptămână|luni|marți|miercuri|joi|vineri|sâmbătă|duminică))", re.IGNORECASE)
+# Relative dates
+RELATIVE_DATE_RE = re.compile(r"\b(tomorrow|mâine|maine|today|astăzi|azi|next\s+(?:week|month|monday|tuesday|wednesday|thursday|friday|saturday|sunday|săptămână|luni|marți|miercuri|joi|vineri|sâmbătă|duminică))\b", re.IGNORECASE)
+# Romanian days of the week
+ROMANIAN_DAYS_RE = re.compile(r"\b(luni|marți|miercuri|joi|vineri|sâmbătă|duminică)\b", re.IGNORECASE)
+# English days of the week
+ENGLISH_DAYS_RE = re.compile(r"\b(monday|tuesday|wednesday|thursday|friday|saturday|sunday)\b", re.IGNORECASE)
+# Days of the week in either language
+WEEKDAY_RE = re.compile(r"\b(monday|tuesday|wednesday|thursday|friday|saturday|sunday|luni|marți|miercuri|joi|vineri|sâmbătă|duminică)\b", re.IGNORECASE)
+
+# Span kinds emitted by the scanner
+TIME_PREFIX = "time_prefix"      # "at 5pm", "la 10:30"
+TIME = "time"                    # "5pm", "10:30"
+DEADLINE = "deadline"            # "by 12/05", "până la mâine"
+DATE = "date"                    # "12/05", "3rd march"
+RELATIVE_DATE = "relative_date"  # "tomorrow", "next friday"
+WEEKDAY = "weekday"              # "friday", "vineri"
+
+# Words that can open a span, mapped to the patterns anchored at that word
+_WORD_ANCHORS: Dict[str, Tuple[Tuple[str, "re.Pattern"], ...]] = {}
+for _words, _kind, _pattern in (
+    (["at", "la"], TIME_PREFIX, TIME_PREFIX_RE),
+    (["by", "până", "before", "until", "due", "deadline"], DEADLINE, DEADLINE_PREFIX_RE),
+    (["tomorrow", "mâine", "maine", "today", "astăzi", "azi", "next"], RELATIVE_DATE, RELATIVE_DATE_RE),
+    (["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday",
+      "luni", "marți", "miercuri", "joi", "vineri", "sâmbătă", "duminică"], WEEKDAY, WEEKDAY_RE),
+):
+    for _word in _words:
+        _WORD_ANCHORS[_word] = _WORD_ANCHORS.get(_word, ()) + ((_kind, _pattern),)
+
+_NUMBER_ANCHORS = ((TIME, TIME_RE), (DATE, DATE_RE))
+_AT_ANCHORS = ((TIME_PREFIX, TIME_PREFIX_RE),)
+_GLUED_TIME_ANCHORS = ((TIME, _GLUED_TIME_RE),)
+# Prefix words a time may follow without a space: "at5pm", "la10:30"
+_TIME_PREFIX_WORDS = tuple(word for word, anchors in _WORD_ANCHORS.items() if (TIME_PREFIX, TIME_PREFIX_RE) in anchors)
+_ANCHORS = dict(_WORD_ANCHORS, **{digit: _NUMBER_ANCHORS for digit in "0123456789"})
+_ANCHORS["@"] = _AT_ANCHORS
+
+# Finds the positions where a span can start: digits, "@" and the anchor
+# words above. A bare literal trie lets the regex engine skip ahead on the
+# first character, which is far cheaper than word-boundary assertions; word
+# boundaries are checked afterwards on the few candidates found. Matched
+# against the lowercased text to avoid a case-insensitive scan.
+ANCHOR_RE = re.compile(trie_pattern(_ANCHORS))
+# Used for the rare texts whose lowercase form has a different length
+_ANCHOR_RE_I = re.compile(trie_pattern(_ANCHORS), re.IGNORECASE)
+
+
+class Span(NamedTuple):
+    kind: str
+    start: int
+    end: int
+    value: str
+
+
+def _follows_time_prefix(lowered: str, pos: int) -> bool:
+    """Whether lowered[:pos] ends with a whole time prefix word ("at", "la")."""
+    for word in _TIME_PREFIX_WORDS:
+        start = pos - len(word)
+        if lowered.startswith(word, start) and start >= 0:
+            if not start or not (lowered[start - 1].isalnum() or lowered[start - 1] == "_"):
+                return True
+    return False
+
+
+def scan(text: str) -> Dict[str, List[Span]]:
+    """
+    Walk the text once and return its time/date spans grouped by kind, each
+    list in order of position.
+
+    A single anchor scan locates candidate starts; each candidate is then
+    matched in place with the relevant pattern instead of searching the
+    whole text once per pattern. Prefix words ("at", "by", ...) only count
+    at the start of a word, so "that 5pm" is no longer read as "at 5pm".
+    A time may follow its prefix word directly ("at5pm", "la10:30").
+    Spans of different kinds may overlap (e.g. "at 5pm" also contains the
+    time "5pm").
+    """
+    lowered = text.lower()
+    if len(lowered) == len(text):
+        anchors = ANCHOR_RE.finditer(lowered)
+    else:
+        lowered = text
+        anchors = _ANCHOR_RE_I.finditer(text)
+
+    spans: Dict[str, List[Span]] = {}
+    for anchor in anchors:
+        pos, end = anchor.span()
+        word = anchor.group()
+        candidates = _ANCHORS[word.lower()]
+        if word != "@":
+            # Anchors must start a word; words must also end there, except
+            # that a time may be glued to its prefix word
+            if pos and (lowered[pos - 1].isalnum() or lowered[pos - 1] == "_"):
+                if not (word.isdigit() and _follows_time_prefix(lowered, pos)):
+                    continue
+                candidates = _GLUED_TIME_ANCHORS
+            if word.isalpha() and end < len(lowered) and (lowered[end].isalnum() or lowered[end] == "_"):
+                if not (lowered[end].isdigit() and word.lower() in _TIME_PREFIX_WORDS):
+                    continue
+                candidates = _AT_ANCHORS
+        for kind, pattern in candidates:
+            match = pattern.match(text, pos)
+            if match is not None:
+                span = Span(kind, pos, match.end(), match.group(1))
+                if kind in spans:
+                    spans[kind].append(span)
+                else:
+                    spans[kind] = [span]
+    return spans
+
+
+def first_span(spans: Dict[str, List[Span]], kind: str, skip: Optional[Span] = None) -> Optional[Span]:
+    """
+    Return the leftmost span of the given kind, ignoring spans that overlap
+    `skip` (typically a span that has already been cut out of the text).
+    """
+    found = spans.get(kind)
+    if not found:
+        return None
+    if skip is None:
+        return found[0]
+    for span in found:
+        if span.start < skip.end and skip.start < span.end:
+            continue
+        return span
+    return None
+
+
+def remove_spans(text: str, spans: List[Optional[Span]]) -> str:
+    """Cut the given spans out of the text and normalize whitespace."""
+    parts = []
+    pos = 0
+    for span in sorted((s for s in spans if s is not None), key=lambda s: s.start):
+        if span.start > pos:
+            parts.append(text[pos:span.start])
+        pos = max(pos, span.end)
+    parts.append(text[pos:])
+    return " ".join(" ".join(parts).split())
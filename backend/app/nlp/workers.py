@@ -0,0 +1,267 @@
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from concurrent.futures import Future
+import itertools
+import logging
+import multiprocessing
+import os
+import threading
+import time
+
+from app.nlp.backends import load_pipeline
+from app.nlp.decoding import build_generator
+
+logger = logging.getLogger(__name__)
+
+# Generator built inside a worker process: prompts in, generated texts out
+Generator = Callable[[List[str]], List[str]]
+
+
+def pipeline_generator(
+    model_path: str,
+    generation_kwargs: Dict[str, Any],
+    stop_on_json_close: bool = True,
+    prompt_prefix: Optional[str] = None,
+    backend: str = "torch",
+) -> Generator:
+    """Load a CPU text2text pipeline and wrap it as a batch generator."""
+    model = load_pipeline(model_path, backend)
+    return build_generator(model, generation_kwargs, stop_on_json_close, prompt_prefix)
+
+
+def _worker_main(
+    index: int,
+    factory: Callable[[], Generator],
+    preloaded: Optional[Generator],
+    cpus: List[int],
+    threads: int,
+    conn,
+) -> None:
+    """Entry point of an inference worker process."""
+    try:
+        if cpus and hasattr(os, "sched_setaffinity"):
+            os.sched_setaffinity(0, cpus)
+        try:
+            import torch
+            torch.set_num_threads(threads)
+        except ImportError:
+            pass
+        # A forked worker inherits the parent's generator and its weights
+        generate = preloaded if preloaded is not None else factory()
+        conn.send(("ready", os.getpid()))
+    except Exception as e:
+        conn.send(("failed", repr(e)))
+        return
+
+    while True:
+        try:
+            message = conn.recv()
+        except (EOFError, KeyboardInterrupt):
+            return
+        if message is None:
+            return
+        job_id, prompts = message
+        try:
+            conn.send((job_id, True, generate(prompts)))
+        except Exception as e:
+            conn.send((job_id, False, repr(e)))
+
+
+class _Worker:
+    def __init__(self, index: int, cpus: List[int]):
+        self.index = index
+        self.cpus = cpus
+        self.process: Optional[multiprocessing.Process] = None
+        self.conn = None
+        self.state = "starting"
+        # job id -> (future, submitted at)
+        self.pending: Dict[int, Tuple[Future, float]] = {}
+        self.completed = 0
+        self.failures = 0
+        self.restarts = 0
+        self.last_latency_ms: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self.send_lock = threading.Lock()
+
+
+class InferenceWorkerPool:
+    """
+    Runs generation in N worker processes, each holding its own model, so
+    inference scales across cores instead of sharing one GIL and one torch
+    thread pool.
+
+    Each worker is pinned to its own slice of the available CPUs with a
+    matching torch thread count. Batches go to the healthy worker with the
+    fewest outstanding jobs. With the "fork" start method the model is
+    loaded once in the parent and shared copy-on-write by the workers;
+    otherwise every worker loads it (safetensors checkpoints are memory
+    mapped, so the file pages are still shared through the page cache).
+    A worker that dies fails its outstanding jobs and is restarted.
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[], Generator],
+        processes: int,
+        start_method: str = "spawn",
+        threads_per_worker: Optional[int] = None,
+        max_restarts: int = 3,
+    ):
+        self._factory = factory
+        self._context = multiprocessing.get_context(start_method)
+        self._start_method = start_method
+        self._max_restarts = max_restarts
+        self._lock = threading.Lock()
+        self._job_ids = itertools.count()
+        self._rr = itertools.count()
+        self._closed = False
+        self._preloaded: Optional[Generator] = None
+
+        cpus = sorted(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else list(range(os.cpu_count() or 1))
+        processes = max(1, processes)
+        per_worker = max(1, len(cpus) // processes)
+        self._threads = threads_per_worker or per_worker
+        self._workers = []
+        for i in range(processes):
+            # Contiguous CPU slices; no pinning when there are more workers than CPUs
+            chunk = cpus[i * per_worker:(i + 1) * per_worker] if len(cpus) >= processes else []
+            self._workers.append(_Worker(i, chunk))
+
+    def start(self, timeout: Optional[float] = None) -> None:
+        """Start every worker and wait until at least one is ready."""
+        if self._start_method == "fork" and self._preloaded is None:
+            self._preloaded = self._factory()
+        for worker in self._workers:
+            self._spawn(worker)
+        deadline = None if timeout is None else time.time() + timeout
+        while not any(w.state == "ready" for w in self._workers):
+            if all(w.state == "failed" for w in self._workers):
+                errors = "; ".join(w.last_error or "unknown" for w in self._workers)
+                raise RuntimeError(f"All inference workers failed to start: {errors}")
+            if deadline is not None and time.time() > deadline:
+                raise TimeoutError("Timed out waiting for inference workers")
+            time.sleep(0.05)
+
+    def generate(self, prompts: List[str], timeout: Optional[float] = None) -> List[str]:
+        """Run a batch on the least-loaded healthy worker."""
+        return self.submit(prompts).result(timeout)
+
+    def submit(self, prompts: List[str]) -> Future:
+        future: Future = Future()
+        with self._lock:
+            ready = [w for w in self._workers if w.state == "ready"]
+            if not ready:
+                raise RuntimeError("No inference worker is available")
+            # Least outstanding jobs; round-robin among ties
+            offset = next(self._rr)
+            worker = min(
+                ready,
+                key=lambda w: (len(w.pending), (w.index - offset) % len(self._workers)),
+            )
+            job_id = next(self._job_ids)
+            worker.pending[job_id] = (future, time.perf_counter())
+        try:
+            with worker.send_lock:
+                worker.conn.send((job_id, prompts))
+        except (OSError, ValueError) as e:
+            with self._lock:
+                worker.pending.pop(job_id, None)
+            future.set_exception(RuntimeError(f"Worker {worker.index} unavailable: {e}"))
+        return future
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """Per-worker health for get_status()."""
+        with self._lock:
+            return [
+                {
+                    "index": w.index,
+                    "pid": w.process.pid if w.process else None,
+                    "state": w.state,
+                    "alive": bool(w.process and w.process.is_alive()),
+                    "cpus": w.cpus,
+                    "threads": self._threads,
+                    "in_flight": len(w.pending),
+                    "completed": w.completed,
+                    "failures": w.failures,
+                    "restarts": w.restarts,
+                    "last_latency_ms": w.last_latency_ms,
+                    "last_error": w.last_error,
+                }
+                for w in self._workers
+            ]
+
+    def close(self) -> None:
+        self._closed = True
+        for worker in self._workers:
+            try:
+                with worker.send_lock:
+                    worker.conn.send(None)
+            except Exception:
+                pass
+            if worker.process is not None:
+                worker.process.join(timeout=5)
+                if worker.process.is_alive():
+                    worker.process.terminate()
+
+    def _spawn(self, worker: _Worker) -> None:
+        parent_conn, child_conn = self._context.Pipe()
+        process = self._context.Process(
+            target=_worker_main,
+            args=(worker.index, self._factory, self._preloaded, worker.cpus, self._threads, child_conn),
+            name=f"ai-worker-{worker.index}",
+            daemon=True,
+        )
+        worker.state = "starting"
+        worker.conn = parent_conn
+        worker.process = process
+        process.start()
+        child_conn.close()
+        reader = threading.Thread(target=self._reader, args=(worker, parent_conn), name=f"ai-worker-{worker.index}-reader")
+        reader.daemon = True
+        reader.start()
+
+    def _reader(self, worker: _Worker, conn) -> None:
+        """Resolve a worker's jobs as its results arrive and track its health."""
+        try:
+            status, detail = conn.recv()
+            if status != "ready":
+                worker.state = "failed"
+                worker.last_error = detail
+                logger.error(f"Inference worker {worker.index} failed to start: {detail}")
+                return
+            worker.state = "ready"
+            logger.info(f"Inference worker {worker.index} ready (pid {detail}, cpus {worker.cpus})")
+            while True:
+                job_id, ok, payload = conn.recv()
+                with self._lock:
+                    job = worker.pending.pop(job_id, None)
+                    if ok:
+                        worker.completed += 1
+                    else:
+                        worker.failures += 1
+                        worker.last_error = payload
+                if job is None:
+                    continue
+                future, submitted_at = job
+                worker.last_latency_ms = round((time.perf_counter() - submitted_at) * 1000, 2)
+                if ok:
+                    future.set_result(payload)
+                else:
+                    future.set_exception(RuntimeError(payload))
+        except (EOFError, OSError):
+            pass
+
+        # The process exited: fail what it still owed and bring it back
+        with self._lock:
+            orphans = [future for future, _ in worker.pending.values()]
+            worker.pending.clear()
+            worker.state = "dead"
+        for future in orphans:
+            future.set_exception(RuntimeError(f"Inference worker {worker.index} died"))
+        if self._closed:
+            return
+        if worker.restarts < self._max_restarts:
+            worker.restarts += 1
+            logger.warning(f"Restarting inference worker {worker.index} (restart {worker.restarts})")
+            self._spawn(worker)
+        else:
+            logger.error(f"Inference worker {worker.index} exceeded {self._max_restarts} restarts")
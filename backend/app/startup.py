@@ -0,0 +1,168 @@
+from typing import Any, Dict, List, Optional
+from contextlib import contextmanager
+import importlib.abc
+import os
+import sys
+import threading
+import time
+
+
+def _process_start_time() -> Optional[float]:
+    """Wall-clock time the process started (Linux), or None if unknown."""
+    try:
+        with open("/proc/self/stat") as f:
+            # The command name may contain spaces; fields resume after ")"
+            fields = f.read().rsplit(")", 1)[1].split()
+        with open("/proc/stat") as f:
+            boot_time = next(int(line.split()[1]) for line in f if line.startswith("btime"))
+        return boot_time + int(fields[19]) / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError, StopIteration):
+        return None
+
+
+class _TimedLoader(importlib.abc.Loader):
+    """Wraps a module loader to time its exec_module."""
+
+    def __init__(self, loader, profile: "StartupProfile"):
+        self._loader = loader
+        self._profile = profile
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        self._profile._import_started(module.__name__)
+        try:
+            self._loader.exec_module(module)
+        finally:
+            self._profile._import_finished(module.__name__)
+
+    def __getattr__(self, name):
+        return getattr(self._loader, name)
+
+
+class _TimingFinder(importlib.abc.MetaPathFinder):
+    """Meta path hook that hands every module to a _TimedLoader."""
+
+    def __init__(self, profile: "StartupProfile"):
+        self._profile = profile
+        self._local = threading.local()
+
+    def find_spec(self, fullname, path, target=None):
+        if getattr(self._local, "busy", False):
+            return None
+        self._local.busy = True
+        try:
+            for finder in sys.meta_path:
+                if finder is self or not hasattr(finder, "find_spec"):
+                    continue
+                spec = finder.find_spec(fullname, path, target)
+                if spec is not None:
+                    if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+                        spec.loader = _TimedLoader(spec.loader, self._profile)
+                    return spec
+            return None
+        finally:
+            self._local.busy = False
+
+
+class StartupProfile:
+    """
+    Records where cold start time goes: named phases (imports, model
+    tokenizer/weights load, first generate), milestones (app ready, model
+    ready, first request) and, when enabled, import time per module.
+
+    All times are seconds; offsets are measured from process start when the
+    OS reports it, otherwise from the first import of this module.
+    """
+
+    def __init__(self):
+        self.created_at = time.time()
+        self.process_started_at = _process_start_time() or self.created_at
+        self._lock = threading.Lock()
+        self._phases: List[Dict[str, Any]] = []
+        self._marks: Dict[str, float] = {}
+        self._imports: Dict[str, Dict[str, float]] = {}
+        # Per-thread stack of [module, started, time spent in nested imports]
+        self._import_state = threading.local()
+        self._finder: Optional[_TimingFinder] = None
+
+    def offset(self, at: Optional[float] = None) -> float:
+        return round((time.time() if at is None else at) - self.process_started_at, 4)
+
+    @contextmanager
+    def phase(self, name: str):
+        """Time a block of startup work under `name`."""
+        started = time.time()
+        error = None
+        try:
+            yield
+        except BaseException as e:
+            error = repr(e)
+            raise
+        finally:
+            record = {
+                "name": name,
+                "start": self.offset(started),
+                "duration": round(time.time() - started, 4),
+                "thread": threading.current_thread().name,
+            }
+            if error:
+                record["error"] = error
+            with self._lock:
+                self._phases.append(record)
+
+    def mark(self, name: str, once: bool = True) -> None:
+        """Record a milestone; with `once`, only its first occurrence."""
+        with self._lock:
+            if once and name in self._marks:
+                return
+            self._marks[name] = self.offset()
+
+    def enable_import_timing(self) -> None:
+        """Time every module imported from now on (inclusive and self time)."""
+        if self._finder is None:
+            self._finder = _TimingFinder(self)
+            sys.meta_path.insert(0, self._finder)
+
+    def disable_import_timing(self) -> None:
+        if self._finder is not None:
+            sys.meta_path.remove(self._finder)
+            self._finder = None
+
+    def _import_stack(self) -> List[List[Any]]:
+        stack = getattr(self._import_state, "stack", None)
+        if stack is None:
+            stack = self._import_state.stack = []
+        return stack
+
+    def _import_started(self, name: str) -> None:
+        self._import_stack().append([name, time.perf_counter(), 0.0])
+
+    def _import_finished(self, name: str) -> None:
+        stack = self._import_stack()
+        if not stack or stack[-1][0] != name:
+            return
+        _, started, children = stack.pop()
+        total = time.perf_counter() - started
+        if stack:
+            stack[-1][2] += total
+        with self._lock:
+            self._imports[name] = {"cumulative": round(total, 4), "self": round(total - children, 4)}
+
+    def snapshot(self, top: int = 30) -> Dict[str, Any]:
+        with self._lock:
+            imports = sorted(self._imports.items(), key=lambda item: item[1]["self"], reverse=True)
+            return {
+                "pid": os.getpid(),
+                "process_started_at": self.process_started_at,
+                "uptime": self.offset(),
+                "marks": dict(self._marks),
+                "phases": list(self._phases),
+                "import_timing": self._finder is not None,
+                "imports": [dict(module=name, **times) for name, times in imports[:top]],
+            }
+
+
+# Process-wide profile; app.main enables import timing with STARTUP_PROFILE_IMPORTS=1
+startup_profile = StartupProfile()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Compare inference backends (torch, int8, onnx) for the task extractor on
+latency, throughput, memory and output equality against torch.
+
+Each backend runs in a fresh process so load time and RSS are not skewed
+by the others. Backends whose dependencies are missing are reported and
+skipped.
+
+Usage: python bench_backends.py [backend ...] [--runs N]
+"""
+
+import multiprocessing
+import resource
+import statistics
+import sys
+import time
+
+from app.nlp.backends import load_pipeline
+from app.nlp.decoding import GENERATION_KWARGS, build_generator, parse_json_array
+from app.nlp.prompts import PROMPT_PREFIX, build_prompt
+
+MODEL = "google/flan-t5-small"
+
+# Regression corpus: outputs must match the torch backend on all of these
+CORPUS = [
+    "I need to buy milk tomorrow",
+    "Meeting with John on Friday at 3pm",
+    "submit the report by 12/05 and call the client",
+    "trebuie sa merg la doctor maine la 10:30",
+    "pick up kids from school and pay rent before 1st March",
+    "dinner @ 7:30pm with Ana",
+    "plata facturi vineri si du copilul la scoala",
+    "exam on 3 jan 2025 at 9am, then go to the gym",
+    "Hello! Can you remind me to water the plants next week?",
+    "cumpara paine, lapte si oua de la magazin",
+]
+
+
+def rss_mb():
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_backend(backend, runs, conn):
+    try:
+        base = rss_mb()
+        start = time.perf_counter()
+        pipe = load_pipeline(MODEL, backend)
+        generate = build_generator(pipe, GENERATION_KWARGS, prompt_prefix=PROMPT_PREFIX)
+        load_s = time.perf_counter() - start
+        loaded = rss_mb()
+
+        prompts = [build_prompt(text) for text in CORPUS]
+        outputs = generate(prompts)
+
+        latencies = []
+        for i in range(runs):
+            prompt = prompts[i % len(prompts)]
+            start = time.perf_counter()
+            generate([prompt])
+            latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        for _ in range(max(1, runs // len(prompts))):
+            generate(prompts)
+        batched = time.perf_counter() - start
+        batched_prompts = max(1, runs // len(prompts)) * len(prompts)
+
+        conn.send({
+            "load_s": load_s,
+            "model_rss_mb": loaded - base,
+            "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+            "p50_ms": statistics.median(latencies) * 1000,
+            "p95_ms": sorted(latencies)[int(len(latencies) * 0.95) - 1] * 1000,
+            "throughput": batched_prompts / batched,
+            "outputs": outputs,
+        })
+    except Exception as e:
+        conn.send({"error": repr(e)})
+
+
+def main():
+    args = sys.argv[1:]
+    runs = 20
+    if "--runs" in args:
+        i = args.index("--runs")
+        runs = int(args[i + 1])
+        del args[i:i + 2]
+    backends = args or ["torch", "int8", "onnx"]
+    if "torch" not in backends:
+        backends.insert(0, "torch")
+
+    ctx = multiprocessing.get_context("spawn")
+    results = {}
+    for backend in backends:
+        parent, child = ctx.Pipe()
+        process = ctx.Process(target=run_backend, args=(backend, runs, child))
+        process.start()
+        results[backend] = parent.recv()
+        process.join()
+
+    baseline = results["torch"].get("outputs")
+    print(f"{'backend':8} {'load s':>7} {'model MB':>9} {'peak MB':>8} {'p50 ms':>8} {'p95 ms':>8} {'prompts/s':>10}  identical")
+    for backend, r in results.items():
+        if "error" in r:
+            print(f"{backend:8} skipped: {r['error']}")
+            continue
+        same_text = sum(a == b for a, b in zip(r["outputs"], baseline or []))
+        same_json = sum(parse_json_array(a) == parse_json_array(b) for a, b in zip(r["outputs"], baseline or []))
+        print(
+            f"{backend:8} {r['load_s']:7.1f} {r['model_rss_mb']:9.0f} {r['peak_rss_mb']:8.0f} "
+            f"{r['p50_ms']:8.1f} {r['p95_ms']:8.1f} {r['throughput']:10.2f}  "
+            f"text {same_text}/{len(CORPUS)}, json {same_json}/{len(CORPUS)}"
+        )
+        for text, a, b in zip(CORPUS, r["outputs"], baseline or []):
+            if parse_json_array(a) != parse_json_array(b):
+                print(f"    differs on {text!r}:\n      torch: {b}\n      {backend}: {a}")
+
+
+if __name__ == "__main__":
+    main()
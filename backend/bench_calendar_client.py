@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Benchmark the cached CalendarClient against building a calendar service on
+every call (what get_calendar_service() used to do), using a local stub of
+the Calendar API so no Google account or network is needed.
+
+Reports per-call latency of list_events and create_event both ways, how
+many TCP connections the stub accepted, and a dozen inserts made one by one
+against a single batch request. With GOOGLE_APPLICATION_CREDENTIALS
+set it also times re-reading the service-account file, which the old path
+paid on every call as well.
+
+Usage: python bench_calendar_client.py [calls] [--threads N]
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+import os
+import statistics
+import sys
+import time
+
+from google.auth.credentials import AnonymousCredentials
+from googleapiclient.discovery import build
+import google_auth_httplib2
+import httplib2
+
+from app.google.calendar import CalendarClient, SCOPES
+from calendar_stub import StubCalendarServer, seed_events
+
+EVENT = {
+    "summary": "buy milk",
+    "start": {"dateTime": "2024-05-21T17:00:00Z", "timeZone": "UTC"},
+    "end": {"dateTime": "2024-05-21T18:00:00Z", "timeZone": "UTC"},
+}
+
+
+def rebuilt_service(api_endpoint):
+    """The old path: a new service (discovery parse, HTTP transport) per call."""
+    http = google_auth_httplib2.AuthorizedHttp(AnonymousCredentials(), http=httplib2.Http())
+    return build("calendar", "v3", http=http, client_options={"api_endpoint": api_endpoint}, static_discovery=True)
+
+
+def per_call(fn, calls, threads):
+    durations = []
+
+    def timed(_):
+        start = time.perf_counter()
+        fn()
+        durations.append(time.perf_counter() - start)
+
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(timed, range(calls)))
+    return statistics.mean(durations), statistics.quantiles(durations, n=20)[-1]
+
+
+def main():
+    args = sys.argv[1:]
+    threads = 1
+    if "--threads" in args:
+        i = args.index("--threads")
+        threads = int(args[i + 1])
+        del args[i:i + 2]
+    calls = int(args[0]) if args else 200
+
+    print(f"calls: {calls}, threads: {threads}")
+    with StubCalendarServer() as stub:
+        seed_events(stub.calendar, 10)
+        client = CalendarClient(credentials=AnonymousCredentials(), api_endpoint=stub.api_endpoint)
+        client.list_events()  # first call builds the service; not what is being compared
+
+        results = {}
+        for name, list_call, create_call in [
+            ("rebuilt per call", lambda: rebuilt_service(stub.api_endpoint).events().list(calendarId="primary", maxResults=10).execute(),
+             lambda: rebuilt_service(stub.api_endpoint).events().insert(calendarId="primary", body=EVENT).execute()),
+            ("cached client", client.list_events, lambda: client.create_event({"task": "buy milk"})),
+        ]:
+            before = stub.connections
+            results[name] = (per_call(list_call, calls, threads), per_call(create_call, calls, threads))
+            (list_mean, list_p95), (create_mean, create_p95) = results[name]
+            print(f"\n{name}:")
+            print(f"  list_events   mean {list_mean * 1000:7.2f} ms  p95 {list_p95 * 1000:7.2f} ms")
+            print(f"  create_event  mean {create_mean * 1000:7.2f} ms  p95 {create_p95 * 1000:7.2f} ms")
+            print(f"  TCP connections opened: {stub.connections - before}")
+
+        old, new = results["rebuilt per call"], results["cached client"]
+        print(f"\nsaved per list_events:  {(old[0][0] - new[0][0]) * 1000:.2f} ms ({old[0][0] / new[0][0]:.1f}x)")
+        print(f"saved per create_event: {(old[1][0] - new[1][0]) * 1000:.2f} ms ({old[1][0] / new[1][0]:.1f}x)")
+
+        # A /parse of a long note: a dozen events, one insert each vs one batch
+        events = [dict(EVENT, summary=f"task {i}") for i in range(12)]
+        start = time.perf_counter()
+        for event in events:
+            client.service().events().insert(calendarId="primary", body=event).execute()
+        one_by_one = time.perf_counter() - start
+        start = time.perf_counter()
+        client.insert_events(events)
+        batched = time.perf_counter() - start
+        print(f"\n{len(events)} events one insert each: {one_by_one * 1000:7.2f} ms")
+        print(f"{len(events)} events in one batch:     {batched * 1000:7.2f} ms")
+
+    path = os.getenv("GOOGLE_APPLICATION_CREDENTIALS")
+    if path:
+        from google.oauth2 import service_account
+
+        start = time.perf_counter()
+        for _ in range(calls):
+            service_account.Credentials.from_service_account_file(path, scopes=SCOPES)
+        print(f"\nre-reading {path}: {(time.perf_counter() - start) / calls * 1000:.2f} ms per call (also saved)")
+
+
+if __name__ == "__main__":
+    main()
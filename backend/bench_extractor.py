@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Benchmark the fused time/date scanner against the previous per-pattern
+extraction on a large generated document.
+
+Usage: python bench_extractor.py [sentences]
+"""
+
+import random
+import re
+import sys
+import time
+
+from app.nlp.extractor import SPLIT_RE
+from app.nlp.scanner import (
+    TIME_RE, TIME_PREFIX_RE, DATE_RE, DEADLINE_PREFIX_RE, RELATIVE_DATE_RE,
+    TIME_PREFIX, TIME, DEADLINE, DATE, RELATIVE_DATE,
+    scan, first_span, remove_spans,
+)
+
+SENTENCES = [
+    "Meeting with John on Friday at 3pm",
+    "I need to buy milk tomorrow",
+    "submit the report by 12/05 to the client",
+    "call the dentist about the appointment next week",
+    "trebuie sa merg la doctor maine la 10:30",
+    "pick up kids from school",
+    "pay rent before 1st March",
+    "dinner @ 7:30pm with Ana",
+    "exam on 3 jan 2025 at 9am",
+    "plata facturi vineri",
+]
+
+# Context that pads sentences to the length seen in pasted documents
+FILLERS = [
+    "as discussed with the team during the weekly sync",
+    "please keep the rest of the group in the loop",
+    "conform discuției de ieri cu echipa de proiect",
+    "and make sure the notes are shared afterwards",
+    "",
+]
+
+
+def legacy_segment(s, passes):
+    """Per-segment extraction as done before the fused scanner."""
+    time = deadline = None
+    passes[0] += 1
+    m = TIME_PREFIX_RE.search(s)
+    if m:
+        time = m.group(1)
+        passes[0] += 1
+        s = s.replace(m.group(0), " ")
+    else:
+        passes[0] += 1
+        m = TIME_RE.search(s)
+        if m:
+            time = m.group(1)
+    passes[0] += 1
+    m = DEADLINE_PREFIX_RE.search(s)
+    if m:
+        deadline = m.group(1)
+        passes[0] += 1
+        s = s.replace(m.group(0), " ")
+    else:
+        passes[0] += 1
+        m = DATE_RE.search(s)
+        if not m:
+            passes[0] += 1
+            m = RELATIVE_DATE_RE.search(s)
+        if m:
+            deadline = m.group(1)
+    passes[0] += 1
+    s = re.sub(r'\s+', ' ', s).strip()
+    return s, time, deadline
+
+
+def fused_segment(s, passes):
+    """Per-segment extraction with the fused scanner."""
+    time = deadline = None
+    passes[0] += 1
+    spans = scan(s)
+    time_prefix = first_span(spans, TIME_PREFIX)
+    time_span = time_prefix or first_span(spans, TIME)
+    if time_span:
+        time = time_span.value
+    deadline_prefix = first_span(spans, DEADLINE, skip=time_prefix)
+    date_span = deadline_prefix or first_span(spans, DATE, skip=time_prefix) or first_span(spans, RELATIVE_DATE, skip=time_prefix)
+    if date_span:
+        deadline = date_span.value
+    passes[0] += 1
+    if time_prefix or deadline_prefix:
+        s = remove_spans(s, [time_prefix, deadline_prefix])
+    else:
+        s = " ".join(s.split())
+    return s, time, deadline
+
+
+def run(fn, segments):
+    passes = [0]
+    start = time.perf_counter()
+    for seg in segments:
+        fn(seg, passes)
+    return time.perf_counter() - start, passes[0]
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    random.seed(0)
+    document = ". ".join(
+        f"{random.choice(SENTENCES)} {random.choice(FILLERS)}".strip() for _ in range(count)
+    )
+    segments = [p.strip() for p in SPLIT_RE.split(document) if p.strip()]
+
+    print(f"{count} sentences, {len(segments)} segments, {len(document)} chars")
+    for name, fn in (("legacy", legacy_segment), ("fused", fused_segment)):
+        best = None
+        for _ in range(7):
+            elapsed, passes = run(fn, segments)
+            best = elapsed if best is None else min(best, elapsed)
+        print(f"{name:>7}: {best * 1000:8.1f} ms  {passes / len(segments):.2f} full-text passes/segment")
+
+
+if __name__ == "__main__":
+    main()
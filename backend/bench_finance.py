@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Benchmark /finance/analyze: the columnar engine (app.finance.engine)
+against the previous row-by-row csv.DictReader loop, on a synthetic bank
+export. Both must return the same summary.
+
+With --stream it also compares peak memory of the JSON csvText body
+against streaming the raw file in 64 KB chunks (/finance/analyze/stream).
+
+With --parallel it times analyze_parallel (/finance/analyze with
+parallel) on process pools of 1, 2, 4 and 8 workers. Scaling is bounded
+by the CPUs available, which are printed.
+
+Usage: python bench_finance.py [rows] [--comma-decimals] [--stream] [--parallel]
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+
+import csv
+import io
+import json
+import multiprocessing
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+from app.finance.engine import analyze_csv, categorize_description
+from app.finance.parallel import analyze_parallel
+from app.finance.stream import StreamingAnalyzer
+
+MERCHANTS = [
+    "UBER *TRIP", "OMV Petrom 123", "Kaufland Cluj", "LIDL 0456", "Carrefour Market",
+    "Restaurant Casa Veche", "Netflix.com", "Electrica Furnizare", "Digi Internet",
+    "Catena Pharma", "Clinica Medicala", "Emag.ro", "Decathlon", "Salary ACME SRL",
+    "Transfer to savings", "Mega Image 0012", "Glovo food", "Apa Nova water",
+]
+
+
+def generate_csv(rows: int, comma_decimals: bool = False, seed: int = 7) -> str:
+    """A bank export with date, description and amount columns."""
+    rng = random.Random(seed)
+    out = io.StringIO()
+    writer = csv.writer(out)
+    writer.writerow(["date", "description", "amount", "currency"])
+    for i in range(rows):
+        amount = f"{rng.uniform(-500, 200):.2f}"
+        if comma_decimals:
+            amount = amount.replace(".", ",")
+        # Card payments carry a reference, so descriptions repeat but not always
+        desc = rng.choice(MERCHANTS) + (f" REF{rng.randint(1, 50)}" if rng.random() < 0.5 else "")
+        writer.writerow([f"2024-{1 + i % 12:02d}-{1 + i % 28:02d}", desc, amount, "RON"])
+    return out.getvalue()
+
+
+def legacy_analyze(text: str):
+    """The previous /finance/analyze implementation, for comparison."""
+    reader = csv.DictReader(io.StringIO(text))
+    total = 0.0
+    by_cat = {}
+    count = 0
+    for row in reader:
+        try:
+            amt = float(row.get('amount') or row.get('Amount') or 0)
+        except ValueError:
+            amt = float((row.get('amount') or '0').replace(',', '.'))
+        desc = row.get('description') or row.get('Description') or ''
+        cat = categorize_description(desc)
+        total += amt
+        by_cat[cat] = by_cat.get(cat, 0.0) + amt
+        count += 1
+    return {"total": round(total, 2), "byCategory": {k: round(v, 2) for k, v in by_cat.items()}, "transactions": count}
+
+
+def best_of(fn, runs=3):
+    best = float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    rows = int(args[0]) if args else 200_000
+    text = generate_csv(rows, comma_decimals="--comma-decimals" in sys.argv)
+    assert analyze_csv(text) == legacy_analyze(text)
+
+    legacy = best_of(lambda: legacy_analyze(text))
+    columnar = best_of(lambda: analyze_csv(text))
+    print(f"rows: {rows} ({len(text) / 1e6:.1f} MB)")
+    print(f"row-by-row DictReader: {legacy * 1000:8.1f} ms")
+    print(f"columnar engine:       {columnar * 1000:8.1f} ms ({legacy / columnar:.1f}x)")
+
+    if "--parallel" in sys.argv:
+        cpus = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count()
+        print(f"parallel ({cpus} CPUs available):")
+        expected = None
+        for workers in (1, 2, 4, 8):
+            with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+                # Start every worker before timing
+                list(pool.map(abs, range(workers)))
+                # Same chunks on every pool size, so the same result
+                result = analyze_parallel(text, executor=pool)
+                assert expected is None or result == expected
+                expected = result
+                elapsed = best_of(lambda: analyze_parallel(text, executor=pool))
+            print(f"  {workers} workers: {elapsed * 1000:8.1f} ms ({columnar / elapsed:.1f}x the columnar engine)")
+
+    if "--stream" in sys.argv:
+        data = text.encode("utf-8")
+        body = json.dumps({"csvText": text}).encode("utf-8")
+        del text
+
+        def from_json():
+            return analyze_csv(json.loads(body)["csvText"])
+
+        def from_stream():
+            analyzer = StreamingAnalyzer()
+            for i in range(0, len(data), 1 << 16):
+                analyzer.feed(data[i:i + (1 << 16)])
+            return analyzer.close()
+
+        for name, fn in [("JSON csvText body", from_json), ("streamed raw body", from_stream)]:
+            tracemalloc.start()
+            started = time.perf_counter()
+            fn()
+            elapsed = time.perf_counter() - started
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            print(f"{name:18s}: peak {peak / 1e6:7.1f} MB beyond the request bytes, {elapsed * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
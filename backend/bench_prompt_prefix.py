@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Benchmark tokenizing the static few-shot prefix once (PrefixCachedGenerator)
+against tokenizing the whole prompt on every request.
+
+Reports per-request tokenization time and token counts; with --generate it
+also times end-to-end generation through the pipeline and through the
+cached-prefix path, plus the encoder forward pass alone.
+
+Usage: python bench_prompt_prefix.py [requests] [--generate]
+"""
+
+import sys
+import time
+
+from transformers import pipeline
+
+from app.nlp.decoding import GENERATION_KWARGS, PrefixCachedGenerator, run_pipeline
+from app.nlp.prompts import PROMPT_PREFIX, build_prompt
+
+MODEL = "google/flan-t5-small"
+
+INPUTS = [
+    "I need to buy milk tomorrow",
+    "Meeting with John on Friday at 3pm and submit the report by 12/05",
+    "trebuie sa merg la doctor maine la 10:30",
+    "pay rent before 1st March, call the dentist next week",
+    "plata facturi vineri si du copilul la scoala",
+]
+
+
+def best_of(fn, runs=5):
+    best = float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    requests = int(args[0]) if args else 2000
+    prompts = [build_prompt(INPUTS[i % len(INPUTS)]) for i in range(requests)]
+
+    pipe = pipeline("text2text-generation", model=MODEL, tokenizer=MODEL, device=-1)
+    tokenizer = pipe.tokenizer
+    cached = PrefixCachedGenerator(pipe, PROMPT_PREFIX)
+    assert cached.enabled, "prefix does not tokenize independently"
+
+    # Same ids either way
+    for prompt in prompts[:len(INPUTS)]:
+        assert cached._input_ids([prompt])[0] == tokenizer(prompt)["input_ids"]
+
+    full = best_of(lambda: [tokenizer(p)["input_ids"] for p in prompts])
+    split = best_of(lambda: [cached._input_ids([p]) for p in prompts])
+    suffix_tokens = sum(len(tokenizer(p[len(PROMPT_PREFIX):], add_special_tokens=False)["input_ids"]) for p in prompts[:len(INPUTS)])
+
+    print(f"requests: {requests}")
+    print(f"prefix tokens: {len(cached.prefix_ids)}, avg suffix tokens: {suffix_tokens / len(INPUTS):.1f}")
+    print(f"full prompt tokenization:   {full / requests * 1e6:8.1f} us/request")
+    print(f"cached prefix tokenization: {split / requests * 1e6:8.1f} us/request")
+    print(f"saved: {(full - split) / requests * 1e6:.1f} us/request ({full / split:.1f}x)")
+
+    if "--generate" in sys.argv:
+        import torch
+
+        batch = list(INPUTS)
+        batch_prompts = [build_prompt(t) for t in batch]
+        via_pipeline = best_of(lambda: run_pipeline(pipe, batch_prompts, GENERATION_KWARGS), runs=3)
+        via_cache = best_of(lambda: cached(batch_prompts, GENERATION_KWARGS), runs=3)
+        assert run_pipeline(pipe, batch_prompts, GENERATION_KWARGS) == cached(batch_prompts, GENERATION_KWARGS)
+
+        encoded = tokenizer(batch_prompts, padding=True, return_tensors="pt")
+        encoder = pipe.model.get_encoder()
+        with torch.no_grad():
+            encode = best_of(lambda: encoder(**encoded), runs=3)
+
+        print(f"\nbatch of {len(batch)} prompts")
+        print(f"generate via pipeline:      {via_pipeline * 1000:8.1f} ms")
+        print(f"generate via cached prefix: {via_cache * 1000:8.1f} ms")
+        print(f"encoder forward alone:      {encode * 1000:8.1f} ms (not cacheable: T5's encoder is bidirectional)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+"""
+Local fake of the Google Calendar v3 events API for tests and benchmarks.
+
+Keeps events in memory and implements what the backend uses: events.list
+with paging and sync tokens (deleted events come back as "cancelled" in
+incremental results, expired tokens get 410 Gone), events.insert, events
+.delete and multipart batch requests. Summaries containing "fail" are
+rejected with 400 so partial failures can be exercised.
+
+Point a CalendarClient at it with api_endpoint=stub.api_endpoint.
+"""
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from email.parser import BytesParser
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+import json
+import re
+import threading
+
+_EVENTS_PATH_RE = re.compile(r".*/calendars/[^/]+/events(?:/([^/?]+))?$")
+
+
+class FakeCalendar:
+    """The server-side state: events plus a change log for sync tokens."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._events: Dict[str, Dict[str, Any]] = {}
+        # Event id -> sequence number of its last change
+        self._changed_at: Dict[str, int] = {}
+        self._seq = 0
+        self._next_id = 0
+        # Tokens issued before this sequence number are answered with 410 Gone
+        self._oldest_valid = 0
+
+    def insert(self, body: Dict[str, Any]) -> Tuple[int, Dict[str, Any]]:
+        """(HTTP status, response) for inserting `body`."""
+        if "fail" in body.get("summary", ""):
+            return 400, {"error": {"code": 400, "message": "Invalid event summary"}}
+        with self._lock:
+            self._next_id += 1
+            event = dict(body, id=f"evt{self._next_id}", status="confirmed")
+            self._record(event)
+        return 200, event
+
+    def update(self, event_id: str, **fields) -> Dict[str, Any]:
+        with self._lock:
+            event = dict(self._events[event_id], **fields)
+            self._record(event)
+        return event
+
+    def delete(self, event_id: str) -> bool:
+        with self._lock:
+            event = self._events.get(event_id)
+            if event is None or event["status"] == "cancelled":
+                return False
+            # Deleted events stay around as tombstones for incremental syncs
+            self._record({"id": event_id, "status": "cancelled"})
+        return True
+
+    def expire_sync_tokens(self) -> None:
+        with self._lock:
+            self._oldest_valid = self._seq + 1
+
+    def _record(self, event: Dict[str, Any]) -> None:
+        self._seq += 1
+        self._events[event["id"]] = event
+        self._changed_at[event["id"]] = self._seq
+
+    def list(self, params: Dict[str, str]) -> Tuple[int, Dict[str, Any]]:
+        """(HTTP status, response) for events.list with the given query parameters."""
+        page_size = min(int(params.get("maxResults", 250)), 2500)
+        with self._lock:
+            # Page tokens carry the snapshot so every page ends with the same sync token
+            if "pageToken" in params:
+                offset, seq = (int(part) for part in params["pageToken"].split(":"))
+            else:
+                offset, seq = 0, self._seq
+            if "syncToken" in params:
+                since = int(params["syncToken"].rsplit("-", 1)[1])
+                if since < self._oldest_valid:
+                    return 410, {"error": {"code": 410, "message": "Sync token is no longer valid, a full sync is required."}}
+                ids = [i for i, at in self._changed_at.items() if since < at <= seq]
+            else:
+                ids = [i for i, at in self._changed_at.items() if at <= seq and self._events[i]["status"] != "cancelled"]
+            ids.sort(key=lambda i: self._changed_at[i])
+            page = [self._events[i] for i in ids[offset:offset + page_size]]
+            response: Dict[str, Any] = {"kind": "calendar#events", "items": page}
+            if offset + page_size < len(ids):
+                response["nextPageToken"] = f"{offset + page_size}:{seq}"
+            else:
+                response["nextSyncToken"] = f"sync-{seq}"
+        return 200, response
+
+    def __len__(self) -> int:
+        with self._lock:
+            return sum(event["status"] != "cancelled" for event in self._events.values())
+
+
+def _status_line(status: int) -> str:
+    return {200: "200 OK", 204: "204 No Content", 400: "400 Bad Request", 404: "404 Not Found", 410: "410 Gone"}[status]
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    # Keep-alive, like Google's frontends
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        self.server.stub.count("connections")
+
+    def _send(self, status: int, data: bytes, content_type="application/json; charset=UTF-8"):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_json(self, status: int, body: Optional[Dict[str, Any]]):
+        self._send(status, json.dumps(body).encode("utf-8") if body is not None else b"")
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        self.server.stub.count("lists")
+        params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        self._send_json(*self.server.stub.calendar.list(params))
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        if self.path.endswith("/batch/calendar/v3"):
+            self._batch(body)
+        else:
+            self._send_json(*self.server.stub.calendar.insert(json.loads(body or b"{}")))
+
+    def do_DELETE(self):
+        match = _EVENTS_PATH_RE.match(urlparse(self.path).path)
+        if match and match.group(1) and self.server.stub.calendar.delete(match.group(1)):
+            self._send_json(204, None)
+        else:
+            self._send_json(404, {"error": {"code": 404, "message": "Not Found"}})
+
+    def _batch(self, body: bytes):
+        """A multipart/mixed batch: one application/http insert per part."""
+        self.server.stub.count("batches")
+        message = BytesParser().parsebytes(b"Content-Type: " + self.headers["Content-Type"].encode() + b"\r\n\r\n" + body)
+        boundary = "batch_stub_boundary"
+        out = []
+        for part in message.get_payload():
+            payload = re.split(r"\r?\n\r?\n", part.get_payload(), maxsplit=1)[1]
+            status, reply = self.server.stub.calendar.insert(json.loads(payload))
+            out.append(
+                f"--{boundary}\r\nContent-Type: application/http\r\n"
+                f"Content-ID: <response-{part['Content-ID'][1:-1]}>\r\n\r\n"
+                f"HTTP/1.1 {_status_line(status)}\r\nContent-Type: application/json; charset=UTF-8\r\n\r\n"
+                f"{json.dumps(reply)}\r\n"
+            )
+        out.append(f"--{boundary}--\r\n")
+        self._send(200, "".join(out).encode("utf-8"), f"multipart/mixed; boundary={boundary}")
+
+    def log_message(self, *args):
+        pass
+
+
+class StubCalendarServer:
+    """
+    Fake Calendar API on 127.0.0.1; `api_endpoint` is the base URL for
+    clients and `calendar` its state. Counts the TCP connections, list
+    calls and batch requests it receives.
+    """
+
+    def __init__(self, calendar: Optional[FakeCalendar] = None):
+        self.calendar = calendar or FakeCalendar()
+        self.connections = 0
+        self.lists = 0
+        self.batches = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), _StubHandler)
+        self._server.daemon_threads = True
+        self._server.stub = self
+        self.api_endpoint = f"http://127.0.0.1:{self._server.server_port}/calendar/v3/"
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    def count(self, name: str) -> None:
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def seed_events(calendar: FakeCalendar, count: int, day: str = "2024-05-21") -> List[Dict[str, Any]]:
+    """Insert `count` one-hour events on `day`, an hour apart from 08:00."""
+    return [
+        calendar.insert({
+            "summary": f"event {i}",
+            "start": {"dateTime": f"{day}T{8 + i % 12:02d}:00:00Z", "timeZone": "UTC"},
+            "end": {"dateTime": f"{day}T{9 + i % 12:02d}:00:00Z", "timeZone": "UTC"},
+        })[1]
+        for i in range(count)
+    ]
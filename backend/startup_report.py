@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Cold start report for the backend.
+
+By default, imports app.main in a fresh interpreter with -X importtime and
+lists the slowest modules. --load-model also loads the model in this
+process and prints the load phases (transformers import, tokenizer,
+weights, first generate). --url fetches /debug/startup from a running
+server instead, including its time to first request.
+
+Usage: python startup_report.py [--top N] [--load-model] [--url http://localhost:8000]
+"""
+
+import json
+import os
+import subprocess
+import sys
+import time
+import urllib.request
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def import_times(module="app.main"):
+    """(module, depth, self, cumulative) per imported module, times in seconds, via -X importtime."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, cwd=HERE,
+    )
+    times = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        # Nested imports are indented two spaces per level under their parent
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        times.append((name.strip(), depth, int(self_us) / 1e6, int(cumulative_us) / 1e6))
+    if result.returncode != 0:
+        print(f"import {module} failed:\n{result.stderr.strip().splitlines()[-1]}")
+    return times
+
+
+def print_imports(times, top):
+    # Outermost entries cover everything imported beneath them
+    outermost = [(name, cumulative) for name, depth, _, cumulative in times if depth == 0]
+    total = sum(cumulative for _, cumulative in outermost)
+    print(f"Total import time: {total:.3f}s across {len(times)} modules\n")
+    print(f"Slowest {top} modules by self time:")
+    for name, _, self_s, cumulative in sorted(times, key=lambda t: t[2], reverse=True)[:top]:
+        print(f"  {self_s * 1000:8.1f} ms  (cumulative {cumulative * 1000:8.1f} ms)  {name}")
+    print(f"\nSlowest {top} top-level packages by cumulative time:")
+    roots = {}
+    for name, cumulative in outermost:
+        root = name.split(".")[0]
+        roots[root] = roots.get(root, 0.0) + cumulative
+    for root, cumulative in sorted(roots.items(), key=lambda r: r[1], reverse=True)[:top]:
+        print(f"  {cumulative * 1000:8.1f} ms  {root}")
+
+
+def print_profile(profile):
+    print(f"\nUptime: {profile['uptime']:.3f}s (pid {profile['pid']})")
+    if profile.get("model_state"):
+        print(f"Model state: {profile['model_state']}")
+    print("Milestones (seconds since process start):")
+    for name, offset in sorted(profile["marks"].items(), key=lambda m: m[1]):
+        print(f"  {offset:8.3f}  {name}")
+    print("Phases:")
+    for phase in profile["phases"]:
+        error = f"  ERROR {phase['error']}" if phase.get("error") else ""
+        print(f"  {phase['start']:8.3f} +{phase['duration']:7.3f}s  {phase['name']} [{phase['thread']}]{error}")
+    if profile["imports"]:
+        print("Slowest imports (self time):")
+        for entry in profile["imports"]:
+            print(f"  {entry['self'] * 1000:8.1f} ms  {entry['module']}")
+
+
+def load_model_profile():
+    sys.path.insert(0, HERE)
+    from app.nlp.ai_service import model_service
+    from app.startup import startup_profile
+
+    started = time.time()
+    model_service.start_loading()
+    model_service.wait_until_loaded()
+    model_service.process_text("I need to buy milk tomorrow at 5pm")
+    print(f"\nModel ready and first parse done in {time.time() - started:.2f}s")
+    profile = startup_profile.snapshot()
+    profile["model_state"] = model_service.get_status()["state"]
+    return profile
+
+
+def main():
+    args = sys.argv[1:]
+    top = int(args[args.index("--top") + 1]) if "--top" in args else 15
+
+    if "--url" in args:
+        url = args[args.index("--url") + 1].rstrip("/")
+        with urllib.request.urlopen(f"{url}/debug/startup?top={top}", timeout=10) as resp:
+            print_profile(json.load(resp))
+        return
+
+    print_imports(import_times(), top)
+    if "--load-model" in args:
+        print_profile(load_model_profile())
+
+
+if __name__ == "__main__":
+    main()
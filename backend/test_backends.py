@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Tests for choosing the inference backend. transformers, torch and optimum
+are replaced by stubs, so these check the wiring, not the model output
+(bench_backends.py compares that on the real model).
+"""
+
+from contextlib import contextmanager
+import os
+import sys
+import types
+
+import pytest
+
+from app.nlp.backends import load_pipeline
+
+
+@contextmanager
+def stubbed(**modules):
+    """Install modules under the given names (dots as "__"); None makes an import fail."""
+    names = {name.replace("__", "."): module for name, module in modules.items()}
+    saved = {name: sys.modules.get(name) for name in names}
+    sys.modules.update(names)
+    try:
+        yield
+    finally:
+        for name, module in saved.items():
+            if module is None:
+                sys.modules.pop(name, None)
+            else:
+                sys.modules[name] = module
+
+
+@contextmanager
+def environment(**values):
+    saved = {name: os.environ.get(name) for name in values}
+    os.environ.update(values)
+    try:
+        yield
+    finally:
+        for name, value in saved.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+
+
+def fake_transformers(loads):
+    """A transformers module whose loaders record (what, path) in `loads`."""
+    transformers = types.ModuleType("transformers")
+
+    class AutoTokenizer:
+        @staticmethod
+        def from_pretrained(path):
+            loads.append(("tokenizer", path))
+            return "tokenizer"
+
+    class AutoModelForSeq2SeqLM:
+        @staticmethod
+        def from_pretrained(path):
+            loads.append(("model", path))
+            return "torch model"
+
+    def pipeline(task, model, tokenizer, device):
+        return types.SimpleNamespace(task=task, model=model, tokenizer=tokenizer, device=device)
+
+    transformers.AutoTokenizer = AutoTokenizer
+    transformers.AutoModelForSeq2SeqLM = AutoModelForSeq2SeqLM
+    transformers.pipeline = pipeline
+    return transformers
+
+
+def fake_torch():
+    torch = types.ModuleType("torch")
+    torch.nn = types.SimpleNamespace(Linear="Linear")
+    torch.qint8 = "qint8"
+    torch.quantization = types.SimpleNamespace(
+        quantize_dynamic=lambda model, layers, dtype: ("quantized", model, tuple(layers), dtype)
+    )
+    return torch
+
+
+def fake_optimum(loads):
+    onnxruntime = types.ModuleType("optimum.onnxruntime")
+
+    class ORTModelForSeq2SeqLM:
+        @staticmethod
+        def from_pretrained(path, export=False):
+            loads.append(("onnx model", path, export))
+            return "onnx model"
+
+    onnxruntime.ORTModelForSeq2SeqLM = ORTModelForSeq2SeqLM
+    return onnxruntime
+
+
+def test_each_backend_builds_its_pipeline():
+    loads = []
+    with stubbed(transformers=fake_transformers(loads), torch=fake_torch(),
+                 optimum=types.ModuleType("optimum"), optimum__onnxruntime=fake_optimum(loads)):
+        torch_pipe = load_pipeline("some/model")
+        assert torch_pipe.model == "torch model" and torch_pipe.task == "text2text-generation"
+        assert torch_pipe.device == -1
+
+        int8_pipe = load_pipeline("some/model", "int8")
+        assert int8_pipe.model == ("quantized", "torch model", ("Linear",), "qint8")
+
+        onnx_pipe = load_pipeline("some/model", "onnx")
+        assert onnx_pipe.model == "onnx model" and onnx_pipe.tokenizer == "tokenizer"
+    assert ("onnx model", "some/model", True) in loads
+
+
+def test_unknown_backend_is_rejected():
+    try:
+        load_pipeline("some/model", "fp16")
+    except ValueError as e:
+        assert "'fp16'" in str(e) and "torch, int8, onnx" in str(e)
+    else:
+        raise AssertionError("expected ValueError")
+
+
+def test_onnx_without_optimum_says_what_to_install():
+    with stubbed(transformers=fake_transformers([]), optimum=None, optimum__onnxruntime=None):
+        try:
+            load_pipeline("some/model", "onnx")
+        except RuntimeError as e:
+            assert "optimum[onnxruntime]" in str(e)
+        else:
+            raise AssertionError("expected RuntimeError")
+
+
+def make_service(**env):
+    from app.nlp.ai_service import AIModelService
+    with environment(**env):
+        return AIModelService()
+
+
+def test_service_loads_the_configured_backend_and_reports_it():
+    service = make_service(AI_INFERENCE_BACKEND="int8", AI_PROMPT_PREFIX_CACHE="0")
+    try:
+        with stubbed(transformers=fake_transformers([]), torch=fake_torch()):
+            service._load_backend()
+        assert service._model.model[0] == "quantized"
+        status = service.get_status()
+        assert status["backend"] == "int8" and status["model"] == service._model_path
+    finally:
+        service.shutdown()
+
+
+def test_service_with_unknown_backend_reports_the_error():
+    from app.nlp.ai_service import ModelState
+    service = make_service(AI_INFERENCE_BACKEND="fp16")
+    try:
+        service._load_model()
+        status = service.get_status()
+        assert status["state"] == ModelState.ERROR and status["backend"] == "fp16"
+        assert "Unknown inference backend 'fp16'" in status["error"]
+    finally:
+        service.shutdown()
+
+
+def test_model_status_route_reports_the_backend():
+    pytest.importorskip("fastapi")
+    from app.api.routes import ModelStatus
+
+    service = make_service(AI_INFERENCE_BACKEND="onnx")
+    try:
+        assert ModelStatus(**service.get_status()).backend == "onnx"
+    finally:
+        service.shutdown()
+
+
+if __name__ == "__main__":
+    test_each_backend_builds_its_pipeline()
+    test_unknown_backend_is_rejected()
+    test_onnx_without_optimum_says_what_to_install()
+    test_service_loads_the_configured_backend_and_reports_it()
+    test_service_with_unknown_backend_reports_the_error()
+    test_model_status_route_reports_the_backend()
+    print("All backend tests passed!")
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Tests for the micro-batching scheduler used by AIModelService.
+"""
+
+import threading
+
+from app.nlp.batching import MicroBatcher
+
+
+def test_concurrent_items_share_a_batch():
+    sizes = []
+
+    def run_batch(items):
+        sizes.append(len(items))
+        return [item.upper() for item in items]
+
+    batcher = MicroBatcher(run_batch, max_batch_size=4, max_wait_ms=200)
+    results = {}
+    start = threading.Barrier(8)
+
+    def worker(i):
+        start.wait()
+        results[i] = batcher(f"prompt {i}", timeout=5)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert results == {i: f"PROMPT {i}" for i in range(8)}
+    assert sum(sizes) == 8
+    assert max(sizes) <= 4
+    assert len(sizes) < 8
+
+    stats = batcher.stats()
+    assert stats["items"] == 8
+    assert stats["batches"] == len(sizes)
+    assert stats["avg_batch_size"] > 1
+    batcher.close()
+
+
+def test_single_item_is_not_held_past_the_window():
+    batcher = MicroBatcher(lambda items: items, max_batch_size=8, max_wait_ms=1)
+    assert batcher("alone", timeout=5) == "alone"
+    assert batcher.stats()["batch_sizes"] == {1: 1}
+    batcher.close()
+
+
+def test_errors_reach_every_caller():
+    def run_batch(items):
+        raise ValueError("model exploded")
+
+    batcher = MicroBatcher(run_batch, max_batch_size=2, max_wait_ms=1)
+    future = batcher.submit("x")
+    try:
+        future.result(timeout=5)
+    except ValueError as e:
+        assert "exploded" in str(e)
+    else:
+        raise AssertionError("expected the batch error")
+    batcher.close()
+
+
+if __name__ == "__main__":
+    test_concurrent_items_share_a_batch()
+    test_single_item_is_not_held_past_the_window()
+    test_errors_reach_every_caller()
+    print("All batching tests passed")
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Tests for the parse result cache.
+"""
+
+import os
+import tempfile
+import time
+from datetime import date
+
+import app.nlp.cache as cache_module
+from app.nlp.cache import ResultCache, cache_key
+
+
+def test_key_ignores_whitespace_but_not_options():
+    model = "google/flan-t5-small"
+    key = cache_key("buy milk  tomorrow\n", "ro", True, model)
+    assert key == cache_key(" buy milk tomorrow", "ro", True, model)
+    assert key != cache_key("buy milk tomorrow", "en", True, model)
+    assert key != cache_key("buy milk tomorrow", "ro", False, model)
+    assert key != cache_key("buy milk tomorrow", "ro", True, "other-model")
+    assert key != cache_key("Buy milk tomorrow", "ro", True, model)
+
+
+def test_lru_eviction_and_copies():
+    cache = ResultCache(max_entries=2)
+    cache.put("a", {"tasks": [{"task": "a"}]})
+    cache.put("b", {"tasks": [{"task": "b"}]})
+    # Touch "a" so "b" is the least recently used
+    hit = cache.get("a")
+    hit["tasks"].append({"task": "mutated"})
+    cache.put("c", {"tasks": []})
+
+    assert cache.get("b") is None
+    assert cache.get("a") == {"tasks": [{"task": "a"}]}
+    stats = cache.stats()
+    assert stats["hits"] == 2 and stats["misses"] == 1
+    assert stats["evictions"] == 1 and stats["size"] == 2
+
+
+def test_ttl_expiry():
+    cache = ResultCache(ttl_seconds=0.05)
+    cache.put("a", {"tasks": []})
+    assert cache.get("a") is not None
+    time.sleep(0.1)
+    assert cache.get("a") is None
+    assert cache.stats()["expired"] == 1
+
+
+def test_day_rollover_drops_date_sensitive_entries():
+    class Tomorrow(date):
+        @classmethod
+        def today(cls):
+            return date.today().fromordinal(date.today().toordinal() + 1)
+
+    cache = ResultCache()
+    cache.put("relative", {"tasks": [{"deadline": "2024-01-02"}]}, date_sensitive=True)
+    cache.put("plain", {"tasks": []})
+    cache_module.date = Tomorrow
+    try:
+        assert cache.get("relative") is None
+        assert cache.get("plain") is not None
+        assert cache.stats()["invalidated"] == 1
+    finally:
+        cache_module.date = date
+
+
+def test_sqlite_backend_survives_restarts():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "parse_cache.sqlite3")
+        cache = ResultCache(max_entries=2, path=path)
+        cache.put("a", {"tasks": [{"task": "ă"}]})
+        cache.put("b", {"tasks": []})
+        cache.put("c", {"tasks": []})
+        assert cache.stats()["backend"] == "sqlite"
+        assert cache.stats()["size"] == 2
+
+        reopened = ResultCache(max_entries=2, path=path)
+        assert reopened.get("a") is None
+        assert reopened.get("c") == {"tasks": []}
+
+
+def test_service_caches_model_results_only():
+    from app.nlp.ai_service import AIModelService, ModelState
+    service = AIModelService()
+    service._state = ModelState.READY
+    try:
+        # An empty model answer falls back to the regex extractor, which is not cached
+        service._generate = lambda prompts: ["[]"] * len(prompts)
+        first = service.process_text("I need to buy milk tomorrow")
+        assert first["method"] == "regex_fallback_after_ai_empty"
+        assert "cached" not in service.process_text("I need to buy milk tomorrow")
+
+        prompts_seen = []
+
+        def generate(prompts):
+            prompts_seen.extend(prompts)
+            return ['[{"task": "call mom"}]'] * len(prompts)
+
+        service._generate = generate
+        assert service.process_text("Call\n  mom")["method"] == "ai_model"
+        # The model saw the text as keyed, so the cached answer fits the other spelling
+        assert "INPUT: Call mom\n" in prompts_seen[0]
+        assert service.process_text("Call mom")["cached"] is True
+        assert len(prompts_seen) == 1
+
+        # Another inference backend does not reuse the torch answer
+        service._backend = "int8"
+        assert "cached" not in service.process_text("Call mom")
+        assert len(prompts_seen) == 2
+    finally:
+        service.shutdown()
+
+
+if __name__ == "__main__":
+    test_key_ignores_whitespace_but_not_options()
+    test_lru_eviction_and_copies()
+    test_ttl_expiry()
+    test_day_rollover_drops_date_sensitive_entries()
+    test_sqlite_backend_survives_restarts()
+    test_service_caches_model_results_only()
+    print("All cache tests passed!")
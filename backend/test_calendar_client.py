@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Tests for the cached Google Calendar client, against the local fake of the
+Calendar API in calendar_stub. Skipped without google-api-python-client.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+import threading
+
+import pytest
+
+pytest.importorskip("googleapiclient")
+pytest.importorskip("google_auth_httplib2")
+
+from google.auth.credentials import AnonymousCredentials, Credentials
+
+from app.google.calendar import CalendarClient, task_to_event
+from calendar_stub import StubCalendarServer, seed_events
+
+
+class CountingCredentials(Credentials):
+    """Credentials whose token starts out missing and counts refreshes."""
+
+    def __init__(self):
+        super().__init__()
+        self.refreshes = 0
+
+    def refresh(self, request):
+        self.refreshes += 1
+        self.token = f"token-{self.refreshes}"
+
+
+def test_service_is_built_once_and_connection_reused():
+    with StubCalendarServer() as stub:
+        seed_events(stub.calendar, 12)
+        client = CalendarClient(credentials=AnonymousCredentials(), api_endpoint=stub.api_endpoint)
+        service = client.service()
+        assert client.service() is service
+        for _ in range(5):
+            assert len(client.list_events()) == 10
+        created = client.create_event({"task": "buy milk"})
+        assert created["summary"] == "buy milk"
+        assert stub.connections == 1
+
+
+def test_each_thread_gets_its_own_service():
+    with StubCalendarServer() as stub:
+        client = CalendarClient(credentials=AnonymousCredentials(), api_endpoint=stub.api_endpoint)
+        barrier = threading.Barrier(4)
+
+        def call(_):
+            barrier.wait()
+            client.list_events()
+            return id(client.service())
+
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            services = set(pool.map(call, range(4)))
+        assert len(services) == 4
+        assert stub.connections == 4
+
+
+def test_credentials_refreshed_once_across_threads():
+    with StubCalendarServer() as stub:
+        credentials = CountingCredentials()
+        client = CalendarClient(credentials=credentials, api_endpoint=stub.api_endpoint)
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            list(pool.map(lambda _: client.list_events(), range(12)))
+        assert credentials.refreshes == 1
+
+
+def test_task_to_event():
+    today = date(2024, 1, 31)
+    timed = task_to_event({"task": "dentist", "time": "5:30 pm", "deadline": "maine"}, "Europe/Bucharest", today=today)
+    assert timed["start"] == {"dateTime": "2024-02-01T17:30:00", "timeZone": "Europe/Bucharest"}
+    assert timed["end"] == {"dateTime": "2024-02-01T18:30:00", "timeZone": "Europe/Bucharest"}
+    all_day = task_to_event({"task": "pay rent", "deadline": "12/02", "category": "Home"}, today=today)
+    assert all_day["start"] == {"date": "2024-02-12"} and all_day["end"] == {"date": "2024-02-13"}
+    assert all_day["description"] == "Category: Home"
+    today_at = task_to_event({"task": "call", "time": "17:00"}, duration=timedelta(minutes=15), today=today)
+    assert today_at["end"]["dateTime"] == "2024-01-31T17:15:00"
+    on_day = task_to_event({"task": "meeting", "time": "5pm", "deadline": "21 may"}, today=today)
+    assert on_day["start"]["dateTime"] == "2024-05-21T17:00:00"
+    # A deadline that is not a date must not turn into an event today
+    for task in (
+        {"task": "someday"},
+        {"task": "x", "deadline": "after lunch"},
+        {"task": "x", "time": "25:00"},
+        {"task": "x", "time": "5pm", "deadline": "after lunch"},
+    ):
+        try:
+            task_to_event(task, today=today)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError(f"expected ValueError for {task}")
+
+
+def test_insert_events_batches_and_reports_each_item():
+    with StubCalendarServer() as stub:
+        client = CalendarClient(credentials=AnonymousCredentials(), api_endpoint=stub.api_endpoint)
+        events = [task_to_event({"task": f"task {i}", "deadline": "2024-02-01"}) for i in range(7)]
+        events[4]["summary"] = "this will fail"
+        results = client.insert_events(events, batch_size=3)
+        assert stub.batches == 3
+        assert [r.get("event", {}).get("summary") for r in results] == [
+            "task 0", "task 1", "task 2", "task 3", None, "task 5", "task 6",
+        ]
+        assert results[4]["error"].startswith("400")
+
+
+def test_insert_events_reports_failed_batches():
+    client = CalendarClient(credentials=AnonymousCredentials(), api_endpoint="http://127.0.0.1:9/calendar/v3/", timeout=1)
+    results = client.insert_events([task_to_event({"task": "x", "deadline": "2024-02-01"})] * 2)
+    assert len(results) == 2 and all("error" in r for r in results)
+
+
+if __name__ == "__main__":
+    test_service_is_built_once_and_connection_reused()
+    test_each_thread_gets_its_own_service()
+    test_credentials_refreshed_once_across_threads()
+    test_task_to_event()
+    test_insert_events_batches_and_reports_each_item()
+    test_insert_events_reports_failed_batches()
+    print("All calendar client tests passed!")
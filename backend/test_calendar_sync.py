@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Tests for incremental calendar sync into the local event mirror, against
+the fake Calendar API in calendar_stub. Skipped without
+google-api-python-client.
+"""
+
+from datetime import date, datetime, timedelta, timezone
+import os
+import tempfile
+
+import pytest
+
+pytest.importorskip("googleapiclient")
+pytest.importorskip("google_auth_httplib2")
+
+from google.auth.credentials import AnonymousCredentials
+
+from app.google.calendar import CalendarClient
+from app.google.sync import CalendarSync, EventMirror
+from calendar_stub import StubCalendarServer, seed_events
+
+TOMORROW = (date.today() + timedelta(days=1)).isoformat()
+
+
+def make_sync(stub, **kwargs):
+    client = CalendarClient(credentials=AnonymousCredentials(), api_endpoint=stub.api_endpoint)
+    kwargs.setdefault("mirror", EventMirror())
+    return CalendarSync(client, **kwargs)
+
+
+def test_full_sync_pages_then_incremental_fetches_changes():
+    with StubCalendarServer() as stub:
+        events = seed_events(stub.calendar, 30, day=TOMORROW)
+        sync = make_sync(stub, page_size=7)
+
+        first = sync.sync()
+        assert (first["mode"], first["pages"], first["events"]) == ("full", 5, 30)
+
+        stub.calendar.delete(events[0]["id"])
+        stub.calendar.update(events[1]["id"], summary="moved")
+        stub.calendar.insert({"summary": "new", "start": {"date": TOMORROW}, "end": {"date": TOMORROW}})
+        lists = stub.lists
+        second = sync.sync()
+        assert (second["mode"], second["changes"], second["pages"], second["events"]) == ("incremental", 3, 1, 30)
+        assert stub.lists == lists + 1
+
+        summaries = {e["summary"] for e in sync.mirror.upcoming(sync.calendar_id, limit=100)}
+        assert "event 0" not in summaries
+        assert {"moved", "new"} <= summaries
+
+        assert sync.sync()["changes"] == 0
+
+
+def test_expired_sync_token_triggers_full_sync():
+    with StubCalendarServer() as stub:
+        events = seed_events(stub.calendar, 5, day=TOMORROW)
+        sync = make_sync(stub)
+        sync.sync()
+        stub.calendar.delete(events[2]["id"])
+        stub.calendar.expire_sync_tokens()
+        result = sync.sync()
+        assert (result["mode"], result["events"]) == ("full", 4)
+
+
+def test_reads_are_served_from_the_mirror_within_the_refresh_interval():
+    with StubCalendarServer() as stub:
+        seed_events(stub.calendar, 12, day=TOMORROW)
+        sync = make_sync(stub, refresh_interval=3600)
+        assert len(sync.upcoming(limit=50)) == 12
+        assert len(sync.upcoming(limit=5)) == 5
+        assert stub.lists == 1
+        sync.upcoming(refresh=True)
+        assert stub.lists == 2
+
+        sync.refresh_interval = 0
+        sync.upcoming()
+        assert stub.lists == 3
+
+    # Google unreachable: the last sync is still served
+    assert len(sync.upcoming()) == 12
+
+
+def test_created_events_are_recorded_before_the_next_sync():
+    with StubCalendarServer() as stub:
+        sync = make_sync(stub, refresh_interval=3600)
+        sync.sync()
+        _, created = stub.calendar.insert({"summary": "written through", "start": {"date": TOMORROW}, "end": {"date": TOMORROW}})
+        sync.record([created])
+        assert [e["summary"] for e in sync.upcoming()] == ["written through"]
+
+
+def test_mirror_and_sync_token_survive_restarts():
+    with StubCalendarServer() as stub, tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "mirror.sqlite3")
+        seed_events(stub.calendar, 3, day=TOMORROW)
+        make_sync(stub, mirror=EventMirror(path)).sync()
+        seed_events(stub.calendar, 1, day=TOMORROW)
+        result = make_sync(stub, mirror=EventMirror(path)).sync()
+        assert (result["mode"], result["changes"], result["events"]) == ("incremental", 1, 4)
+
+
+def test_mirror_orders_by_utc_start_and_hides_finished_events():
+    mirror = EventMirror()
+    mirror.apply("primary", [
+        {"id": "a", "start": {"dateTime": "2024-05-21T08:00:00Z"}, "end": {"dateTime": "2024-05-21T09:00:00Z"}},
+        # 07:00 UTC
+        {"id": "b", "start": {"dateTime": "2024-05-21T10:00:00+03:00"}, "end": {"dateTime": "2024-05-21T11:00:00+03:00"}},
+        {"id": "c", "start": {"date": "2024-05-20"}, "end": {"date": "2024-05-21"}},
+        {"id": "d", "status": "cancelled"},
+    ], sync_token="t1", replace=True)
+    now = datetime(2024, 5, 20, 12, tzinfo=timezone.utc)
+    assert [e["id"] for e in mirror.upcoming("primary", now=now)] == ["c", "b", "a"]
+    later = datetime(2024, 5, 21, 7, 30, tzinfo=timezone.utc)
+    assert [e["id"] for e in mirror.upcoming("primary", now=later)] == ["b", "a"]
+    assert mirror.sync_state("primary")[0] == "t1"
+
+
+if __name__ == "__main__":
+    test_full_sync_pages_then_incremental_fetches_changes()
+    test_expired_sync_token_triggers_full_sync()
+    test_reads_are_served_from_the_mirror_within_the_refresh_interval()
+    test_created_events_are_recorded_before_the_next_sync()
+    test_mirror_and_sync_token_survive_restarts()
+    test_mirror_orders_by_utc_start_and_hides_finished_events()
+    print("All calendar sync tests passed!")
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Tests for the precompiled keyword categorizer.
+"""
+
+from app.nlp.categorizer import categorize_task, categorize_many
+
+
+def test_priority_order():
+    # "workout" is a Health keyword but also contains the Work keyword "work"
+    assert categorize_task("Workout at the gym") == "Work"
+    assert categorize_task("Go to the gym") == "Health"
+    # "homework" is listed under Family and Study but contains "work"
+    assert categorize_task("finish homework") == "Work"
+    # "dinner" is listed under Family and Social; Family ranks higher
+    assert categorize_task("dinner with Ana") == "Family"
+    assert categorize_task("buy groceries and pay the bill") == "Shopping"
+
+
+def test_romanian_keywords():
+    assert categorize_task("trebuie sa merg la magazin") == "Shopping"
+    assert categorize_task("Ziua de naștere a Mariei") == "Social"
+    assert categorize_task("plată factură") == "Finance"
+
+
+def test_tags_only_used_without_keywords():
+    assert categorize_task("sync up #social") == "Social"
+    assert categorize_task("something (finance)") == "Finance"
+    # A keyword match always beats a tag
+    assert categorize_task("call Ana #social") == "Work"
+
+
+def test_default_and_batch():
+    assert categorize_task("xyz") == "General"
+    texts = ["call John", "buy milk", "xyz", ""]
+    assert categorize_many(texts) == ["Work", "Shopping", "General", "General"]
+    assert categorize_many(iter(texts)) == [categorize_task(t) for t in texts]
+
+
+if __name__ == "__main__":
+    test_priority_order()
+    test_romanian_keywords()
+    test_tags_only_used_without_keywords()
+    test_default_and_batch()
+    print("All categorizer tests passed")
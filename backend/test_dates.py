@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Tests for the relative date resolver.
+"""
+
+from datetime import date, datetime, timedelta
+
+from app.nlp.dates import DateResolver, default_resolver, parse_date
+from app.nlp.extractor import extract_tasks, normalize_date
+
+# A Wednesday
+REFERENCE = datetime(2024, 1, 31, 15, 30)
+
+
+def test_relative_expressions():
+    resolver = DateResolver(REFERENCE)
+    assert resolver.resolve("tomorrow") == "2024-02-01"
+    assert resolver.resolve(" Mâine ") == "2024-02-01"
+    assert resolver.resolve("astăzi") == "2024-01-31"
+    assert resolver.resolve("next week") == "2024-02-07"
+    assert resolver.resolve("next săptămână") == "2024-02-07"
+    assert resolver.resolve("vineri") == "2024-02-02"
+    assert resolver.resolve("due next Friday") == "2024-02-02"
+    # The same weekday means next week
+    assert resolver.resolve("wednesday") == "2024-02-07"
+    assert resolver.resolve("next miercuri") == "2024-02-07"
+
+
+def test_next_month_is_clamped():
+    assert DateResolver(REFERENCE).resolve("next month") == "2024-02-29"
+    assert DateResolver(date(2024, 12, 15)).resolve("next month") == "2025-01-15"
+
+
+def test_unknown_and_iso_dates_pass_through():
+    resolver = DateResolver(REFERENCE)
+    assert resolver.resolve("1st March") == "1st march"
+    assert resolver.resolve("2023-05-21") == "2023-05-21"
+    assert resolver.resolve(resolver.resolve("tomorrow")) == "2024-02-01"
+    assert resolver.resolve("") == ""
+
+
+def test_live_resolver_follows_the_clock():
+    resolver = DateResolver()
+    tomorrow = (date.today() + timedelta(days=1)).strftime("%Y-%m-%d")
+    assert resolver.resolve("tomorrow") == tomorrow
+    assert normalize_date("maine") == default_resolver.resolve("tomorrow") == tomorrow
+
+
+def test_reference_is_threaded_through_extraction():
+    tasks = extract_tasks("Submit the report by tomorrow. Call Ana next friday", reference=REFERENCE)
+    assert [t["deadline"] for t in tasks] == ["2024-02-01", "2024-02-02"]
+    assert normalize_date("next friday", reference=REFERENCE) == "2024-02-02"
+
+
+def test_parse_date():
+    today = REFERENCE.date()
+    assert parse_date("2024-06-01", today) == date(2024, 6, 1)
+    assert parse_date("maine", today) == date(2024, 2, 1)
+    assert parse_date("vineri", today) == date(2024, 2, 2)
+    assert parse_date("12/05", today) == date(2024, 5, 12)
+    assert parse_date("15.01", today) == date(2025, 1, 15)  # already past this year
+    assert parse_date("3-6-24", today) == date(2024, 6, 3)
+    assert parse_date("31/02", today) is None
+    assert parse_date("2024-13-01", today) is None
+    assert parse_date("after the meeting", today) is None
+    # Month names, as the extractor reports them ("Meeting on 21 May at 5pm")
+    assert parse_date("21 may", today) == date(2024, 5, 21)
+    assert parse_date("21st of May 2025", today) == date(2025, 5, 21)
+    assert parse_date("May 21", today) == date(2024, 5, 21)
+    assert parse_date("3 martie", today) == date(2024, 3, 3)
+    assert parse_date("15 ian", today) == date(2025, 1, 15)
+    assert parse_date("30 feb", today) is None
+    assert parse_date("21 maybe", today) is None
+    assert parse_date(None) is None
+
+
+if __name__ == "__main__":
+    test_relative_expressions()
+    test_next_month_is_clamped()
+    test_unknown_and_iso_dates_pass_through()
+    test_live_resolver_follows_the_clock()
+    test_reference_is_threaded_through_extraction()
+    test_parse_date()
+    print("All date resolver tests passed")
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Tests for the incremental JSON array scanner used to stop generation early,
+and for the prompt prefix cache (with a fake tokenizer and model).
+"""
+
+from contextlib import nullcontext
+import os
+import sys
+import types
+
+from app.nlp.decoding import JsonArrayScanner, PrefixCachedGenerator, build_generator, parse_json_array, run_pipeline
+
+
+def feed_tokens(scanner, tokens):
+    """Feed tokens one at a time; return how many were needed to close."""
+    for count, token in enumerate(tokens, 1):
+        if scanner.feed(token):
+            return count
+    return None
+
+
+def test_stops_when_top_level_array_closes():
+    tokens = ['[', '{"', 'task', '":"', 'buy', ' milk', '","', 'time', '":', '"5pm"', '}', ']', ' extra', ' tokens']
+    scanner = JsonArrayScanner()
+    assert feed_tokens(scanner, tokens) == 12
+    assert scanner.parse() == [{"task": "buy milk", "time": "5pm"}]
+
+
+def test_brackets_inside_strings_and_escapes():
+    output = 'JSON: [{"task": "fix ] bug \\" [x]", "deadline": null}, {"task": "it\'s fine"}] trailing'
+    scanner = JsonArrayScanner()
+    # Split at every character, including between the backslash and the quote
+    assert feed_tokens(scanner, list(output)) is not None
+    assert scanner.parse() == [{"task": 'fix ] bug " [x]', "deadline": None}, {"task": "it's fine"}]
+
+
+def test_nested_arrays_and_leading_text():
+    assert parse_json_array('Here you go: [[1, 2], {"a": [3]}] done') == [[1, 2], {"a": [3]}]
+    assert parse_json_array("[]") == []
+
+
+def test_incomplete_or_invalid_output():
+    scanner = JsonArrayScanner()
+    scanner.feed('[{"task": "buy milk"')
+    assert not scanner.complete
+    assert scanner.text() is None and scanner.parse() is None
+    assert parse_json_array("no tasks here") is None
+    # Closed but not valid JSON: callers fall back to the lenient parsers
+    assert parse_json_array("[{'task': 'buy milk',}]") is None
+
+
+EOS = 0
+
+
+class FakeTokenizer:
+    """
+    Tokenizes `width` characters per id, then appends EOS. With width 1 the
+    prefix and suffix tokenize independently; with 2 an odd-length prefix
+    shifts every pair after it, like a tokenizer merging across the cut.
+    """
+
+    def __init__(self, width=1):
+        self.width = width
+
+    def _ids(self, text):
+        return [hash(text[i:i + self.width]) % 10000 + 1 for i in range(0, len(text), self.width)]
+
+    def __call__(self, text, add_special_tokens=True):
+        texts = [text] if isinstance(text, str) else text
+        ids = [self._ids(t) + ([EOS] if add_special_tokens else []) for t in texts]
+        return {"input_ids": ids[0] if isinstance(text, str) else ids}
+
+    def build_inputs_with_special_tokens(self, ids):
+        return ids + [EOS]
+
+    def pad(self, batch, return_tensors=None):
+        ids = batch["input_ids"]
+        longest = max(len(row) for row in ids)
+        return {
+            "input_ids": [row + [EOS] * (longest - len(row)) for row in ids],
+            "attention_mask": [[1] * len(row) + [0] * (longest - len(row)) for row in ids],
+        }
+
+    def batch_decode(self, output_ids, skip_special_tokens=True, clean_up_tokenization_spaces=False):
+        return [f"{sum(i != EOS for i in row)} ids" for row in output_ids]
+
+
+class FakePipeline:
+    def __init__(self, tokenizer):
+        self.tokenizer = tokenizer
+        self.calls = []
+        self.model = types.SimpleNamespace(generate=self._generate)
+
+    def _generate(self, input_ids, attention_mask, **kwargs):
+        self.calls.append(("generate", input_ids, attention_mask))
+        return input_ids
+
+    def __call__(self, prompts, batch_size, **kwargs):
+        self.calls.append(("pipeline", prompts))
+        return [{"generated_text": "[]"} for _ in prompts]
+
+
+PREFIX = "List the tasks."  # odd length
+
+
+def with_fake_torch(call):
+    saved = sys.modules.get("torch")
+    sys.modules["torch"] = types.SimpleNamespace(no_grad=nullcontext)
+    try:
+        return call()
+    finally:
+        if saved is None:
+            sys.modules.pop("torch", None)
+        else:
+            sys.modules["torch"] = saved
+
+
+def test_prefix_cache_sends_cached_prefix_and_suffix_ids():
+    tokenizer = FakeTokenizer()
+    pipe = FakePipeline(tokenizer)
+    cached = PrefixCachedGenerator(pipe, PREFIX)
+    assert cached.enabled and cached.prefix_ids == tokenizer(PREFIX, add_special_tokens=False)["input_ids"]
+
+    prompts = [PREFIX + "\nINPUT: buy milk\n\nJSON:", PREFIX + "\nINPUT: x\n\nJSON:", "no prefix"]
+    assert with_fake_torch(lambda: cached(prompts, {}, stop_on_json_close=False)) == [
+        f"{len(tokenizer(p, add_special_tokens=False)['input_ids'])} ids" for p in prompts
+    ]
+    [(kind, input_ids, attention_mask)] = pipe.calls
+    assert kind == "generate"
+    for prompt, row, mask in zip(prompts, input_ids, attention_mask):
+        # Same ids as tokenizing the whole prompt, built from the cached prefix where it applies
+        whole = tokenizer(prompt)["input_ids"]
+        assert row[:sum(mask)] == whole
+        if prompt.startswith(PREFIX):
+            suffix = tokenizer(prompt[len(PREFIX):], add_special_tokens=False)["input_ids"]
+            assert row[:sum(mask)] == cached.prefix_ids + suffix + [EOS]
+
+
+def test_prefix_cache_falls_back_when_tokenization_differs():
+    pipe = FakePipeline(FakeTokenizer(width=2))
+    assert not PrefixCachedGenerator(pipe, PREFIX).enabled
+    generate = build_generator(pipe, {}, stop_on_json_close=False, prompt_prefix=PREFIX)
+    assert generate.func is run_pipeline
+    assert generate([PREFIX + "\nINPUT: buy milk\n\nJSON:"]) == ["[]"]
+    assert [kind for kind, *_ in pipe.calls] == ["pipeline"]
+
+    generate = build_generator(FakePipeline(FakeTokenizer()), {}, stop_on_json_close=False, prompt_prefix=PREFIX)
+    assert isinstance(generate.func, PrefixCachedGenerator)
+
+
+def test_prefix_cache_env_switch():
+    import app.nlp.ai_service as ai_service
+
+    load_pipeline = ai_service.load_pipeline
+    ai_service.load_pipeline = lambda model_path, backend: FakePipeline(FakeTokenizer())
+    try:
+        for value, cached in (("1", True), ("0", False)):
+            os.environ["AI_PROMPT_PREFIX_CACHE"] = value
+            try:
+                service = ai_service.AIModelService()
+            finally:
+                del os.environ["AI_PROMPT_PREFIX_CACHE"]
+            try:
+                service._stop_on_json_close = False
+                service._load_backend()
+                assert isinstance(service._generate.func, PrefixCachedGenerator) is cached
+                assert (service._generate.func is run_pipeline) is not cached
+            finally:
+                service.shutdown()
+    finally:
+        ai_service.load_pipeline = load_pipeline
+
+
+if __name__ == "__main__":
+    test_stops_when_top_level_array_closes()
+    test_brackets_inside_strings_and_escapes()
+    test_nested_arrays_and_leading_text()
+    test_incomplete_or_invalid_output()
+    test_prefix_cache_sends_cached_prefix_and_suffix_ids()
+    test_prefix_cache_falls_back_when_tokenization_differs()
+    test_prefix_cache_env_switch()
+    print("All decoding tests passed!")
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Tests for entity extraction in the streamed document scanner. Skipped
+without fastapi.
+"""
+
+import pytest
+
+pytest.importorskip("fastapi")
+
+from app.api.routes import MAX_PENDING_CHARS, _EntityScanner, _extract_entities
+
+DOCUMENT = (
+    "Plata 1.234,50 scadenta 12\n"
+    "Mai catre RO49AAAA\n"
+    "1B31007593840000 ok\n"
+    "a 3 iunie b 12,00\n"
+)
+
+
+def scan_in_pieces(text, size):
+    scanner = _EntityScanner()
+    found = []
+    for offset in range(0, len(text), size):
+        found += scanner.feed(text[offset:offset + size])
+    return [(e.type, e.value) for e in found + scanner.close()]
+
+
+def test_entities_broken_over_a_line_break_are_found():
+    whole = sorted((e.type, e.value) for e in _extract_entities(DOCUMENT))
+    assert ("date", "12\nMai") in whole
+    assert ("iban", "RO49AAAA\n1B31007593840000") in whole
+    for size in (1, 5, 64, len(DOCUMENT)):
+        assert sorted(scan_in_pieces(DOCUMENT, size)) == whole
+
+
+def test_text_without_line_breaks_is_scanned_in_bounded_pieces():
+    text = "x " * MAX_PENDING_CHARS + "15 mai 10,00"
+    scanner = _EntityScanner()
+    found = scanner.feed(text[:-12])
+    assert len(scanner._pending) <= MAX_PENDING_CHARS
+    found += scanner.feed(text[-12:]) + scanner.close()
+    assert [(e.type, e.value) for e in found] == [("amount", "10,00"), ("date", "15 mai")]
+
+
+if __name__ == "__main__":
+    test_entities_broken_over_a_line_break_are_found()
+    test_text_without_line_breaks_is_scanned_in_bounded_pieces()
+    print("All document scanner tests passed!")
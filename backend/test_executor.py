@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Tests for the bounded inference worker pool.
+"""
+
+import asyncio
+import threading
+
+from app.nlp.executor import BoundedExecutor, InferenceOverloaded
+
+
+def test_rejects_work_beyond_the_queue_limit():
+    release = threading.Event()
+    pool = BoundedExecutor(max_workers=1, max_pending=1)
+    running = pool.submit(release.wait, 5)
+    waiting = pool.submit(lambda: "queued")
+    try:
+        pool.submit(lambda: "rejected")
+    except InferenceOverloaded:
+        pass
+    else:
+        raise AssertionError("expected InferenceOverloaded")
+    assert pool.stats()["rejected"] == 1
+
+    release.set()
+    assert running.result(timeout=5) is True
+    assert waiting.result(timeout=5) == "queued"
+    # Slots are released once work completes
+    assert pool.submit(lambda: "again").result(timeout=5) == "again"
+    pool.shutdown()
+
+
+def test_run_keeps_the_event_loop_responsive():
+    pool = BoundedExecutor(max_workers=2, max_pending=0)
+    release = threading.Event()
+    ticks = []
+
+    async def main():
+        job = asyncio.ensure_future(pool.run(release.wait, 5))
+        for _ in range(3):
+            ticks.append(1)
+            await asyncio.sleep(0.01)
+        release.set()
+        return await job
+
+    assert asyncio.run(main()) is True
+    assert len(ticks) == 3
+    assert pool.stats()["in_flight"] == 0
+    pool.shutdown()
+
+
+if __name__ == "__main__":
+    test_rejects_work_beyond_the_queue_limit()
+    test_run_keeps_the_event_loop_responsive()
+    print("All executor tests passed")
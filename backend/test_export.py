@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Tests for encoding task exports as CSV / NDJSON chunks.
+"""
+
+import asyncio
+import csv
+import io
+import json
+
+from app.db.export import export_chunks
+
+TASKS = [
+    {"id": "1", "task": "cumpără lapte", "time": "17:00", "category": "Shopping", "deadline": "2024-05-21"},
+    {"id": "2", "task": 'call "Bob", then email', "time": None, "category": None, "deadline": None},
+    {"id": "3", "task": "pay rent", "time": None, "category": "Home", "deadline": "end of month"},
+]
+
+
+async def _aiter(items):
+    for item in items:
+        yield item
+
+
+def collect(tasks, fmt, rows_per_chunk=500):
+    async def main():
+        return [chunk async for chunk in export_chunks(_aiter(tasks), fmt, rows_per_chunk)]
+    return asyncio.run(main())
+
+
+def test_csv_round_trips_with_header():
+    chunks = collect(TASKS, "csv")
+    rows = list(csv.DictReader(io.StringIO(b"".join(chunks).decode("utf-8"))))
+    assert [r["task"] for r in rows] == [t["task"] for t in TASKS]
+    assert rows[0]["deadline"] == "2024-05-21"
+    assert rows[1]["category"] == ""
+    assert list(rows[0]) == ["id", "task", "time", "category", "deadline"]
+
+
+def test_ndjson_one_object_per_line():
+    lines = b"".join(collect(TASKS, "ndjson")).decode("utf-8").splitlines()
+    assert [json.loads(line) for line in lines] == TASKS
+
+
+def test_chunks_hold_at_most_rows_per_chunk():
+    tasks = [dict(TASKS[0], id=str(i)) for i in range(7)]
+    chunks = collect(tasks, "ndjson", rows_per_chunk=3)
+    assert [c.count(b"\n") for c in chunks] == [3, 3, 1]
+    # Header first, then the rows
+    chunks = collect(tasks, "csv", rows_per_chunk=3)
+    assert chunks[0] == b"id,task,time,category,deadline\r\n"
+    assert len(chunks) == 4
+
+
+def test_empty_export():
+    assert collect([], "csv") == [b"id,task,time,category,deadline\r\n"]
+    assert collect([], "ndjson") == []
+
+
+def test_unknown_format():
+    try:
+        collect(TASKS, "xml")
+    except ValueError as e:
+        assert "xml" in str(e)
+    else:
+        raise AssertionError("expected ValueError")
+
+
+if __name__ == "__main__":
+    test_csv_round_trips_with_header()
+    test_ndjson_one_object_per_line()
+    test_chunks_hold_at_most_rows_per_chunk()
+    test_empty_export()
+    test_unknown_format()
+    print("All export tests passed!")
@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+"""
+Tests for the columnar finance engine behind /finance/analyze.
+"""
+
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import asyncio
+import codecs
+import csv
+import hashlib
+import io
+import multiprocessing
+import os
+import re
+import tempfile
+from datetime import date
+
+from app.finance.engine import (
+    FinanceAggregate, FinanceColumns, analyze_csv, merchant_name, parse_amount, parse_amounts, parse_transaction_date,
+)
+from app.finance.ledger import Ledger
+from app.finance.parallel import analyze_parallel, split_records
+from app.finance.rollups import RollupStore, dataset_id
+from app.finance.stream import SniffingDecoder, StreamingAnalyzer, analyze_stream
+from bench_finance import generate_csv, legacy_analyze
+
+ROMANIAN = (
+    "data,descriere,description,amount\r\n"
+    '2024-01-02,"Plată chirie, ianuarie","rent",-1500\r\n'
+    '2024-01-03,"Cumpărături\nKaufland Ştefăneşti",kaufland,"-123,45"\r\n'
+    "2024-01-04,Benzină,OMV Petrom,-250.10\r\n"
+)
+
+
+def stream(data: bytes, chunk_size: int, encoding=None):
+    analyzer = StreamingAnalyzer(encoding)
+    for i in range(0, len(data), chunk_size):
+        analyzer.feed(data[i:i + chunk_size])
+    return analyzer.close(), analyzer.encoding
+
+
+def test_matches_row_by_row_implementation():
+    for comma_decimals in (False, True):
+        text = generate_csv(3000, comma_decimals=comma_decimals)
+        assert analyze_csv(text) == legacy_analyze(text)
+
+
+def test_amount_formats():
+    assert parse_amount("12,50") == 12.5
+    assert parse_amount("1.234,56") == 1234.56
+    assert parse_amount("1,234.56") == 1234.56
+    assert parse_amount(" -7 ") == -7.0
+    assert parse_amount("1 234,5") == 1234.5
+    assert parse_amount("") == 0.0
+    assert list(parse_amounts(["1.5", "2,5", "", "2,5"])) == [1.5, 2.5, 0.0, 2.5]
+    try:
+        parse_amount("twelve")
+    except ValueError as e:
+        assert "twelve" in str(e)
+    else:
+        raise AssertionError("expected ValueError")
+
+
+def test_header_variants_short_rows_and_blank_lines():
+    text = "Date,Description,Amount\n2024-01-01,Uber ride,-20.5\n\n2024-01-02,LIDL,-10\n2024-01-03\n"
+    assert analyze_csv(text) == {
+        "total": -30.5,
+        "byCategory": {"Transport": -20.5, "Groceries/Food": -10.0, "Other": 0.0},
+        "transactions": 3,
+    }
+    assert analyze_csv("") == {"total": 0.0, "byCategory": {}, "transactions": 0}
+    assert analyze_csv("amount\n5\n6\n") == {"total": 11.0, "byCategory": {"Other": 11.0}, "transactions": 2}
+
+
+def test_aggregates_merge():
+    header = ["description", "amount"]
+    first = FinanceAggregate().add(FinanceColumns.from_rows(header, [["rent", "-1000"], ["omv", "-200"]]))
+    second = FinanceAggregate().add(FinanceColumns.from_rows(header, [["rent", "-1000"], ["salary", "5000"]]))
+    assert first.merge(second).summary() == {
+        "total": 2800.0,
+        "byCategory": {"Utilities/Home": -2000.0, "Transport": -200.0, "Other": 5000.0},
+        "transactions": 4,
+    }
+
+
+def test_stream_matches_whole_file_at_any_chunk_size():
+    # Quoted descriptions spanning lines, which must not be split between chunks
+    text = re.sub(r",(Restaurant Casa) (Veche[^,]*),", r',"\1\n\2",', generate_csv(500))
+    assert '"Restaurant Casa\nVeche' in text
+    expected = analyze_csv(text)
+    for chunk_size in (1, 7, 64, 4096, 1 << 20):
+        assert stream(text.encode("utf-8"), chunk_size)[0] == expected
+
+
+# A literal quote inside an unquoted field, then quoted fields spanning lines
+STRAY_QUOTE = "date,description,amount\n" + (
+    '2024-01-01,TV 5" screen,10.00\n'
+    '2024-01-02,"Restaurant\nmemo ""late""\n",-5\r\n'
+) * 3
+
+
+def test_stream_follows_quotes_like_csv_reader():
+    expected = analyze_csv(STRAY_QUOTE)
+    assert expected["transactions"] == 6
+    for chunk_size in range(1, len(STRAY_QUOTE) + 1):
+        assert stream(STRAY_QUOTE.encode("utf-8"), chunk_size)[0] == expected, chunk_size
+    # One stray quote must not stop later records from being cut off
+    text = generate_csv(5000).replace("Decathlon", 'TV 5" screen', 1)
+    analyzer = StreamingAnalyzer()
+    data = text.encode("utf-8")
+    for i in range(0, len(data), 4096):
+        analyzer.feed(data[i:i + 4096])
+        assert len(analyzer._pending) < 4096
+    assert analyzer.close() == analyze_csv(text)
+
+
+def test_stream_detects_encodings():
+    expected = analyze_csv(ROMANIAN)
+    assert expected["transactions"] == 3
+    for data, encoding in [
+        (ROMANIAN.encode("utf-8"), "utf-8"),
+        (codecs.BOM_UTF8 + ROMANIAN.encode("utf-8"), "utf-8-sig"),
+        (ROMANIAN.encode("cp1250"), "cp1250"),
+        (ROMANIAN.encode("utf-16"), "utf-16"),
+    ]:
+        for chunk_size in (1, 2, 3, 50, len(data)):
+            assert stream(data, chunk_size) == (expected, encoding), (encoding, chunk_size)
+    # An explicit encoding is used as given
+    assert stream(ROMANIAN.encode("cp1250"), 5, encoding="cp1250") == (expected, "cp1250")
+
+
+def test_sniffing_waits_for_a_cut_off_character():
+    decoder = SniffingDecoder()
+    # 0xC4 starts a two-byte UTF-8 character, or is "Ä" in Windows-1250
+    assert decoder.decode(b"abc\xc4") == "abc"
+    assert decoder.encoding is None
+    assert decoder.decode(b"\x83d") == "ăd"
+    assert decoder.encoding == "utf-8"
+    decoder = SniffingDecoder()
+    assert decoder.decode(b"abc\xc3") + decoder.decode(b"", final=True) == "abcĂ"
+    assert decoder.encoding == "cp1250"
+
+
+def test_analyze_stream_from_async_body():
+    async def body():
+        data = ROMANIAN.encode("cp1250")
+        for i in range(0, len(data), 16):
+            yield data[i:i + 16]
+    assert asyncio.run(analyze_stream(body())).close() == analyze_csv(ROMANIAN)
+
+
+ROLLUP_CSV = (
+    "Date,Description,Amount\n"
+    "2024-01-01,UBER *TRIP 123,-20\n"          # Monday of ISO week 2024-W01
+    "31.01.2024,Lidl 0456,-10.5\n"
+    '01/02/2024 14:33,LIDL 0457,"-4,5"\n'
+    "2024-02-03,Salary ACME,1000\n"
+    "someday,uber *eats,-7\n"
+)
+
+
+def test_rollups_by_month_week_and_merchant():
+    summary = analyze_csv(ROLLUP_CSV, rollups=True)
+    assert {k: summary[k] for k in ("total", "byCategory", "transactions")} == analyze_csv(ROLLUP_CSV)
+    assert summary["monthly"] == {
+        "2024-01": {"total": -30.5, "transactions": 2, "byCategory": {"Transport": -20.0, "Groceries/Food": -10.5}},
+        "2024-02": {"total": 995.5, "transactions": 2, "byCategory": {"Groceries/Food": -4.5, "Other": 1000.0}},
+    }
+    assert summary["weekly"] == {
+        "2024-W01": {"total": -20.0, "transactions": 1},
+        "2024-W05": {"total": 985.0, "transactions": 3},
+    }
+    assert list(summary["byMerchant"]) == ["Salary ACME", "UBER", "Lidl"]
+    assert summary["byMerchant"]["UBER"] == {"total": -27.0, "transactions": 2, "byCategory": {"Transport": -27.0}}
+    assert summary["byMerchant"]["Lidl"]["transactions"] == 2
+    assert summary["undated"] == 1
+
+
+def test_rollup_helpers():
+    assert parse_transaction_date("2024-02-29") == date(2024, 2, 29)
+    assert parse_transaction_date("29.02.2024") == date(2024, 2, 29)
+    assert parse_transaction_date("2024-02-30") is None
+    assert parse_transaction_date("yesterday") is None
+    assert merchant_name("UBER *TRIP HELP.UBER.COM") == "UBER"
+    assert merchant_name("OMV Petrom 123 Cluj") == "OMV Petrom Cluj"
+    assert merchant_name("12345") == "12345"
+
+
+def test_rollups_merge_like_one_pass():
+    text = generate_csv(2000)
+    lines = text.splitlines(keepends=True)
+    halves = [lines[0] + "".join(lines[1:1000]), lines[0] + "".join(lines[1000:])]
+    merged = FinanceAggregate(rollups=True)
+    for half in halves:
+        rows = list(csv.reader(io.StringIO(half)))
+        merged.merge(FinanceAggregate(rollups=True).add(FinanceColumns.from_rows(rows[0], rows[1:])))
+    whole = analyze_csv(text, rollups=True)
+    summary = merged.summary()
+    for key in ("monthly", "weekly", "byMerchant", "transactions", "undated"):
+        assert summary[key] == whole[key], key
+    assert abs(summary["total"] - whole["total"]) < 0.011
+
+
+def test_streamed_rollups_and_store():
+    data = ROLLUP_CSV.encode("utf-8")
+    analyzer = StreamingAnalyzer(rollups=True)
+    for i in range(0, len(data), 10):
+        analyzer.feed(data[i:i + 10])
+    summary = analyzer.close()
+    assert summary == analyze_csv(ROLLUP_CSV, rollups=True)
+    dataset = dataset_id(analyzer.digest)
+    assert dataset == dataset_id(hashlib.sha256(data))
+
+    store = RollupStore(":memory:")
+    assert store.get(dataset) is None
+    store.put(dataset, summary)
+    assert store.get(dataset) == summary
+    assert store.delete(dataset) and store.get(dataset) is None
+
+
+def test_split_records_never_cuts_quoted_newlines():
+    text = generate_csv(300)
+    # Multi-line memos with escaped quotes, as some banks export them
+    text = re.sub(r",(Kaufland Cluj[^,]*),", lambda m: f',"{m.group(1)}\nmemo ""line"" 2\n",', text)
+    header_end = text.index("\n") + 1
+    for chunk_chars in (1, 7, 100, 4096, len(text)):
+        spans = split_records(text, chunk_chars, header_end)
+        assert spans[0][0] == header_end and spans[-1][1] == len(text)
+        assert all(a[1] == b[0] for a, b in zip(spans, spans[1:]))
+        records = [row for a, b in spans for row in csv.reader(io.StringIO(text[a:b]))]
+        assert records == list(csv.reader(io.StringIO(text[header_end:])))
+
+
+def test_split_records_follows_quotes_like_csv_reader():
+    header_end = STRAY_QUOTE.index("\n") + 1
+    for chunk_chars in range(1, len(STRAY_QUOTE)):
+        spans = split_records(STRAY_QUOTE, chunk_chars, header_end)
+        records = [row for a, b in spans for row in csv.reader(io.StringIO(STRAY_QUOTE[a:b]))]
+        assert records == list(csv.reader(io.StringIO(STRAY_QUOTE[header_end:]))), chunk_chars
+    # A stray quote early on must not turn the rest of the file into one chunk
+    text = generate_csv(2000).replace("Decathlon", 'TV 5" screen', 1)
+    assert len(split_records(text, 4096)) > len(text) // 4096 - 1
+    with ThreadPoolExecutor(2) as pool:
+        assert analyze_parallel(STRAY_QUOTE, executor=pool, chunk_chars=40) == analyze_csv(STRAY_QUOTE)
+
+
+def test_parallel_matches_inline_and_whole_file():
+    text = generate_csv(5000, comma_decimals=True)
+    whole = analyze_csv(text, rollups=True)
+    with ThreadPoolExecutor(1) as inline:
+        serial = analyze_parallel(text, rollups=True, executor=inline, chunk_chars=20_000)
+    with ProcessPoolExecutor(2, mp_context=multiprocessing.get_context("spawn")) as pool:
+        parallel = analyze_parallel(text, rollups=True, executor=pool, chunk_chars=20_000)
+    # Chunks do not depend on the worker count, so neither do the sums
+    assert parallel == serial
+    # Partial sums add up in a different order, so allow a cent of difference
+    assert parallel["transactions"] == whole["transactions"] and parallel["undated"] == whole["undated"]
+    for key in ("byCategory", "monthly", "weekly", "byMerchant"):
+        assert list(parallel[key]) == list(whole[key]) and _close(parallel[key], whole[key]), key
+    assert analyze_parallel("", executor=pool) == analyze_csv("")
+    assert analyze_parallel("\ndate,description,amount\n", executor=pool) == analyze_csv("date,description,amount\n")
+
+
+def _close(a, b):
+    if isinstance(a, dict):
+        return a.keys() == b.keys() and all(_close(a[k], b[k]) for k in a)
+    return abs(a - b) < 0.011
+
+
+def test_ledger_dedupes_overlapping_exports():
+    january = (
+        "date,description,amount\n"
+        "2024-01-05,Coffee,-2.50\n"
+        "2024-01-05,Coffee,-2.50\n"        # a second, real, coffee that day
+        "2024-01-20,Lidl 0456,-31.10\n"
+    )
+    january_and_february = january + "2024-02-01,Salary ACME,1000\n2024-02-03,UBER *TRIP,-12.00\n,Cash,-5\n"
+    ledger = Ledger(":memory:")
+    assert ledger.add_csv("ana", january) == {"added": 3, "duplicates": 0}
+    assert ledger.add_csv("ana", january_and_february) == {"added": 3, "duplicates": 3}
+    assert ledger.add_csv("ana", january_and_february) == {"added": 0, "duplicates": 6}
+
+    summary = ledger.summary("ana")
+    expected = analyze_csv(january_and_february, rollups=True)
+    assert summary["transactions"] == expected["transactions"] == 6
+    assert summary["total"] == expected["total"] and summary["byCategory"] == expected["byCategory"]
+    assert summary["monthly"] == expected["monthly"] and summary["undated"] == 1
+    assert ledger.summary("bob") == {"total": 0, "byCategory": {}, "transactions": 0, "monthly": {}, "undated": 0}
+
+
+def test_ledger_persists_and_totals_exactly():
+    text = generate_csv(3000)
+    lines = text.splitlines(keepends=True)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "ledger.db")
+        # Overlapping slices, imported out of order
+        Ledger(path).add_csv("ana", lines[0] + "".join(lines[1500:]))
+        assert Ledger(path).add_csv("ana", "".join(lines[:2000]))["added"] == 1499
+        summary = Ledger(path).summary("ana")
+    whole = analyze_csv(text, rollups=True)
+    assert summary["transactions"] == 3000
+    assert _close(summary["byCategory"], whole["byCategory"]) and _close(summary["monthly"], whole["monthly"])
+
+
+if __name__ == "__main__":
+    test_matches_row_by_row_implementation()
+    test_amount_formats()
+    test_header_variants_short_rows_and_blank_lines()
+    test_aggregates_merge()
+    test_stream_matches_whole_file_at_any_chunk_size()
+    test_stream_follows_quotes_like_csv_reader()
+    test_stream_detects_encodings()
+    test_sniffing_waits_for_a_cut_off_character()
+    test_analyze_stream_from_async_body()
+    test_rollups_by_month_week_and_merchant()
+    test_rollup_helpers()
+    test_rollups_merge_like_one_pass()
+    test_streamed_rollups_and_store()
+    test_split_records_never_cuts_quoted_newlines()
+    test_split_records_follows_quotes_like_csv_reader()
+    test_parallel_matches_inline_and_whole_file()
+    test_ledger_dedupes_overlapping_exports()
+    test_ledger_persists_and_totals_exactly()
+    print("All finance tests passed!")
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Tests for the streaming task extractor.
+"""
+
+import io
+
+from app.nlp.extractor import extract_tasks, iter_tasks, TaskStream
+
+DOCUMENT = (
+    "Meeting with John on Friday at 3pm. I need to buy milk tomorrow\n"
+    "Submit the report by 12/05 to the client; pay rent before 1st March. "
+    "Dinner @ 7:30pm with Ana • plata facturi vineri"
+)
+
+
+def _chunks(text, size):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+def test_matches_extract_tasks_for_any_chunking():
+    expected = extract_tasks(DOCUMENT)
+    assert len(expected) == 6
+    for size in (1, 3, 7, 64, len(DOCUMENT)):
+        assert list(iter_tasks(_chunks(DOCUMENT, size))) == expected
+
+
+def test_file_like_inputs():
+    expected = extract_tasks(DOCUMENT)
+    assert list(iter_tasks(io.StringIO(DOCUMENT), chunk_size=5)) == expected
+    # Multi-byte characters split across chunk edges are decoded correctly
+    assert list(iter_tasks(io.BytesIO(DOCUMENT.encode("utf-8")), chunk_size=5)) == expected
+
+
+def test_short_inputs_keep_whole_text_rules():
+    assert list(iter_tasks(["Hi, how ", "are you?"])) == []
+    romanian = "trebuie sa merg la doctor maine la 10:30"
+    assert list(iter_tasks(_chunks(romanian, 4))) == extract_tasks(romanian)
+
+
+def test_tasks_are_yielded_before_the_end():
+    stream = TaskStream()
+    assert stream.feed("Call the bank about the loan. Buy milk and eggs. Clean the") != []
+    rest = stream.feed(" kitchen") + stream.close()
+    assert [t["task"] for t in rest] == ["Clean the kitchen"]
+
+
+if __name__ == "__main__":
+    test_matches_extract_tasks_for_any_chunking()
+    test_file_like_inputs()
+    test_short_inputs_keep_whole_text_rules()
+    test_tasks_are_yielded_before_the_end()
+    print("All streaming extractor tests passed")
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Tests for the fused time/date scanner used by extract_tasks.
+"""
+
+from app.nlp.scanner import (
+    TIME_PREFIX, TIME, DEADLINE, DATE, RELATIVE_DATE, WEEKDAY,
+    scan, first_span, remove_spans,
+)
+from app.nlp.extractor import extract_tasks
+from bench_extractor import SENTENCES, legacy_segment, fused_segment
+
+
+def test_scan_kinds_and_offsets():
+    text = "Send report by 12/05 at 5pm"
+    spans = scan(text)
+    deadline = first_span(spans, DEADLINE)
+    assert deadline.value == "12/05"
+    assert text[deadline.start:deadline.end] == "by 12/05"
+    assert first_span(spans, DATE).value == "12/05"
+    assert first_span(spans, TIME_PREFIX).value == "5pm"
+    assert first_span(spans, TIME).value == "5pm"
+
+
+def test_scan_relative_and_weekdays():
+    spans = scan("Call Ana next Friday, then vineri again")
+    assert first_span(spans, RELATIVE_DATE).value == "next Friday"
+    assert [s.value for s in spans[WEEKDAY]] == ["Friday", "vineri"]
+
+
+def test_prefix_words_need_word_start():
+    spans = scan("meet that 5pm")
+    assert first_span(spans, TIME_PREFIX) is None
+    assert first_span(spans, TIME).value == "5pm"
+    assert extract_tasks("meet that 5pm")[0]["task"] == "meet that 5pm"
+
+
+def test_skip_and_remove_spans():
+    text = "appointment at 12.05 on 3/4"
+    spans = scan(text)
+    time_prefix = first_span(spans, TIME_PREFIX)
+    assert first_span(spans, DATE).value == "12.05"
+    assert first_span(spans, DATE, skip=time_prefix).value == "3/4"
+    assert remove_spans(text, [time_prefix, None]) == "appointment on 3/4"
+
+
+def test_extract_tasks_uses_spans():
+    tasks = extract_tasks("Submit the report by 12/05 at 5pm. Dinner @ 7:30pm with Ana")
+    assert tasks[0]["task"] == "Submit the report"
+    assert tasks[0]["time"] == "5pm"
+    assert tasks[0]["deadline"] == "12/05"
+    assert tasks[1]["task"] == "Dinner with Ana"
+    assert tasks[1]["time"] == "7:30pm"
+
+
+def test_time_glued_to_prefix_word():
+    spans = scan("Call mom at5pm")
+    assert first_span(spans, TIME_PREFIX).value == "5pm"
+    assert first_span(spans, TIME).value == "5pm"
+    assert first_span(scan("Sedinta la10:30"), TIME_PREFIX).value == "10:30"
+    # Only after a whole prefix word
+    assert first_span(scan("flat5pm"), TIME) is None
+    assert extract_tasks("Call mom at5pm")[0]["time"] == "5pm"
+    assert extract_tasks("Sedinta maine la10:30")[0]["time"] == "10:30"
+
+
+def test_same_output_as_per_pattern_extraction():
+    for text in SENTENCES + [
+        "Call mom at5pm",
+        "Sedinta la10:30 maine",
+        "Dinner@8pm tomorrow",
+        "send it by 3/4 la9am",
+    ]:
+        assert fused_segment(text, [0]) == legacy_segment(text, [0]), text
+
+
+if __name__ == "__main__":
+    test_scan_kinds_and_offsets()
+    test_scan_relative_and_weekdays()
+    test_prefix_words_need_word_start()
+    test_skip_and_remove_spans()
+    test_extract_tasks_uses_spans()
+    test_time_glued_to_prefix_word()
+    test_same_output_as_per_pattern_extraction()
+    print("All scanner tests passed")
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Tests that importing the AI service is cheap and that the startup policies
+decide when the model loads.
+"""
+
+import asyncio
+import os
+import subprocess
+import sys
+import threading
+
+
+def test_import_does_not_load_transformers_or_the_model():
+    code = (
+        "import sys\n"
+        "from app.nlp.ai_service import model_service\n"
+        "assert 'transformers' not in sys.modules, 'transformers imported'\n"
+        "assert 'torch' not in sys.modules, 'torch imported'\n"
+        "status = model_service.get_status()\n"
+        "assert status['state'] == 'not_loaded', status['state']\n"
+        "assert not status['loading_started']\n"
+    )
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                            cwd=os.path.dirname(os.path.abspath(__file__)))
+    assert result.returncode == 0, result.stderr
+
+
+def make_service(policy):
+    """
+    A service with the given startup policy whose loader does not touch
+    transformers: it waits for the returned event, then installs a fake
+    generator, so only the policy wiring is exercised.
+    """
+    from app.nlp.ai_service import AIModelService
+    os.environ["AI_MODEL_STARTUP"] = policy
+    try:
+        service = AIModelService()
+    finally:
+        del os.environ["AI_MODEL_STARTUP"]
+    release = threading.Event()
+    loads = []
+
+    def load_backend():
+        loads.append(policy)
+        release.wait(10)
+        service._generate = lambda prompts: ["[]"] * len(prompts)
+
+    service._load_backend = load_backend
+    return service, release, loads
+
+
+def test_lazy_policy_loads_on_first_parse():
+    from app.nlp.ai_service import ModelState
+    service, release, loads = make_service("lazy")
+    asyncio.run(service.startup())
+    assert service.get_status()["state"] == ModelState.NOT_LOADED and not loads
+
+    result = service.process_text("I need to buy milk tomorrow")
+    # The first request is served by the fallback while the model loads
+    assert result["method"] == "regex_fallback"
+    assert service.get_status()["state"] != ModelState.NOT_LOADED
+    release.set()
+    assert service.wait_until_loaded(timeout=10)
+    assert loads == ["lazy"]
+    service.shutdown()
+
+
+def test_background_policy_starts_loading_at_startup():
+    from app.nlp.ai_service import ModelState
+    service, release, loads = make_service("background")
+    asyncio.run(service.startup())
+    # startup() returns without waiting for the load
+    assert service.get_status()["state"] == ModelState.LOADING
+    release.set()
+    assert service.wait_until_loaded(timeout=10)
+    assert loads == ["background"]
+    service.shutdown()
+
+
+def test_profile_records_phases_marks_and_imports():
+    from app.startup import StartupProfile
+    profile = StartupProfile()
+    with profile.phase("model.tokenizer"):
+        pass
+    try:
+        with profile.phase("model.weights"):
+            raise OSError("no such model")
+    except OSError:
+        pass
+    profile.mark("first_request")
+    profile.mark("first_request")
+
+    profile.enable_import_timing()
+    try:
+        import xml.dom.minidom  # not imported by anything above
+    finally:
+        profile.disable_import_timing()
+
+    snapshot = profile.snapshot(top=100)
+    assert [p["name"] for p in snapshot["phases"]] == ["model.tokenizer", "model.weights"]
+    assert "no such model" in snapshot["phases"][1]["error"]
+    assert list(snapshot["marks"]) == ["first_request"]
+    assert snapshot["uptime"] >= snapshot["marks"]["first_request"] >= 0
+    modules = {entry["module"]: entry for entry in snapshot["imports"]}
+    assert "xml.dom.minidom" in modules
+    assert modules["xml.dom.minidom"]["cumulative"] >= modules["xml.dom.minidom"]["self"]
+
+
+def test_warmup_runs_single_and_batched_prompts():
+    from app.nlp.ai_service import AIModelService
+    from app.nlp.prompts import WARMUP_INPUTS
+    service = AIModelService()
+    calls = []
+    service._generate = lambda prompts: calls.append(len(prompts)) or ["[]"] * len(prompts)
+
+    service._run_warmup()
+    warmup = service.get_status()["warmup"]
+    assert calls == [1] * len(WARMUP_INPUTS) + [len(WARMUP_INPUTS)]
+    assert len(warmup["prompts"]) == len(WARMUP_INPUTS)
+    assert len({p["chars"] for p in warmup["prompts"]}) == len(WARMUP_INPUTS)
+    assert len(warmup["batch_ms"]) == 1 and warmup["error"] is None
+
+    # A failing generate is recorded instead of aborting the load
+    service._generate = lambda prompts: 1 / 0
+    service._run_warmup()
+    assert "division by zero" in service.get_status()["warmup"]["error"]
+    service.shutdown()
+
+
+if __name__ == "__main__":
+    test_import_does_not_load_transformers_or_the_model()
+    test_lazy_policy_loads_on_first_parse()
+    test_background_policy_starts_loading_at_startup()
+    test_profile_records_phases_marks_and_imports()
+    test_warmup_runs_single_and_batched_prompts()
+    print("All startup tests passed!")
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Tests for the MongoDB task repository. They need a disposable database:
+set MONGO_TEST_URI (e.g. mongodb://localhost:27017/tasks_test); they are
+skipped otherwise. The collection is dropped before each test.
+"""
+
+import asyncio
+import os
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+
+MONGO_TEST_URI = os.getenv("MONGO_TEST_URI")
+
+
+def run_with_repository(test):
+    """Run `test(repository)` against a fresh collection."""
+    if not MONGO_TEST_URI:
+        pytest.skip("MONGO_TEST_URI not set")
+    from app.db.tasks import TaskRepository
+
+    async def main():
+        repository = TaskRepository(uri=MONGO_TEST_URI, collection="tasks_test")
+        repository.connect()
+        try:
+            await repository.collection.drop()
+            await test(repository)
+        finally:
+            await repository.collection.drop()
+            repository.close()
+
+    asyncio.run(main())
+
+
+def test_insert_many_returns_ids_and_only_task_fields():
+    async def test(repository):
+        stored = await repository.insert_many([
+            {"task": "buy milk", "time": "5pm", "category": "Shopping", "deadline": None, "extra": 1},
+            {"task": "call mom", "time": None, "category": "Family", "deadline": "2024-05-21"},
+        ])
+        assert [t["task"] for t in stored] == ["buy milk", "call mom"]
+        assert all(len(t["id"]) == 24 for t in stored)
+        page, _ = await repository.list()
+        assert page == stored
+        assert "extra" not in page[0]
+
+    run_with_repository(test)
+
+
+def test_cursor_pagination_walks_every_task_once():
+    async def test(repository):
+        await repository.insert_many([{"task": f"task {i}"} for i in range(7)])
+        seen, after = [], None
+        while True:
+            page, after = await repository.list(limit=3, after=after)
+            seen.extend(t["task"] for t in page)
+            if after is None:
+                break
+        assert seen == [f"task {i}" for i in range(7)]
+
+    run_with_repository(test)
+
+
+def test_delete_and_invalid_ids():
+    async def test(repository):
+        [stored] = await repository.insert_many([{"task": "water plants"}])
+        assert await repository.delete(stored["id"]) is True
+        assert await repository.delete(stored["id"]) is False
+        try:
+            await repository.delete("not-an-id")
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("expected ValueError")
+
+    run_with_repository(test)
+
+
+def test_partial_insert_reports_what_was_stored():
+    from app.db.tasks import PartialInsert
+
+    async def test(repository):
+        # A unique index makes the second "water plants" fail
+        await repository.collection.create_index("task", unique=True)
+        try:
+            await repository.insert_many([{"task": "water plants"}, {"task": "water plants"}, {"task": "buy milk"}])
+        except PartialInsert as e:
+            inserted = e.inserted
+            assert [error["index"] for error in e.errors] == [1]
+        else:
+            raise AssertionError("expected PartialInsert")
+        assert [t["task"] for t in inserted] == ["water plants", "buy milk"]
+        page, _ = await repository.list()
+        assert page == inserted
+
+    run_with_repository(test)
+
+
+def winning_indexes(plan):
+    """Index names used anywhere in an explain() winning plan."""
+    names = set()
+    stack = [plan["queryPlanner"]["winningPlan"]]
+    while stack:
+        stage = stack.pop()
+        if "indexName" in stage:
+            names.add(stage["indexName"])
+        if "COLLSCAN" == stage.get("stage"):
+            names.add("COLLSCAN")
+        stack.extend(stage.get("inputStages", []))
+        for key in ("inputStage", "queryPlan"):
+            if key in stage:
+                stack.append(stage[key])
+    return names
+
+
+def test_parse_deadline():
+    from app.db.tasks import parse_deadline
+    today = date(2024, 5, 20)  # a Monday
+    utc = lambda *ymd: datetime(*ymd, tzinfo=timezone.utc)
+    assert parse_deadline("2024-06-01") == utc(2024, 6, 1)
+    assert parse_deadline("12/06", today) == utc(2024, 6, 12)
+    assert parse_deadline("12.05", today) == utc(2025, 5, 12)  # already past this year
+    assert parse_deadline("3-6-24", today) == utc(2024, 6, 3)
+    assert parse_deadline("31/02", today) is None
+    assert parse_deadline("after the meeting") is None
+    tomorrow = date.today() + timedelta(days=1)
+    assert parse_deadline("Tomorrow") == utc(tomorrow.year, tomorrow.month, tomorrow.day)
+
+
+def test_deadlines_are_dates_and_range_queries_use_indexes():
+    async def test(repository):
+        await repository.ensure_indexes()
+        week = [date(2024, 5, 20) + timedelta(days=i) for i in range(14)]
+        await repository.insert_many([
+            {"task": f"task {i}", "category": "Work" if i % 2 else "Home", "deadline": day.isoformat()}
+            for i, day in enumerate(week)
+        ] + [{"task": "someday", "deadline": "when I have time"}])
+        await repository.insert_many([{"task": "other user", "deadline": "2024-05-21"}], user="ana")
+
+        raw = await repository.collection.find_one({"task": "task 0"})
+        assert raw["deadline"] == datetime(2024, 5, 20, tzinfo=timezone.utc)
+        raw = await repository.collection.find_one({"task": "someday"})
+        assert raw["deadline"] is None and raw["deadline_text"] == "when I have time"
+
+        start = datetime(2024, 5, 20, tzinfo=timezone.utc)
+        end = start + timedelta(days=7)
+        due = await repository.due(start, end)
+        assert [t["task"] for t in due] == [f"task {i}" for i in range(7)]
+        assert due[0]["deadline"] == "2024-05-20"
+        work = await repository.due(start, end, category="Work")
+        assert [t["task"] for t in work] == ["task 1", "task 3", "task 5"]
+
+        assert winning_indexes(await repository.due_cursor(start, end).explain()) == {"user_deadline"}
+        assert winning_indexes(
+            await repository.due_cursor(start, end, category="Work").explain()
+        ) == {"user_category_deadline"}
+        page_plan = await repository.collection.find({"user": "default"}).sort("_id", 1).explain()
+        assert winning_indexes(page_plan) == {"user_id"}
+
+    run_with_repository(test)
+
+
+def test_text_search():
+    async def test(repository):
+        await repository.ensure_indexes()
+        await repository.insert_many([
+            {"task": "cumpara lapte"}, {"task": "buy milk"}, {"task": "call the dentist"},
+        ])
+        assert [t["task"] for t in await repository.search("milk")] == ["buy milk"]
+        assert [t["task"] for t in await repository.search("lapte")] == ["cumpara lapte"]
+        plan = await repository.search_cursor("dentist").explain()
+        assert "task_text" in winning_indexes(plan)
+
+    run_with_repository(test)
+
+
+def test_export_cursor_streams_in_batches():
+    async def test(repository):
+        from app.db.tasks import iter_tasks
+
+        await repository.ensure_indexes()
+        await repository.insert_many([
+            {"task": f"task {i}", "category": "Work" if i % 2 else "Home", "deadline": f"2024-06-{i + 1:02d}"}
+            for i in range(25)
+        ] + [{"task": "undated"}])
+
+        everything = [t async for t in iter_tasks(repository.export_cursor(batch_size=4))]
+        assert len(everything) == 26
+
+        start = datetime(2024, 6, 1, tzinfo=timezone.utc)
+        cursor = repository.export_cursor(start, start + timedelta(days=10), category="Work", batch_size=2)
+        assert [t["task"] for t in [t async for t in iter_tasks(cursor)]] == [f"task {i}" for i in (1, 3, 5, 7, 9)]
+        plan = await repository.export_cursor(start, category="Work").explain()
+        assert winning_indexes(plan) == {"user_category_deadline"}
+
+    run_with_repository(test)
+
+
+if __name__ == "__main__":
+    test_insert_many_returns_ids_and_only_task_fields()
+    test_cursor_pagination_walks_every_task_once()
+    test_delete_and_invalid_ids()
+    test_partial_insert_reports_what_was_stored()
+    test_parse_deadline()
+    test_deadlines_are_dates_and_range_queries_use_indexes()
+    test_text_search()
+    test_export_cursor_streams_in_batches()
+    print("All task repository tests passed!")
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Tests for the multi-process inference worker pool.
+"""
+
+import os
+import time
+
+from app.nlp.workers import InferenceWorkerPool
+
+
+def upper_generator():
+    """Stands in for pipeline_generator; built inside each worker."""
+    def generate(prompts):
+        if "crash" in prompts:
+            os._exit(1)
+        if "fail" in prompts:
+            raise ValueError("bad prompt")
+        return [f"{os.getpid()}:{p.upper()}" for p in prompts]
+    return generate
+
+
+def test_batches_run_in_worker_processes():
+    pool = InferenceWorkerPool(upper_generator, 2, start_method="spawn", threads_per_worker=1)
+    try:
+        pool.start(timeout=30)
+        results = pool.generate(["buy milk", "call mom"], timeout=10)
+        pid, text = results[0].split(":")
+        assert int(pid) != os.getpid()
+        assert [r.split(":")[1] for r in results] == ["BUY MILK", "CALL MOM"]
+
+        # Spread over both workers once they are up
+        futures = [pool.submit([str(i)]) for i in range(8)]
+        assert [f.result(timeout=10)[0].split(":")[1] for f in futures] == [str(i) for i in range(8)]
+        stats = pool.stats()
+        assert len(stats) == 2
+        assert sum(w["completed"] for w in stats) == 9
+        assert all(w["in_flight"] == 0 for w in stats)
+    finally:
+        pool.close()
+
+
+def test_errors_and_crashes_are_reported():
+    pool = InferenceWorkerPool(upper_generator, 1, start_method="spawn", threads_per_worker=1)
+    try:
+        pool.start(timeout=30)
+        try:
+            pool.generate(["fail"], timeout=10)
+        except RuntimeError as e:
+            assert "bad prompt" in str(e)
+        else:
+            raise AssertionError("expected RuntimeError")
+
+        try:
+            pool.generate(["crash"], timeout=10)
+        except RuntimeError as e:
+            assert "died" in str(e)
+        else:
+            raise AssertionError("expected RuntimeError")
+
+        # The worker is restarted and keeps serving
+        for _ in range(600):
+            if pool.stats()[0]["state"] == "ready":
+                break
+            time.sleep(0.05)
+        assert pool.generate(["ok"], timeout=10)[0].endswith(":OK")
+        stats = pool.stats()[0]
+        assert stats["restarts"] == 1
+        assert stats["failures"] == 1
+    finally:
+        pool.close()
+
+
+if __name__ == "__main__":
+    test_batches_run_in_worker_processes()
+    test_errors_and_crashes_are_reported()
+    print("All worker pool tests passed!")